@@ -9,6 +9,120 @@ SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = "HS256"
 BASE_URL = os.getenv("BASE_URL", "http://localhost:8000")
 
+# MongoDB connection pool (per process; size these to the number of uvicorn workers)
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", 100))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", 0))
+MONGO_MAX_IDLE_TIME_MS = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", 0)) or None
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", 0)) or None
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", 30000))
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", 20000))
+# Comma separated wire compressors in order of preference, e.g. "zstd,snappy,zlib".
+# zstd needs the `zstandard` package and snappy needs `python-snappy`.
+MONGO_COMPRESSORS = os.getenv("MONGO_COMPRESSORS", "")
+# Read preference per use case: primary | primaryPreferred | secondary | secondaryPreferred | nearest
+MONGO_READ_PREFERENCE = os.getenv("MONGO_READ_PREFERENCE", "primary")
+MONGO_SEARCH_READ_PREFERENCE = os.getenv("MONGO_SEARCH_READ_PREFERENCE", MONGO_READ_PREFERENCE)
+MONGO_ANALYTICS_READ_PREFERENCE = os.getenv("MONGO_ANALYTICS_READ_PREFERENCE", MONGO_READ_PREFERENCE)
+
+# Job list/search pagination (keyset on posted_at, job_id)
+JOB_PAGE_SIZE_DEFAULT = int(os.getenv("JOB_PAGE_SIZE_DEFAULT", 20))
+JOB_PAGE_SIZE_MAX = int(os.getenv("JOB_PAGE_SIZE_MAX", 100))
+
+# Job expiry: "read_time" computes expired status when reading and flips it with a background sweep;
+# "on_read" is the legacy behaviour of running an update_many at the start of every read.
+JOB_EXPIRY_MODE = os.getenv("JOB_EXPIRY_MODE", "read_time")
+JOB_EXPIRY_SWEEP_INTERVAL_SECONDS = int(os.getenv("JOB_EXPIRY_SWEEP_INTERVAL_SECONDS", 300))
+# Documents per bulk write when archiving expired jobs into expired_jobs
+EXPIRED_JOBS_BATCH_SIZE = int(os.getenv("EXPIRED_JOBS_BATCH_SIZE", 500))
+
+# Job removal cascade: documents moved per batch, whether each batch runs in a transaction
+# (requires a replica set), the dependent count above which DELETE runs in the background,
+# and how long a "running" removal may go without progress before another run takes it over
+JOB_REMOVAL_BATCH_SIZE = int(os.getenv("JOB_REMOVAL_BATCH_SIZE", 500))
+JOB_REMOVAL_USE_TRANSACTION = os.getenv("JOB_REMOVAL_USE_TRANSACTION", "false").lower() == "true"
+JOB_REMOVAL_INLINE_MAX = int(os.getenv("JOB_REMOVAL_INLINE_MAX", 500))
+JOB_REMOVAL_STALE_SECONDS = int(os.getenv("JOB_REMOVAL_STALE_SECONDS", 900))
+
+# Job search engine for the free-text query: "text" (weighted text index) or "regex" (legacy scan)
+JOB_SEARCH_ENGINE = os.getenv("JOB_SEARCH_ENGINE", "text")
+# Maximum values returned per facet in faceted job search
+JOB_FACET_LIMIT = int(os.getenv("JOB_FACET_LIMIT", 20))
+
+# Per-request Mongo command stats (X-DB-Queries / X-DB-Time headers); requests above either
+# threshold are logged as warnings to surface N+1 query patterns
+DB_QUERY_STATS = os.getenv("DB_QUERY_STATS", "true").lower() == "true"
+DB_QUERY_LOG_MIN_QUERIES = int(os.getenv("DB_QUERY_LOG_MIN_QUERIES", 25))
+DB_QUERY_LOG_MIN_MS = int(os.getenv("DB_QUERY_LOG_MIN_MS", 250))
+
+# Prometheus text metrics at /metrics; set METRICS_TOKEN to require "Authorization: Bearer <token>"
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+# Opt-in request profiling: requests signed with PROFILE_SECRET (X-Profile-Signature) or picked by
+# PROFILE_SAMPLE_RATE run under PROFILE_MODE ("sampling" | "cprofile"); results go to PROFILE_STORE ("mongo" | "disk")
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+PROFILE_SECRET = os.getenv("PROFILE_SECRET")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", 0))
+PROFILE_MODE = os.getenv("PROFILE_MODE", "sampling")
+PROFILE_SAMPLE_INTERVAL_MS = int(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", 5))
+PROFILE_STORE = os.getenv("PROFILE_STORE", "mongo")
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_TOP_N = int(os.getenv("PROFILE_TOP_N", 50))
+
+# Event-loop lag monitor: probe interval, blocked time after which the loop thread's stack is logged,
+# and how many recent samples the exported percentiles cover
+LOOP_MONITOR_ENABLED = os.getenv("LOOP_MONITOR_ENABLED", "true").lower() == "true"
+LOOP_LAG_INTERVAL_MS = int(os.getenv("LOOP_LAG_INTERVAL_MS", 100))
+LOOP_LAG_THRESHOLD_MS = int(os.getenv("LOOP_LAG_THRESHOLD_MS", 250))
+LOOP_LAG_WINDOW = int(os.getenv("LOOP_LAG_WINDOW", 600))
+
+# Resume parsing loads spaCy / pdfplumber / python-docx lazily; set true on long-running servers
+# to start the parse workers (which load them) at startup instead of on the first parse
+RESUME_PARSER_WARMUP = os.getenv("RESUME_PARSER_WARMUP", "false").lower() == "true"
+# spaCy model and the pipeline components excluded from it (only NER is used), and how much
+# of the resume head NER reads when looking for the candidate's name
+RESUME_NLP_MODEL = os.getenv("RESUME_NLP_MODEL", "en_core_web_sm")
+RESUME_NLP_EXCLUDE = os.getenv("RESUME_NLP_EXCLUDE", "tok2vec,tagger,parser,senter,attribute_ruler,lemmatizer")
+RESUME_NER_MAX_CHARS = int(os.getenv("RESUME_NER_MAX_CHARS", 1000))
+# PDF text extraction: "auto" (pypdfium2, pdfplumber when that text looks unusable), "pdfium" or
+# "pdfplumber"; pages read per resume, and the characters per page below which "auto" falls back
+RESUME_PDF_ENGINE = os.getenv("RESUME_PDF_ENGINE", "auto")
+RESUME_PDF_MAX_PAGES = int(os.getenv("RESUME_PDF_MAX_PAGES", 10))
+RESUME_PDF_MIN_CHARS_PER_PAGE = int(os.getenv("RESUME_PDF_MIN_CHARS_PER_PAGE", 50))
+# Resume parse engine: worker processes (0 = parse in the threadpool instead), jobs allowed to wait
+# beyond the busy workers before new ones are rejected, per-job timeout, per-worker address-space cap
+# (0 = unlimited) and how many jobs a worker runs before it is replaced
+RESUME_PARSE_WORKERS = int(os.getenv("RESUME_PARSE_WORKERS", 2))
+RESUME_PARSE_QUEUE_SIZE = int(os.getenv("RESUME_PARSE_QUEUE_SIZE", 16))
+RESUME_PARSE_TIMEOUT_SECONDS = float(os.getenv("RESUME_PARSE_TIMEOUT_SECONDS", 30))
+RESUME_PARSE_MEMORY_LIMIT_MB = int(os.getenv("RESUME_PARSE_MEMORY_LIMIT_MB", 2048))
+RESUME_PARSE_MAX_TASKS_PER_CHILD = int(os.getenv("RESUME_PARSE_MAX_TASKS_PER_CHILD", 100))
+# Parse results cached by SHA-256 of the file: entries kept in-process (0 = Mongo only) and
+# days a `resume_parse_cache` document lives
+RESUME_PARSE_CACHE_SIZE = int(os.getenv("RESUME_PARSE_CACHE_SIZE", 512))
+RESUME_PARSE_CACHE_TTL_DAYS = int(os.getenv("RESUME_PARSE_CACHE_TTL_DAYS", 180))
+
+# GridFS blob GC: sweep interval (0 = off), how long a blob stays unreferenced before it may be
+# deleted (covers a document whose old blob was released before its new pointer was saved),
+# blobs checked per sweep
+BLOB_GC_INTERVAL_SECONDS = int(os.getenv("BLOB_GC_INTERVAL_SECONDS", 3600))
+BLOB_GC_GRACE_SECONDS = int(os.getenv("BLOB_GC_GRACE_SECONDS", 3600))
+BLOB_GC_BATCH_SIZE = int(os.getenv("BLOB_GC_BATCH_SIZE", 500))
+
+# Uploads are streamed into GridFS in UPLOAD_CHUNK_SIZE_KB reads (255 = the GridFS chunk size).
+# Per-file limits, the multipart request limit checked from Content-Length before the body is read,
+# and how much of a resume is kept in memory for parsing (larger resumes are stored but not parsed)
+UPLOAD_CHUNK_SIZE_KB = int(os.getenv("UPLOAD_CHUNK_SIZE_KB", 255))
+RESUME_UPLOAD_MAX_MB = int(os.getenv("RESUME_UPLOAD_MAX_MB", 10))
+IMAGE_UPLOAD_MAX_MB = int(os.getenv("IMAGE_UPLOAD_MAX_MB", 5))
+UPLOAD_REQUEST_MAX_MB = int(os.getenv("UPLOAD_REQUEST_MAX_MB", 12))
+RESUME_PARSE_MAX_MB = int(os.getenv("RESUME_PARSE_MAX_MB", 5))
+# File downloads: browser max-age for URLs that embed the (immutable) blob id, and the in-process
+# cache for small blobs such as logos and avatars (largest cached file, total size)
+FILE_CACHE_MAX_AGE_SECONDS = int(os.getenv("FILE_CACHE_MAX_AGE_SECONDS", 31536000))
+FILE_CACHE_MAX_ITEM_KB = int(os.getenv("FILE_CACHE_MAX_ITEM_KB", 256))
+FILE_CACHE_MAX_MB = int(os.getenv("FILE_CACHE_MAX_MB", 32))
+
 SMTP_HOST = os.getenv("SMTP_HOST", "smtp.gmail.com")
 SMTP_PORT = int(os.getenv("SMTP_PORT", 587))
 SMTP_USER = os.getenv("SMTP_USER")
@@ -1,5 +1,258 @@
-from pymongo import MongoClient
+import asyncio
+import logging
+import threading
+from contextvars import ContextVar
+from pymongo import MongoClient, ReadPreference, monitoring
+from motor.motor_asyncio import AsyncIOMotorClient
+from gridfs import GridFS
+from app.config import settings
 from app.config.settings import MONGO_URL, DB_NAME
 
-client = MongoClient(MONGO_URL)
+logger = logging.getLogger(__name__)
+
+_READ_PREFERENCES = {
+    "primary": ReadPreference.PRIMARY,
+    "primaryPreferred": ReadPreference.PRIMARY_PREFERRED,
+    "secondary": ReadPreference.SECONDARY,
+    "secondaryPreferred": ReadPreference.SECONDARY_PREFERRED,
+    "nearest": ReadPreference.NEAREST,
+}
+
+# Use case -> read preference name. "default" covers everything that must read its own writes.
+READ_PREFERENCE_BY_USE_CASE = {
+    "default": settings.MONGO_READ_PREFERENCE,
+    "search": settings.MONGO_SEARCH_READ_PREFERENCE,
+    "analytics": settings.MONGO_ANALYTICS_READ_PREFERENCE,
+}
+
+
+class RequestQueryStats:
+    """Mongo commands attributed to one HTTP request: count, total time and the slowest one.
+
+    With `keep_commands` the command documents are kept as well, in the order
+    they were sent (benchmarks.query_plans explains exactly what a handler ran).
+    """
+
+    def __init__(self, keep_commands: bool = False):
+        self.count = 0
+        self.total_ms = 0.0
+        self.slowest = None  # (ms, command name, collection)
+        self.commands = [] if keep_commands else None
+        self._targets = {}
+        self._lock = threading.Lock()
+
+    def begin(self, key, collection, command=None):
+        with self._lock:
+            self._targets[key] = collection
+            if self.commands is not None and command is not None:
+                self.commands.append(dict(command))
+
+    def finish(self, key, command_name: str, duration_ms: float):
+        with self._lock:
+            collection = self._targets.pop(key, None)
+            self.count += 1
+            self.total_ms += duration_ms
+            if self.slowest is None or duration_ms > self.slowest[0]:
+                self.slowest = (duration_ms, command_name, collection)
+
+    def describe_slowest(self) -> str:
+        if not self.slowest:
+            return ""
+        ms, command_name, collection = self.slowest
+        return f"{command_name} {collection or '-'} {ms:.1f}ms"
+
+
+# Set per request by the middleware in app.main; None outside requests (scheduler, startup)
+request_query_stats: ContextVar[RequestQueryStats | None] = ContextVar("request_query_stats", default=None)
+
+
+class QueryStatsListener(monitoring.CommandListener):
+    """Attribute every command to the current request's RequestQueryStats.
+
+    Motor and run_in_threadpool copy the context into their worker threads, so
+    the request's stats object is visible wherever the driver call runs.
+    """
+
+    def started(self, event):
+        stats = request_query_stats.get()
+        if stats is not None:
+            target = event.command.get("collection") if event.command_name == "getMore" else event.command.get(event.command_name)
+            stats.begin((event.connection_id, event.request_id), target if isinstance(target, str) else None, event.command)
+
+    def succeeded(self, event):
+        self._finish(event)
+
+    def failed(self, event):
+        self._finish(event)
+
+    def _finish(self, event):
+        stats = request_query_stats.get()
+        if stats is not None:
+            stats.finish((event.connection_id, event.request_id), event.command_name, event.duration_micros / 1000)
+
+
+query_stats_listener = QueryStatsListener()
+
+
+def client_options() -> dict:
+    """Pool / timeout / compression options shared by the sync and async clients."""
+    options = {
+        "maxPoolSize": settings.MONGO_MAX_POOL_SIZE,
+        "minPoolSize": settings.MONGO_MIN_POOL_SIZE,
+        "serverSelectionTimeoutMS": settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "connectTimeoutMS": settings.MONGO_CONNECT_TIMEOUT_MS,
+        "readPreference": settings.MONGO_READ_PREFERENCE,
+    }
+    if settings.MONGO_WAIT_QUEUE_TIMEOUT_MS:
+        options["waitQueueTimeoutMS"] = settings.MONGO_WAIT_QUEUE_TIMEOUT_MS
+    if settings.MONGO_MAX_IDLE_TIME_MS:
+        options["maxIdleTimeMS"] = settings.MONGO_MAX_IDLE_TIME_MS
+    compressors = [c.strip() for c in settings.MONGO_COMPRESSORS.split(",") if c.strip()]
+    if compressors:
+        options["compressors"] = compressors
+    if settings.DB_QUERY_STATS:
+        options["event_listeners"] = [query_stats_listener]
+    return options
+
+
+def create_client() -> MongoClient:
+    return MongoClient(MONGO_URL, **client_options())
+
+
+def create_async_client() -> AsyncIOMotorClient:
+    return AsyncIOMotorClient(MONGO_URL, **client_options())
+
+
+# Sync client: used by the scheduler thread, startup hooks and not-yet-migrated modules.
+# Built at import time (connections are established lazily) because most modules bind `db` on import;
+# the FastAPI lifespan warms it up and closes it.
+client = create_client()
 db = client[DB_NAME]
+
+# Async client: used from `async def` handlers so queries never block the event loop.
+# Motor binds to the running loop on first use, so creating it here is safe.
+async_client = create_async_client()
+async_db = async_client[DB_NAME]
+
+# Single GridFS handle for every module that stores files.
+gfs = GridFS(db)
+
+_sync_dbs = {}
+_async_dbs = {}
+
+
+def _read_preference(use_case: str):
+    name = READ_PREFERENCE_BY_USE_CASE.get(use_case, settings.MONGO_READ_PREFERENCE)
+    return _READ_PREFERENCES.get(name, ReadPreference.PRIMARY)
+
+
+def get_db(use_case: str = "default"):
+    """Sync database handle with the read preference configured for `use_case`."""
+    handle = _sync_dbs.get(use_case)
+    if handle is None:
+        handle = _sync_dbs[use_case] = client.get_database(DB_NAME, read_preference=_read_preference(use_case))
+    return handle
+
+
+def get_async_db(use_case: str = "default"):
+    """Async database handle with the read preference configured for `use_case`."""
+    handle = _async_dbs.get(use_case)
+    if handle is None:
+        handle = _async_dbs[use_case] = async_client.get_database(DB_NAME, read_preference=_read_preference(use_case))
+    return handle
+
+
+async def open_clients():
+    """Verify connectivity and pre-open pooled connections so the first requests don't pay for it."""
+    await async_client.admin.command("ping")
+    warm = max(settings.MONGO_MIN_POOL_SIZE, 1)
+    # Concurrent pings force the async pool to open up to `warm` sockets now.
+    await asyncio.gather(*(async_client.admin.command("ping") for _ in range(warm)))
+    await asyncio.to_thread(client.admin.command, "ping")
+    logger.info("MongoDB clients ready (maxPoolSize=%s, minPoolSize=%s)", settings.MONGO_MAX_POOL_SIZE, settings.MONGO_MIN_POOL_SIZE)
+
+
+def close_clients():
+    async_client.close()
+    client.close()
+
+
+class AsyncRepository:
+    """Small async data-access wrapper around a single collection.
+
+    Route handlers talk to this instead of the driver directly, so the
+    underlying async client can be swapped or reconfigured in one place.
+    """
+
+    def __init__(self, name: str, use_case: str = "default"):
+        self.name = name
+        self.use_case = use_case
+
+    @property
+    def collection(self):
+        return get_async_db(self.use_case)[self.name]
+
+    async def find_one(self, filter: dict, projection: dict | None = None, **kwargs):
+        return await self.collection.find_one(filter, projection, **kwargs)
+
+    def cursor(self, filter: dict | None = None, projection: dict | None = None, sort=None, skip: int = 0, limit: int = 0):
+        cursor = self.collection.find(filter or {}, projection)
+        if sort:
+            cursor = cursor.sort(sort)
+        if skip:
+            cursor = cursor.skip(skip)
+        if limit:
+            cursor = cursor.limit(limit)
+        return cursor
+
+    async def find(self, filter: dict | None = None, projection: dict | None = None, sort=None, skip: int = 0, limit: int = 0) -> list:
+        return await self.cursor(filter, projection, sort, skip, limit).to_list(length=None)
+
+    async def count(self, filter: dict | None = None) -> int:
+        return await self.collection.count_documents(filter or {})
+
+    async def aggregate(self, pipeline: list) -> list:
+        return await self.collection.aggregate(pipeline).to_list(length=None)
+
+    async def insert_one(self, document: dict, **kwargs):
+        return await self.collection.insert_one(document, **kwargs)
+
+    async def insert_many(self, documents: list, ordered: bool = True, **kwargs):
+        return await self.collection.insert_many(documents, ordered=ordered, **kwargs)
+
+    async def update_one(self, filter: dict, update: dict, **kwargs):
+        return await self.collection.update_one(filter, update, **kwargs)
+
+    async def find_one_and_update(self, filter: dict, update: dict, **kwargs):
+        return await self.collection.find_one_and_update(filter, update, **kwargs)
+
+    async def update_many(self, filter: dict, update: dict, **kwargs):
+        return await self.collection.update_many(filter, update, **kwargs)
+
+    async def delete_one(self, filter: dict, **kwargs):
+        return await self.collection.delete_one(filter, **kwargs)
+
+    async def delete_many(self, filter: dict, **kwargs):
+        return await self.collection.delete_many(filter, **kwargs)
+
+
+class Repositories:
+    """Attribute access to repositories, mirroring `db.<collection>` (e.g. `repos.jobs`)."""
+
+    def __init__(self, use_case: str = "default"):
+        self._use_case = use_case
+        self._cache: dict[str, AsyncRepository] = {}
+
+    def __getattr__(self, name: str) -> AsyncRepository:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        repo = self._cache.get(name)
+        if repo is None:
+            repo = self._cache[name] = AsyncRepository(name, self._use_case)
+        return repo
+
+
+repos = Repositories()
+# Read-mostly traffic that may be served from secondaries when configured.
+search_repos = Repositories("search")
+analytics_repos = Repositories("analytics")
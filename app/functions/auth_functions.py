@@ -97,21 +97,9 @@ def _password_reset_collection():
 
 
 def _ensure_password_reset_indexes():  # idempotent
-    try:
-        _password_reset_collection().create_index(
-            [
-                ("email", 1),
-                ("expires_at", 1),
-            ]
-        )
-        # TTL index (expire whole doc after expiry) – cannot depend on conditional, so we store expires_at and use expireAfterSeconds
-        _password_reset_collection().create_index("expires_at", expireAfterSeconds=0)
-        _password_reset_collection().create_index("reset_token", unique=True, sparse=True)
-    except Exception:
-        pass
-
-
-_ensure_password_reset_indexes()
+    # Declared in app.indexes (including the expires_at TTL); reconciled at startup
+    from app.indexes import reconcile_indexes
+    reconcile_indexes(["password_reset_tokens"])
 
 
 def _hash_otp(otp: str) -> str:
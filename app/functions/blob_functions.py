@@ -0,0 +1,328 @@
+"""Content-addressed, reference-counted file storage on top of GridFS.
+
+`put_blob` / `store_upload` store each distinct file (by SHA-256) once:
+fs.files carries `sha256` and `refs`, and uploading bytes that are already
+stored only bumps `refs` and returns the existing id. Uploads are streamed
+into GridFS in chunks, never read into memory whole. Every document that
+points at a blob holds one reference; `add_blob_ref` adds one for a second
+pointer to the same id and `release_blob` drops one instead of deleting it.
+An upload whose id is only saved by a later request (the onboarding logo) is
+stored with `take_ref=False`: it starts unreferenced, and the request that
+saves the id takes the reference with `add_blob_ref`.
+
+A blob whose count reaches zero is stamped `unreferenced_at` and removed by
+`sweep_unreferenced_blobs` (scheduler, every BLOB_GC_INTERVAL_SECONDS) once
+BLOB_GC_GRACE_SECONDS have passed. Before deleting, the sweep checks every
+field in BLOB_REFERENCES; a blob still referenced (a lost increment, or a
+file uploaded before counting existed) gets its count restored instead.
+
+    python -m app.functions.blob_functions recount   # rebuild refs from BLOB_REFERENCES
+    python -m app.functions.blob_functions gc [--dry-run]
+    python -m app.functions.blob_functions types     # copy content types onto pre-existing photo/logo documents
+"""
+import argparse
+import hashlib
+from io import BytesIO
+import json
+import logging
+import threading
+import time
+from datetime import timedelta
+from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
+from gridfs.errors import FileExists
+from pymongo.errors import DuplicateKeyError
+from fastapi.concurrency import run_in_threadpool
+from app.config.settings import BLOB_GC_GRACE_SECONDS, BLOB_GC_BATCH_SIZE, UPLOAD_CHUNK_SIZE_KB
+from app.db import db, gfs
+from app.utils.timezone_utils import get_ist_now
+
+logger = logging.getLogger(__name__)
+
+# (collection, field) pairs that hold blob ids, either as ObjectId or as its string form
+BLOB_REFERENCES = [
+    ("applications", "resume_file_id"),
+    ("deleted_applications", "resume_file_id"),
+    ("resumes", "file_id"),
+    ("temp_resume", "file_id"),
+    ("companies", "logo"),
+    ("users", "profile_photo_id"),
+    ("users", "cover_photo_id"),
+]
+
+# Photo/logo references and the field holding the uploader's content type next to them
+# (applications, resumes and temp_resume have always stored theirs)
+BLOB_CONTENT_TYPE_FIELDS = [
+    ("companies", "logo", "logo_content_type"),
+    ("users", "profile_photo_id", "profile_photo_content_type"),
+    ("users", "cover_photo_id", "cover_photo_content_type"),
+]
+
+_sweep_lock = threading.Lock()
+
+
+class UploadTooLarge(ValueError):
+    def __init__(self, max_bytes: int):
+        super().__init__(f"File is larger than {max_bytes / (1024 * 1024):.3g} MB")
+        self.max_bytes = max_bytes
+
+
+def _oid(file_id):
+    if isinstance(file_id, ObjectId):
+        return file_id
+    return ObjectId(file_id) if file_id and ObjectId.is_valid(file_id) else None
+
+
+def _reuse_blob(digest: str, take_ref: bool = True):
+    """Take a reference to the stored blob with this hash; None when there is none.
+
+    Without `take_ref` an unreferenced blob only has its grace period restarted.
+    """
+    if take_ref:
+        existing = db.fs.files.find_one_and_update(
+            {"sha256": digest}, {"$inc": {"refs": 1}, "$unset": {"unreferenced_at": ""}},
+            projection={"_id": 1}, return_document=ReturnDocument.AFTER,
+        )
+    else:
+        existing = db.fs.files.find_one_and_update(
+            {"sha256": digest, "unreferenced_at": {"$exists": True}}, {"$set": {"unreferenced_at": get_ist_now()}},
+            projection={"_id": 1},
+        ) or db.fs.files.find_one({"sha256": digest}, {"_id": 1})
+    return existing["_id"] if existing else None
+
+
+def _chunks(stream, max_bytes: int):
+    size = 0
+    while True:
+        chunk = stream.read(UPLOAD_CHUNK_SIZE_KB * 1024)
+        if not chunk:
+            return
+        size += len(chunk)
+        if max_bytes and size > max_bytes:
+            raise UploadTooLarge(max_bytes)
+        yield chunk
+
+
+def put_blob_stream(stream, filename: str = None, content_type: str = None, max_bytes: int = 0, keep_bytes: int = 0,
+                    take_ref: bool = True, **metadata) -> dict:
+    """Store a file-like object chunk by chunk (or reuse the identical stored blob) and take one reference.
+
+    At most `keep_bytes` of the content is held in memory and returned as "head"
+    ("complete" when that is the whole file). Seekable streams are hashed in a
+    first pass, so a duplicate costs no GridFS writes; others are hashed on the fly.
+    Raises UploadTooLarge past `max_bytes` without leaving chunks behind.
+    With `take_ref=False` the blob is left unreferenced (collectable by the GC
+    sweep) until a document that stores its id calls `add_blob_ref`.
+    """
+    head = bytearray()
+    size = 0
+    if stream.seekable():
+        start = stream.tell()
+        hasher = hashlib.sha256()
+        for chunk in _chunks(stream, max_bytes):
+            hasher.update(chunk)
+            size += len(chunk)
+            if len(head) < keep_bytes:
+                head += chunk[:keep_bytes - len(head)]
+        digest = hasher.hexdigest()
+        file_id = _reuse_blob(digest, take_ref)
+        if file_id:
+            return {"file_id": file_id, "sha256": digest, "size": size, "head": bytes(head), "complete": size <= keep_bytes}
+        stream.seek(start)
+        head, size = bytearray(), 0
+    hasher = hashlib.sha256()
+    grid_in = gfs.new_file(filename=filename, content_type=content_type, **metadata)
+    try:
+        for chunk in _chunks(stream, max_bytes):
+            hasher.update(chunk)
+            size += len(chunk)
+            if len(head) < keep_bytes:
+                head += chunk[:keep_bytes - len(head)]
+            grid_in.write(chunk)
+    except BaseException:
+        grid_in.abort()
+        raise
+    digest = hasher.hexdigest()
+    result = {"sha256": digest, "size": size, "head": bytes(head), "complete": size <= keep_bytes}
+    file_id = _reuse_blob(digest, take_ref)
+    if file_id:
+        grid_in.abort()
+        return {"file_id": file_id, **result}
+    grid_in.sha256 = digest
+    grid_in.refs = 1 if take_ref else 0
+    if not take_ref:
+        grid_in.unreferenced_at = get_ist_now()
+    try:
+        grid_in.close()
+    except (DuplicateKeyError, FileExists):
+        # The same content was stored concurrently: drop our chunks and reference theirs
+        db.fs.chunks.delete_many({"files_id": grid_in._id})
+        file_id = _reuse_blob(digest, take_ref)
+        if not file_id:
+            raise RuntimeError(f"Could not store blob {digest}")
+        return {"file_id": file_id, **result}
+    return {"file_id": grid_in._id, **result}
+
+
+def put_blob(data: bytes, filename: str = None, content_type: str = None, **metadata) -> ObjectId:
+    """Store `data` (or reuse the identical stored blob) and take one reference to it."""
+    return put_blob_stream(BytesIO(data), filename, content_type, **metadata)["file_id"]
+
+
+async def store_upload(upload, max_bytes: int, keep_bytes: int = 0, take_ref: bool = True, **metadata) -> dict:
+    """Stream a FastAPI UploadFile into the blob store (see put_blob_stream) without reading it into memory.
+
+    The result also carries this upload's "filename" and "content_type": store
+    them on the referencing document, since a reused blob keeps the first uploader's.
+    """
+    if max_bytes and upload.size is not None and upload.size > max_bytes:
+        raise UploadTooLarge(max_bytes)
+    await upload.seek(0)
+    stored = await run_in_threadpool(
+        put_blob_stream, upload.file, upload.filename, upload.content_type, max_bytes, keep_bytes, take_ref, **metadata,
+    )
+    return {**stored, "filename": upload.filename, "content_type": upload.content_type}
+
+
+async def read_upload(upload, max_bytes: int) -> bytes:
+    """Read an UploadFile that is needed in memory, failing as soon as it passes `max_bytes`."""
+    if upload.size is not None and upload.size > max_bytes:
+        raise UploadTooLarge(max_bytes)
+    data = await upload.read(max_bytes + 1)
+    if len(data) > max_bytes:
+        raise UploadTooLarge(max_bytes)
+    return data
+
+
+def add_blob_ref(file_id):
+    """Take another reference to an already stored blob (a second document pointing at it)."""
+    oid = _oid(file_id)
+    if oid:
+        db.fs.files.update_one({"_id": oid}, {"$inc": {"refs": 1}, "$unset": {"unreferenced_at": ""}})
+
+
+def release_blob(file_id):
+    """Drop one reference; at zero the blob is left for the GC sweep (never deleted inline)."""
+    oid = _oid(file_id)
+    if not oid:
+        return
+    db.fs.files.update_one({"_id": oid, "refs": {"$gt": 0}}, {"$inc": {"refs": -1}})
+    # Stamp blobs that hit zero, and pre-refcount blobs (no `refs`) on their first release
+    db.fs.files.update_one(
+        {"_id": oid, "refs": {"$not": {"$gt": 0}}, "unreferenced_at": {"$exists": False}},
+        {"$set": {"refs": 0, "unreferenced_at": get_ist_now()}},
+    )
+
+
+def get_blob(file_id):
+    """GridOut for a blob id (str or ObjectId); raises gridfs.NoFile when missing."""
+    return gfs.get(_oid(file_id) or file_id)
+
+
+def count_references(file_id) -> int:
+    oid = _oid(file_id)
+    values = [oid, str(oid)]
+    return sum(db[coll].count_documents({field: {"$in": values}}) for coll, field in BLOB_REFERENCES)
+
+
+def sweep_unreferenced_blobs(grace_seconds: int = BLOB_GC_GRACE_SECONDS, batch_size: int = BLOB_GC_BATCH_SIZE, dry_run: bool = False):
+    """Delete blobs unreferenced for longer than `grace_seconds`; runs never overlap."""
+    if not _sweep_lock.acquire(blocking=False):
+        return {"deleted": 0, "restored": 0, "skipped": True}
+    try:
+        started = time.monotonic()
+        cutoff = get_ist_now() - timedelta(seconds=grace_seconds)
+        candidates = db.fs.files.find(
+            {"refs": {"$lte": 0}, "unreferenced_at": {"$lt": cutoff}}, {"_id": 1, "length": 1}, limit=batch_size,
+        )
+        deleted = restored = freed = 0
+        for doc in candidates:
+            refs = count_references(doc["_id"])
+            if refs:
+                restored += 1
+                if not dry_run:
+                    db.fs.files.update_one({"_id": doc["_id"]}, {"$set": {"refs": refs}, "$unset": {"unreferenced_at": ""}})
+                continue
+            if dry_run:
+                deleted += 1
+                freed += doc.get("length", 0)
+                continue
+            # Conditional on refs so a concurrent put_blob that re-used the blob wins
+            if db.fs.files.delete_one({"_id": doc["_id"], "refs": {"$lte": 0}}).deleted_count:
+                db.fs.chunks.delete_many({"files_id": doc["_id"]})
+                deleted += 1
+                freed += doc.get("length", 0)
+        if deleted or restored:
+            logger.info("Blob sweep: deleted %s (%s bytes), restored %s in %.3fs", deleted, freed, restored, time.monotonic() - started)
+        return {"deleted": deleted, "restored": restored, "freed_bytes": freed, "skipped": False}
+    finally:
+        _sweep_lock.release()
+
+
+def recount_blob_refs(dry_run: bool = False):
+    """Rebuild `refs` for every blob from BLOB_REFERENCES (one-off migration / repair)."""
+    counts = {}
+    for coll, field in BLOB_REFERENCES:
+        for row in db[coll].aggregate([{"$match": {field: {"$nin": [None, ""]}}}, {"$group": {"_id": f"${field}", "n": {"$sum": 1}}}]):
+            oid = _oid(row["_id"])
+            if oid:
+                counts[oid] = counts.get(oid, 0) + row["n"]
+    now = get_ist_now()
+    ops, changed, unreferenced = [], 0, 0
+    for doc in db.fs.files.find({}, {"_id": 1, "refs": 1, "unreferenced_at": 1}):
+        refs = counts.get(doc["_id"], 0)
+        if refs == doc.get("refs") and bool(refs) != ("unreferenced_at" in doc):
+            continue
+        changed += 1
+        if refs:
+            ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"refs": refs}, "$unset": {"unreferenced_at": ""}}))
+        else:
+            unreferenced += 1
+            ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"refs": 0, "unreferenced_at": doc.get("unreferenced_at") or now}}))
+        if len(ops) >= 1000:
+            if not dry_run:
+                db.fs.files.bulk_write(ops, ordered=False)
+            ops = []
+    if ops and not dry_run:
+        db.fs.files.bulk_write(ops, ordered=False)
+    return {"changed": changed, "unreferenced": unreferenced}
+
+
+def backfill_content_types(dry_run: bool = False):
+    """Set BLOB_CONTENT_TYPE_FIELDS on documents saved before they existed, from the blob's own content type.
+
+    Content types follow the bytes, so the first uploader's value is right for
+    every reference; filenames are not copied (they are the first uploader's).
+    """
+    updated = 0
+    for coll, field, type_field in BLOB_CONTENT_TYPE_FIELDS:
+        ops = []
+        for doc in db[coll].find({field: {"$nin": [None, ""]}, type_field: {"$exists": False}}, {field: 1}):
+            oid = _oid(doc[field])
+            blob = db.fs.files.find_one({"_id": oid}, {"contentType": 1}) if oid else None
+            if blob and blob.get("contentType"):
+                ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": {type_field: blob["contentType"]}}))
+            if len(ops) >= 1000:
+                updated += len(ops)
+                if not dry_run:
+                    db[coll].bulk_write(ops, ordered=False)
+                ops = []
+        updated += len(ops)
+        if ops and not dry_run:
+            db[coll].bulk_write(ops, ordered=False)
+    return {"updated": updated}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Blob reference maintenance")
+    parser.add_argument("command", choices=["recount", "gc", "types"])
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--grace-seconds", type=int, default=BLOB_GC_GRACE_SECONDS)
+    args = parser.parse_args()
+    if args.command == "recount":
+        result = recount_blob_refs(dry_run=args.dry_run)
+    elif args.command == "types":
+        result = backfill_content_types(dry_run=args.dry_run)
+    else:
+        result = sweep_unreferenced_blobs(args.grace_seconds, dry_run=args.dry_run)
+    print(json.dumps(result, indent=2))
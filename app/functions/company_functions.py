@@ -24,6 +24,9 @@ def get_company_by_id(company_id: str):
         company.pop("_id", None)  # Remove MongoDB's internal _id field
         return company
 
+def get_company_by_logo(logo_id: str):
+    return db.companies.find_one({"logo": logo_id}, {"_id": 0, "company_id": 1, "logo_content_type": 1})
+
 def get_all_companies():
     companies = list(db.companies.find({}, {
         "_id": 0, 
@@ -1,11 +1,21 @@
-from app.db import db
+from app.db import db, async_client, repos, search_repos, analytics_repos
 import uuid
+import base64
+import json
+import logging
+import threading
+import time
 from datetime import datetime, timedelta, timezone
 from bson import ObjectId
-from app.config.settings import BASE_URL 
-from app.utils.timezone_utils import get_ist_now, IST, ist_to_utc 
+from pymongo import ReplaceOne, ReturnDocument
+from pymongo.errors import BulkWriteError, OperationFailure
+from app.config.settings import BASE_URL, JOB_PAGE_SIZE_DEFAULT, JOB_PAGE_SIZE_MAX, JOB_EXPIRY_MODE, JOB_EXPIRY_SWEEP_INTERVAL_SECONDS, EXPIRED_JOBS_BATCH_SIZE, JOB_REMOVAL_BATCH_SIZE, JOB_REMOVAL_USE_TRANSACTION, JOB_REMOVAL_STALE_SECONDS, JOB_SEARCH_ENGINE, JOB_FACET_LIMIT
+from app.utils.timezone_utils import get_ist_now, IST, ist_to_utc, utc_to_ist
+from app.utils.batch_lookup import fetch_related_async
 
-def create_job(job_data: dict):
+logger = logging.getLogger(__name__)
+
+async def create_job(job_data: dict):
     job_data["job_id"] = str(uuid.uuid4())
     now = get_ist_now()
     validity_days = int(job_data.get("validity_days", 15))
@@ -17,110 +27,287 @@ def create_job(job_data: dict):
     else:
         job_data["expires_at"] = now + timedelta(days=validity_days)
     job_data["status"] = "active"
-    db.jobs.insert_one(job_data)
+    await repos.jobs.insert_one(job_data)
     return {"msg": "Job posted", "job_id": job_data["job_id"]}
 
-def list_jobs():
+# --- Keyset pagination helpers ---
+# Jobs are ordered newest first by (posted_at, job_id); job_id breaks ties between
+# jobs posted in the same millisecond so every page boundary is unambiguous.
+JOB_PAGE_SORT = [("posted_at", -1), ("job_id", -1)]
+
+def encode_cursor(job: dict) -> str:
+    """Opaque token pointing just after `job` in JOB_PAGE_SORT order."""
+    posted_at = job.get("posted_at")
+    payload = {"p": posted_at.isoformat() if isinstance(posted_at, datetime) else posted_at, "j": job.get("job_id")}
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode().rstrip("=")
+
+def decode_cursor(token: str):
+    """Return (posted_at, job_id) from a cursor token; raises ValueError when malformed."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(payload["p"]), str(payload["j"])
+    except Exception:
+        raise ValueError("Invalid pagination cursor")
+
+def _clamp_page_size(limit):
+    if limit is None:
+        return JOB_PAGE_SIZE_DEFAULT
+    return max(1, min(int(limit), JOB_PAGE_SIZE_MAX))
+
+async def _paginate_jobs(filters: dict, limit=None, cursor=None, include_total=True, projection=None):
+    """Fetch one page of jobs matching `filters` using keyset pagination.
+
+    Cost is one indexed range scan of `limit + 1` documents regardless of how deep
+    the page is; `total` is an extra count and can be skipped with include_total=False.
+    """
+    page_size = _clamp_page_size(limit)
+    query = filters
+    if cursor:
+        after = _after_cursor(cursor)
+        query = {"$and": [filters, after]} if filters else after
+    jobs = await search_repos.jobs.find(query, projection or {"_id": 0}, sort=JOB_PAGE_SORT, limit=page_size + 1)
+    total = await search_repos.jobs.count(filters) if include_total else None
+    return _page_result(jobs, page_size, total)
+
+def _after_cursor(cursor: str) -> dict:
+    """Filter selecting jobs strictly after the cursor position in JOB_PAGE_SORT order."""
+    posted_at, job_id = decode_cursor(cursor)
+    return {"$or": [
+        {"posted_at": {"$lt": posted_at}},
+        {"posted_at": posted_at, "job_id": {"$lt": job_id}},
+    ]}
+
+def _page_result(jobs: list, page_size: int, total=None) -> dict:
+    """Build the page response from `page_size + 1` fetched rows (the extra row only signals has_more)."""
+    has_more = len(jobs) > page_size
+    jobs = jobs[:page_size]
+    return {
+        "jobs": jobs,
+        "next_cursor": encode_cursor(jobs[-1]) if has_more and jobs else None,
+        "has_more": has_more,
+        "limit": page_size,
+        "total": total,
+    }
+
+async def list_jobs(limit=None, cursor=None, include_total=True, legacy=False):
+    """List jobs newest first, one keyset page at a time.
+
+    Returns {"jobs", "next_cursor", "has_more", "limit", "total"}; `limit` defaults
+    to JOB_PAGE_SIZE_DEFAULT and is capped at JOB_PAGE_SIZE_MAX. `legacy=True`
+    (without limit/cursor) returns the old unpaginated list of every job.
+    """
     now = get_ist_now()
     # Auto-mark expired jobs before listing
-    _auto_mark_expired(now)
-    two_days_ago = now - timedelta(days=2)
+    await _auto_mark_expired(now)
+    if not legacy or limit is not None or cursor:
+        page = await _paginate_jobs({}, limit, cursor, include_total)
+        page["jobs"] = await _decorate_jobs(page["jobs"], now)
+        return page
     # Newest first
-    jobs = db.jobs.find({}, {"_id": 0}).sort("posted_at", -1)
+    jobs = await search_repos.jobs.find({}, {"_id": 0}, sort=[("posted_at", -1)])
+    return await _decorate_jobs(jobs, now)
+
+async def _decorate_jobs(jobs: list, now):
+    """Add isNew, company name and logo_url to listed jobs."""
+    two_days_ago = now - timedelta(days=2)
+    # One $in query for all companies instead of one lookup per job
+    companies = await fetch_related_async(jobs, "company_id", search_repos.companies, "company_id", {"_id": 0, "company_name": 1, "logo": 1})
     job_list = []
-    for job in jobs:
+    for job in apply_effective_status(jobs, now):
         # Ensure posted_at has timezone info for comparison
         posted_at = job["posted_at"]
         if posted_at.tzinfo is None:
             posted_at = posted_at.replace(tzinfo=IST)
         job["isNew"] = posted_at >= two_days_ago
-        if "company_id" in job:
-            company = db.companies.find_one({"company_id": job["company_id"]}, {"_id": 0, "company_name": 1, "logo": 1})
+        company = companies.get(job.get("company_id"))
         job["company"] = company["company_name"] if company else None
         job["logo_url"] = f"{BASE_URL}/api/company/logo/{company['logo']}" if company and "logo" in company else None
         job_list.append(job)
     return job_list
 
-def get_job_by_title(title: str):
-    _auto_mark_expired(get_ist_now())
-    return db.jobs.find_one({"title": title}, {"_id": 0})
+async def get_job_by_title(title: str):
+    now = get_ist_now()
+    await _auto_mark_expired(now)
+    job = await search_repos.jobs.find_one({"title": title}, {"_id": 0})
+    return apply_effective_status(job, now)
 
-def remove_job(job_id: str, employer_id: str):
-    """Archive a job and cascade archive its applications & interviews.
+# --- Job removal (archive + cascade) ---
+async def remove_job(job_id: str, employer_id: str):
+    """Archive a job and cascade archive its applications & interviews, inline.
+
+    Same result shape as before; the cascade itself streams in bounded
+    batches (see run_job_removal). Large jobs should go through
+    start_job_removal + run_job_removal as a background task instead.
+    """
+    removal = await start_job_removal(job_id, employer_id)
+    if "removal_id" not in removal:
+        return removal
+    removal = await run_job_removal(removal["removal_id"])
+    if removal.get("status") == "running":
+        return {"msg": "Job removal already in progress", "removal_id": removal["removal_id"]}
+    if removal.get("status") != "completed":
+        return {"msg": "Failed to archive job", "removal_id": removal.get("removal_id"), "error": removal.get("error")}
+    return {"msg": "Job deleted and archived", "applications_archived": removal["applications_archived"], "interviews_archived": removal["interviews_archived"]}
+
+async def owns_job(job_id: str, employer_id: str) -> bool:
+    """Whether `employer_id` posted this job (live or expired)."""
+    query = {"job_id": job_id, "employer_id": employer_id}
+    return bool(await repos.jobs.find_one(query, {"_id": 1}) or await repos.expired_jobs.find_one(query, {"_id": 1}))
+
+async def count_job_dependents(job_id: str):
+    return await repos.applications.count({"job_id": job_id}), await repos.interviews.count({"job_id": job_id})
+
+async def start_job_removal(job_id: str, employer_id: str):
+    """Archive the job document, take it off the live collections and create a job_removals record.
 
     Steps:
     1. Fetch job (must belong to employer)
     2. Copy job doc to deleted_jobs with metadata (deleted_at, original_status)
-    3. Copy related applications -> deleted_applications (add deleted_at)
-    4. Copy related interviews -> deleted_interviews (add deleted_at)
-    5. Delete originals from live collections
+    3. Delete it from jobs / expired_jobs so it disappears immediately
+    4. Record a 'pending' removal; run_job_removal archives the dependents
+
+    If the job is already gone but an earlier removal did not finish, that
+    removal is returned again so the cascade can be resumed (run_job_removal
+    decides whether it may run; one that is still "running" is left alone).
     """
-    job = db.jobs.find_one({"job_id": job_id, "employer_id": employer_id})
+    job = await repos.jobs.find_one({"job_id": job_id, "employer_id": employer_id})
     if not job:
         # Fallback: if it was expired and moved, try expired_jobs collection
-        job = db.expired_jobs.find_one({"job_id": job_id, "employer_id": employer_id})
-        if not job:
-            return {"msg": "Job not found or unauthorized"}
+        job = await repos.expired_jobs.find_one({"job_id": job_id, "employer_id": employer_id})
+    if not job:
+        unfinished = await repos.job_removals.find_one(
+            {"job_id": job_id, "employer_id": employer_id, "status": {"$in": ["pending", "running", "failed"]}},
+            {"_id": 0},
+        )
+        return unfinished or {"msg": "Job not found or unauthorized"}
     now = get_ist_now()
-    # Related data
-    applications = list(db.applications.find({"job_id": job_id}))
-    interviews = list(db.interviews.find({"job_id": job_id}))
+    applications_count, interviews_count = await count_job_dependents(job_id)
 
-    # Prepare archival copies (strip _id to avoid clashes)
+    # Prepare archival copy (strip _id to avoid clashes)
     job_copy = {k: v for k, v in job.items() if k != "_id"}
     job_copy.update({
         "deleted_at": now,
         "original_status": job.get("status"),
-        "archived_applications_count": len(applications),
-        "archived_interviews_count": len(interviews),
-    "status": "deleted",
+        "archived_applications_count": applications_count,
+        "archived_interviews_count": interviews_count,
+        "status": "deleted",
     })
     try:
-        db.deleted_jobs.insert_one(job_copy)
+        await repos.deleted_jobs.insert_one(job_copy)
     except Exception:
         # If insertion fails, abort to avoid data loss
         return {"msg": "Failed to archive job"}
+    await repos.jobs.delete_one({"job_id": job_id})
+    await repos.expired_jobs.delete_one({"job_id": job_id})
 
-    if applications:
-        archived_apps = []
-        for app in applications:
-            app_copy = {k: v for k, v in app.items() if k != "_id"}
-            app_copy["deleted_at"] = now
-            archived_apps.append(app_copy)
-        try:
-            db.deleted_applications.insert_many(archived_apps)
-        except Exception:
-            pass  # Non-fatal; originals will still be deleted
-    if interviews:
-        archived_interviews = []
-        for iv in interviews:
-            iv_copy = {k: v for k, v in iv.items() if k != "_id"}
-            iv_copy["deleted_at"] = now
-            archived_interviews.append(iv_copy)
-        try:
-            db.deleted_interviews.insert_many(archived_interviews)
-        except Exception:
-            pass
+    removal = {
+        "removal_id": str(uuid.uuid4()),
+        "job_id": job_id,
+        "employer_id": employer_id,
+        "status": "pending",
+        "applications_total": applications_count,
+        "interviews_total": interviews_count,
+        "applications_archived": 0,
+        "interviews_archived": 0,
+        "created_at": now,
+    }
+    await repos.job_removals.insert_one(removal)
+    removal.pop("_id", None)
+    return removal
 
-    # Delete originals
-    db.jobs.delete_one({"job_id": job_id})
-    db.expired_jobs.delete_one({"job_id": job_id})
-    if applications:
-        db.applications.delete_many({"job_id": job_id})
-    if interviews:
-        db.interviews.delete_many({"job_id": job_id})
+async def _archive_in_batches(source, target, filter: dict, deleted_at, batch_size: int, removal_id: str, counter: str):
+    """Move documents matching `filter` from `source` to `target`, `batch_size` at a time.
+
+    Copies keep their original _id, so re-running after an interruption skips
+    rows that were already archived (duplicate key) instead of duplicating them.
+    Each batch adds the number of rows it deleted to the removal's `counter`
+    field, so progress survives a failed run. With JOB_REMOVAL_USE_TRANSACTION
+    each batch's insert + delete + count is atomic.
+    """
+    while True:
+        batch = await source.find(filter, limit=batch_size)
+        if not batch:
+            return
+        for doc in batch:
+            doc["deleted_at"] = deleted_at
+        ids = [doc["_id"] for doc in batch]
+        if JOB_REMOVAL_USE_TRANSACTION:
+            async with await async_client.start_session() as session:
+                async with session.start_transaction():
+                    await _insert_archive_copies(target, batch, session=session)
+                    result = await source.delete_many({"_id": {"$in": ids}}, session=session)
+                    await _record_progress(removal_id, counter, result.deleted_count, session=session)
+        else:
+            await _insert_archive_copies(target, batch)
+            result = await source.delete_many({"_id": {"$in": ids}})
+            await _record_progress(removal_id, counter, result.deleted_count)
 
-    return {"msg": "Job deleted and archived", "applications_archived": len(applications), "interviews_archived": len(interviews)}
+async def _record_progress(removal_id: str, counter: str, moved: int, session=None):
+    await repos.job_removals.update_one(
+        {"removal_id": removal_id}, {"$inc": {counter: moved}, "$set": {"heartbeat_at": get_ist_now()}}, session=session,
+    )
 
-def update_job_visibility(job_id: str, visibility: str, employer_id: str):
+async def _insert_archive_copies(target, docs: list, session=None):
+    try:
+        await target.insert_many(docs, ordered=False, session=session)
+    except BulkWriteError as e:
+        # Duplicate keys mean the copy already exists from an interrupted run
+        if any(err.get("code") != 11000 for err in e.details.get("writeErrors", [])):
+            raise
+
+async def run_job_removal(removal_id: str, batch_size: int = None):
+    """Stream a removal's applications and interviews into the deleted_* collections.
+
+    The run first claims the removal (pending/failed -> running, or a running
+    one with no progress for JOB_REMOVAL_STALE_SECONDS); if another run holds
+    it, the removal is returned unchanged and nothing is archived twice.
+    """
+    now = get_ist_now()
+    removal = await repos.job_removals.find_one_and_update(
+        {"removal_id": removal_id, "$or": [
+            {"status": {"$in": ["pending", "failed"]}},
+            {"status": "running", "heartbeat_at": {"$lt": now - timedelta(seconds=JOB_REMOVAL_STALE_SECONDS)}},
+        ]},
+        {"$set": {"status": "running", "started_at": now, "heartbeat_at": now}, "$unset": {"error": ""}},
+        projection={"_id": 0}, return_document=ReturnDocument.AFTER,
+    )
+    if not removal:
+        return await repos.job_removals.find_one({"removal_id": removal_id}, {"_id": 0}) or {"msg": "Removal not found"}
+    batch_size = max(1, int(batch_size or JOB_REMOVAL_BATCH_SIZE))
+    job_id = removal["job_id"]
+    try:
+        await _archive_in_batches(repos.applications, repos.deleted_applications, {"job_id": job_id}, now, batch_size,
+                                  removal_id, "applications_archived")
+        await _archive_in_batches(repos.interviews, repos.deleted_interviews, {"job_id": job_id}, now, batch_size,
+                                  removal_id, "interviews_archived")
+        removal = await repos.job_removals.find_one({"removal_id": removal_id}, {"_id": 0})
+        await repos.deleted_jobs.update_one(
+            {"job_id": job_id, "employer_id": removal["employer_id"]},
+            {"$set": {
+                "archived_applications_count": removal.get("applications_archived", 0),
+                "archived_interviews_count": removal.get("interviews_archived", 0),
+            }},
+        )
+        update = {"status": "completed", "finished_at": get_ist_now()}
+    except Exception as e:
+        logger.exception("Job removal %s failed", removal_id)
+        update = {"status": "failed", "error": str(e), "finished_at": get_ist_now()}
+    await repos.job_removals.update_one({"removal_id": removal_id}, {"$set": update})
+    return {**removal, **update}
+
+async def get_job_removal(removal_id: str, employer_id: str):
+    return await repos.job_removals.find_one({"removal_id": removal_id, "employer_id": employer_id}, {"_id": 0})
+
+async def update_job_visibility(job_id: str, visibility: str, employer_id: str):
     if visibility not in ["public", "private"]:
         return {"msg": "Invalid visibility option"}
-    result = db.jobs.update_one({"job_id": job_id, "employer_id": employer_id}, {"$set": {"visibility": visibility}})
+    result = await repos.jobs.update_one({"job_id": job_id, "employer_id": employer_id}, {"$set": {"visibility": visibility}})
     if result.modified_count == 1:
         return {"msg": f"Job visibility updated to {visibility}"}
     return {"msg": "Job not found or unauthorized"}
 
-def update_job_details(job_id: str, employer_id: str, update_data: dict):
+async def update_job_details(job_id: str, employer_id: str, update_data: dict):
     # Remove fields that should not be updated
     update_data.pop("job_id", None)
     update_data.pop("employer_id", None)
@@ -132,19 +319,25 @@ def update_job_details(job_id: str, employer_id: str, update_data: dict):
             validity_days = 15
         now = get_ist_now()
         update_data["expires_at"] = now + timedelta(days=validity_days)
-    result = db.jobs.update_one({"job_id": job_id, "employer_id": employer_id}, {"$set": update_data})
+    result = await repos.jobs.update_one({"job_id": job_id, "employer_id": employer_id}, {"$set": update_data})
     if result.modified_count == 1:
         return {"msg": "Job details updated"}
     return {"msg": "Job not found or unauthorized"}
 
-def advanced_search_jobs(query=None, category=None, job_type=None, experience_level=None, min_salary=None, max_salary=None, location=None, industry=None, skills=None):
-    _auto_mark_expired(get_ist_now())
+# --- Search ---
+# Text mode relies on the weighted "jobs_text_search" index declared in app.indexes
+# (title > skills > description, English stemming; quoted terms are phrase matches).
+
+def _search_filters(query=None, use_text=False, category=None, job_type=None, experience_level=None, min_salary=None, max_salary=None, location=None, industry=None, skills=None):
     filters = {}
     if query:
-        filters["$or"] = [
-            {"title": {"$regex": query, "$options": "i"}},
-            {"description": {"$regex": query, "$options": "i"}}
-        ]
+        if use_text:
+            filters["$text"] = {"$search": query}
+        else:
+            filters["$or"] = [
+                {"title": {"$regex": query, "$options": "i"}},
+                {"description": {"$regex": query, "$options": "i"}}
+            ]
     if category:
         filters["category"] = category
     if job_type:
@@ -163,23 +356,159 @@ def advanced_search_jobs(query=None, category=None, job_type=None, experience_le
         filters["industry"] = industry
     if skills:
         filters["skills"] = {"$in": [s.strip() for s in skills.split(",") if s.strip()]}
-    return list(db.jobs.find(filters, {"_id": 0}))
+    return filters
+
+# Facet name (query parameter) -> job field counted for it
+JOB_FACET_FIELDS = {
+    "category": "category",
+    "type": "type",
+    "experience_level": "experience_level",
+    "industry": "industry",
+    "location": "location",
+}
+
+def parse_facets(facets):
+    """Split a comma separated facets parameter; raises ValueError on unknown names."""
+    names = [f.strip() for f in (facets or "").split(",") if f.strip()]
+    unknown = [f for f in names if f not in JOB_FACET_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown facets: {', '.join(unknown)}. Allowed: {', '.join(JOB_FACET_FIELDS)}")
+    return list(dict.fromkeys(names))
+
+async def _faceted_search(filters: dict, use_text: bool, facets: list, limit=None, cursor=None, include_total=True):
+    """One $facet aggregation returning a page of hits, the total and per-facet counts.
+
+    Always paginated: the whole result is a single document, so hits must stay bounded.
+    """
+    page_size = _clamp_page_size(limit)
+    hits = [{"$match": _after_cursor(cursor)}] if cursor else []
+    hits += [{"$sort": dict(JOB_PAGE_SORT)}, {"$limit": page_size + 1}, {"$project": {"_id": 0}}]
+    branches = {"hits": hits}
+    if include_total:
+        branches["total"] = [{"$count": "count"}]
+    for name in facets:
+        field = JOB_FACET_FIELDS[name]
+        branches[f"facet_{name}"] = [
+            {"$match": {field: {"$nin": [None, ""]}}},
+            {"$group": {"_id": f"${field}", "count": {"$sum": 1}}},
+            {"$sort": {"count": -1, "_id": 1}},
+            {"$limit": JOB_FACET_LIMIT},
+        ]
+    pipeline = [{"$match": filters}]
+    if use_text:
+        pipeline.append({"$addFields": {"score": {"$meta": "textScore"}}})
+    pipeline.append({"$facet": branches})
+    result = (await search_repos.jobs.aggregate(pipeline) or [{}])[0]
+    total = (result.get("total") or [{"count": 0}])[0]["count"] if include_total else None
+    page = _page_result(result.get("hits", []), page_size, total)
+    page["facets"] = {
+        name: [{"value": b["_id"], "count": b["count"]} for b in result.get(f"facet_{name}", [])]
+        for name in facets
+    }
+    return page
+
+async def _run_search(filters: dict, use_text: bool, limit=None, cursor=None, include_total=True, facets=None, legacy=False):
+    if facets:
+        return await _faceted_search(filters, use_text, facets, limit, cursor, include_total)
+    projection = {"_id": 0, "score": {"$meta": "textScore"}} if use_text else {"_id": 0}
+    if not legacy or limit is not None or cursor:
+        # Pages stay in (posted_at, job_id) order so cursors are stable; each hit still carries its score
+        return await _paginate_jobs(filters, limit, cursor, include_total, projection)
+    sort = [("score", {"$meta": "textScore"})] if use_text else None
+    return await search_repos.jobs.find(filters, projection, sort=sort)
+
+async def advanced_search_jobs(query=None, category=None, job_type=None, experience_level=None, min_salary=None, max_salary=None, location=None, industry=None, skills=None, limit=None, cursor=None, include_total=True, facets=None, legacy=False):
+    """Filter jobs; paginated like list_jobs (`legacy=True` returns every match unpaginated).
+
+    With JOB_SEARCH_ENGINE="text", `query` goes through the weighted text index
+    and legacy unpaginated results are ordered by relevance. "regex" (or a missing
+    text index) falls back to case-insensitive regex on title/description.
+    `facets` (e.g. "category,type") adds value counts over all matches, computed
+    in the same aggregation as the page of hits; results are then always paginated.
+    """
+    now = get_ist_now()
+    facets = parse_facets(facets)
+    await _auto_mark_expired(now)
+    criteria = dict(category=category, job_type=job_type, experience_level=experience_level, min_salary=min_salary,
+                    max_salary=max_salary, location=location, industry=industry, skills=skills)
+    use_text = bool(query) and JOB_SEARCH_ENGINE == "text"
+    try:
+        result = await _run_search(_search_filters(query, use_text, **criteria), use_text, limit, cursor, include_total, facets, legacy)
+    except OperationFailure as e:
+        if not use_text:
+            raise
+        logger.warning("Text search failed (%s); falling back to regex search", e)
+        result = await _run_search(_search_filters(query, False, **criteria), False, limit, cursor, include_total, facets, legacy)
+    apply_effective_status(result["jobs"] if isinstance(result, dict) else result, now)
+    return result
+
+# Runs on the APScheduler thread, so it stays on the sync client.
+def move_expired_jobs(batch_size: int = None):
+    """Copy expired jobs into expired_jobs in bulk batches and mark them archived.
 
-def move_expired_jobs():
+    Jobs are picked up once their expires_at has passed (whether or not the
+    sweeper already flipped status) and until they carry `expired_archived_at`.
+    Each batch upserts copies by job_id (ordered=False), then marks only the
+    jobs whose copy was written. An interrupted run therefore resumes where it
+    stopped on the next call, and re-running never duplicates archive rows.
+    """
+    batch_size = max(1, int(batch_size or EXPIRED_JOBS_BATCH_SIZE))
+    started = time.monotonic()
     now = get_ist_now()
-    expired_jobs = list(db.jobs.find({"expires_at": {"$lt": now}, "status": "active"}))
-    for job in expired_jobs:
-        job["status"] = "expired"
-        db.expired_jobs.insert_one(job)
-        db.jobs.update_one({"job_id": job["job_id"]}, {"$set": {"status": "expired"}})
-    return {"moved": len(expired_jobs)}
-
-def reactivate_expired_job(job_id: str, employer_id: str, validity_days: int = 15):
+    pending = {
+        "expires_at": {"$lt": now},
+        "status": {"$in": ["active", "expired"]},
+        "expired_archived_at": {"$exists": False},
+    }
+    moved = failed = batches = 0
+    batch_sizes = []
+    last_id = None
+    while True:
+        query = dict(pending, _id={"$gt": last_id}) if last_id is not None else pending
+        batch = list(db.jobs.find(query).sort("_id", 1).limit(batch_size))
+        if not batch:
+            break
+        last_id = batch[-1]["_id"]
+        batches += 1
+        batch_sizes.append(len(batch))
+        ops = []
+        for job in batch:
+            copy = {k: v for k, v in job.items() if k != "_id"}
+            copy["status"] = "expired"
+            copy["expired_archived_at"] = now
+            ops.append(ReplaceOne({"job_id": job["job_id"]}, copy, upsert=True))
+        archived_ids = [job["job_id"] for job in batch]
+        try:
+            db.expired_jobs.bulk_write(ops, ordered=False)
+        except BulkWriteError as e:
+            failed_idx = {err["index"] for err in e.details.get("writeErrors", [])}
+            failed += len(failed_idx)
+            archived_ids = [job_id for i, job_id in enumerate(archived_ids) if i not in failed_idx]
+            logger.warning("move_expired_jobs: %s of %s archive writes failed in batch %s", len(failed_idx), len(batch), batches)
+        if archived_ids:
+            db.jobs.update_many(
+                {"job_id": {"$in": archived_ids}},
+                {"$set": {"status": "expired", "expired_archived_at": now}},
+            )
+            moved += len(archived_ids)
+    duration_ms = round((time.monotonic() - started) * 1000, 1)
+    stats = {
+        "moved": moved,
+        "failed": failed,
+        "batches": batches,
+        "batch_size": batch_size,
+        "largest_batch": max(batch_sizes, default=0),
+        "duration_ms": duration_ms,
+    }
+    logger.info("move_expired_jobs finished: %s", stats)
+    return stats
+
+async def reactivate_expired_job(job_id: str, employer_id: str, validity_days: int = 15):
     """Reactivate an expired job in-place; mark with reactivated flag.
 
     Avoid inserting a duplicate document (previous implementation inserted a new doc).
     """
-    job = db.jobs.find_one({"job_id": job_id, "employer_id": employer_id})
+    job = await repos.jobs.find_one({"job_id": job_id, "employer_id": employer_id})
     if not job:
         return {"msg": "Job not found or unauthorized"}
     if job.get("status") != "expired":
@@ -191,35 +520,37 @@ def reactivate_expired_job(job_id: str, employer_id: str, validity_days: int = 1
         "expires_at": now + timedelta(days=validity_days),
         "reactivated": True
     }
-    db.jobs.update_one({"job_id": job_id, "employer_id": employer_id}, {"$set": update_fields})
+    # Clearing the archive marker lets move_expired_jobs archive it again when it next expires
+    await repos.jobs.update_one({"job_id": job_id, "employer_id": employer_id}, {"$set": update_fields, "$unset": {"expired_archived_at": ""}})
     # Clean up any archived copy in expired_jobs collection
-    db.expired_jobs.delete_one({"job_id": job_id, "employer_id": employer_id})
+    await repos.expired_jobs.delete_one({"job_id": job_id, "employer_id": employer_id})
     return {"msg": "Job reactivated", "job_id": job_id}
 
-def list_companies():
-    companies = db.companies.find({}, {"_id": 0})
+async def list_companies():
+    companies = await repos.companies.find({}, {"_id": 0})
     for company in companies:
         company["logo_url"] = f"{BASE_URL}/api/company/logo/{company['logo']}"
-    return list(companies)
+    return companies
 
-def add_company(company_data: dict, employer_id: str):
+async def add_company(company_data: dict, employer_id: str):
     company_data["company_id"] = str(uuid.uuid4())
     company_data["employer_id"] = employer_id
-    db.companies.insert_one(company_data)
+    await repos.companies.insert_one(company_data)
     return {"msg": "Company added", "company_id": company_data["company_id"]}
 
-def get_popular_job_categories():
+async def get_popular_job_categories():
     pipeline = [
         {"$group": {"_id": "$job_category", "count": {"$sum": 1}}}, 
         {"$sort": {"count": -1}}, 
         {"$project": {"name": "$_id", "count": 1, "_id": 0}}
     ]
-    return {"categories": list(db.jobs.aggregate(pipeline))}
+    return {"categories": await analytics_repos.jobs.aggregate(pipeline)}
     
-def get_jobs_by_company(company_id: str):
-    _auto_mark_expired(get_ist_now())
-    company_jobs = db.jobs.find({"company_id": company_id}, {"_id": 0})
-    logo_id = db.companies.find_one({"company_id": company_id}, {"logo": 1}).get("logo")
+async def get_jobs_by_company(company_id: str):
+    now = get_ist_now()
+    await _auto_mark_expired(now)
+    company_jobs = apply_effective_status(await search_repos.jobs.find({"company_id": company_id}, {"_id": 0}), now)
+    logo_id = (await search_repos.companies.find_one({"company_id": company_id}, {"logo": 1}) or {}).get("logo")
         
     if not company_jobs:
         return {"msg": "No jobs found for this company"}
@@ -227,19 +558,71 @@ def get_jobs_by_company(company_id: str):
         job.pop("_id", None)
         job["logo_url"] = f"{BASE_URL}/api/company/logo/{logo_id}"
         
-    return list(company_jobs)
+    return company_jobs
+
+# --- Automatic expiration helpers ---
+def is_expired(job: dict, now=None) -> bool:
+    """True when an active job's expires_at has passed (stored datetimes come back as naive UTC)."""
+    if not job or job.get("status") != "active":
+        return False
+    expires_at = job.get("expires_at")
+    if not isinstance(expires_at, datetime):
+        return False
+    return utc_to_ist(expires_at) < (now or get_ist_now())
+
+def apply_effective_status(jobs, now=None):
+    """Report status as of `now` on fetched job(s) without writing to the database.
+
+    Accepts a single job dict, a list of jobs, or None and returns it unchanged in shape.
+    """
+    now = now or get_ist_now()
+    for job in (jobs if isinstance(jobs, list) else [jobs] if jobs else []):
+        if is_expired(job, now):
+            job["status"] = "expired"
+    return jobs
+
+def active_jobs_filter(now=None, **extra) -> dict:
+    """Mongo filter for jobs that are active as of `now`, even if the sweep hasn't flipped them yet."""
+    return {"status": "active", "expires_at": {"$not": {"$lt": now or get_ist_now()}}, **extra}
+
+_sweep_lock = threading.Lock()
+_last_sweep = 0.0
+
+def sweep_expired_jobs(force: bool = False):
+    """Flip active jobs past expires_at to 'expired' with a single update_many.
+
+    Runs on the scheduler thread every JOB_EXPIRY_SWEEP_INTERVAL_SECONDS. Extra
+    calls within half an interval of the last run are skipped (unless forced),
+    and runs never overlap.
+    """
+    global _last_sweep
+    if not _sweep_lock.acquire(blocking=False):
+        return {"expired": 0, "skipped": True}
+    try:
+        started = time.monotonic()
+        if not force and _last_sweep and started - _last_sweep < JOB_EXPIRY_SWEEP_INTERVAL_SECONDS / 2:
+            return {"expired": 0, "skipped": True}
+        _last_sweep = started
+        result = db.jobs.update_many({"status": "active", "expires_at": {"$lt": get_ist_now()}}, {"$set": {"status": "expired"}})
+        if result.modified_count:
+            logger.info("Expired %s jobs in %.3fs", result.modified_count, time.monotonic() - started)
+        return {"expired": result.modified_count, "skipped": False}
+    finally:
+        _sweep_lock.release()
 
-# --- Automatic expiration helper ---
-def _auto_mark_expired(now=None):
-    """Update status to 'expired' for any active jobs whose expires_at has passed.
+async def _auto_mark_expired(now=None):
+    """Legacy write-on-read expiry (JOB_EXPIRY_MODE="on_read").
 
-    This function is idempotent and cheap (single update_many). Call it at the
-    start of read paths to ensure clients see fresh status without a cron.
+    Updates status to 'expired' for any active jobs whose expires_at has passed.
+    In the default "read_time" mode this is a no-op: reads use
+    apply_effective_status and sweep_expired_jobs persists the flip.
     """
+    if JOB_EXPIRY_MODE != "on_read":
+        return
     if now is None:
         now = get_ist_now()
     try:
-        db.jobs.update_many({"status": "active", "expires_at": {"$lt": now}}, {"$set": {"status": "expired"}})
+        await repos.jobs.update_many({"status": "active", "expires_at": {"$lt": now}}, {"$set": {"status": "expired"}})
     except Exception:
         # Silently ignore to avoid breaking primary flows; optionally log.
         pass
\ No newline at end of file
@@ -1,5 +1,5 @@
 from datetime import datetime
-from app.db import db
+from app.db import repos
 from app.routes.notification import notification_manager, serialize_notification
 from app.utils.email_utils import send_email
 
@@ -12,14 +12,14 @@ async def create_and_send_notification(user_id: str, title: str, message: str, b
         "read": False,
         "time": datetime.utcnow()
     }
-    result = db.notifications.insert_one(notification_data)
+    result = await repos.notifications.insert_one(notification_data)
     notification_data["id"] = str(result.inserted_id)
 
     # Send via WebSocket (if connected)
     await notification_manager.send_notification(user_id, serialize_notification(notification_data))
 
     # Send email (if background_tasks & email exists)
-    user = db.users.find_one({"user_id": user_id})
+    user = await repos.users.find_one({"user_id": user_id})
     if user and user.get("email") and background_tasks:
         subject = f"New Notification: {title}"
         html_body = f"<h3>{title}</h3><p>{message}</p>"
@@ -1,91 +1,50 @@
-from app.db import db
-from gridfs import GridFS
+from app.db import db, gfs
 from bson import ObjectId
 from datetime import datetime
-import pdfplumber
-import docx
-import spacy
-import re
-from io import BytesIO
 from app.utils.timezone_utils import get_ist_now
+from app.functions.blob_functions import put_blob, release_blob
+from app.functions.resume_parser import (  # noqa: F401 - re-exported for existing callers
+    get_nlp, warm_up, extract_text_from_pdf, extract_text_from_docx, extract_email, extract_phone,
+    extract_name, extract_names, extract_skills, extract_education, extract_experience,
+    extract_text, extract_pdf_text, parse_resume, parse_resumes,
+)
 
-gfs = GridFS(db)
-nlp = spacy.load("en_core_web_sm")
+def __getattr__(name):
+    # Backwards compatible `resume_functions.nlp`
+    if name == "nlp":
+        return get_nlp()
+    raise AttributeError(name)
 
-def extract_text_from_pdf(file_bytes):
-    with pdfplumber.open(BytesIO(file_bytes)) as pdf:
-        text = "\n".join(page.extract_text() or '' for page in pdf.pages)
-    return text
+def reparse_stored_resumes(collection="resumes", n_process=1, batch_size=64):
+    """Re-run parsing for every stored resume in `collection` (e.g. after extraction changes)."""
+    coll = db[collection]
+    updated = 0
+    batch = []
+    def flush():
+        results = parse_resumes([(gfs.get(doc["file_id"]).read(), doc.get("content_type")) for doc in batch], n_process, batch_size)
+        for doc, parsed in zip(batch, results):
+            coll.update_one({"_id": doc["_id"]}, {"$set": {"parsed_data": parsed}})
+        return len(batch)
+    for doc in coll.find({"file_id": {"$exists": True}}, {"file_id": 1, "content_type": 1}):
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            updated += flush()
+            batch = []
+    if batch:
+        updated += flush()
+    return updated
 
-def extract_text_from_docx(file_bytes):
-    doc = docx.Document(BytesIO(file_bytes))
-    return "\n".join([p.text for p in doc.paragraphs])
-
-def extract_email(text):
-    match = re.search(r"[\w\.-]+@[\w\.-]+", text)
-    return match.group(0) if match else None
-
-def extract_phone(text):
-    match = re.search(r"(\+?\d{1,3}[\s-]?)?(\(?\d{3}\)?[\s-]?)?\d{3}[\s-]?\d{4}", text)
-    return match.group(0) if match else None
-
-def extract_name(text):
-    doc = nlp(text)
-    for ent in doc.ents:
-        if ent.label_ == "PERSON":
-            return ent.text
-    return None
-
-def extract_skills(text):
-    skills = []
-    lines = text.splitlines()
-    for i, line in enumerate(lines):
-        if 'skill' in line.lower():
-            for l in lines[i+1:i+10]:
-                if l.strip() == '' or len(l.strip()) < 2:
-                    break
-                skills.extend([s.strip() for s in re.split(r",|;|\|", l) if s.strip()])
-            break
-    return list(set(skills))
-
-def extract_education(text):
-    education_keywords = ["bachelor", "master", "phd", "b.sc", "m.sc", "btech", "mtech", "university", "college", "school"]
-    lines = text.splitlines()
-    education = [l for l in lines if any(k in l.lower() for k in education_keywords)]
-    return education
-
-def extract_experience(text):
-    exp_keywords = ["experience", "worked", "company", "role", "position", "employer"]
-    lines = text.splitlines()
-    experience = [l for l in lines if any(k in l.lower() for k in exp_keywords)]
-    return experience
-
-def parse_resume(file_bytes, content_type):
-    if content_type == "application/pdf":
-        text = extract_text_from_pdf(file_bytes)
-    elif content_type in ["application/vnd.openxmlformats-officedocument.wordprocessingml.document", "application/msword"]:
-        text = extract_text_from_docx(file_bytes)
-    else:
-        return {"error": "Unsupported file type"}
-    return {
-        "name": extract_name(text),
-        "email": extract_email(text),
-        "phone": extract_phone(text),
-        "skills": extract_skills(text),
-        "education": extract_education(text),
-        "experience": extract_experience(text),
-        "raw_text": text
-    }
-
-# Upload resume
-def upload_resume(user_id: str, file, filename: str, content_type: str):
+# Upload resume (`file_id`: the file is already in the blob store and this takes over its reference)
+def upload_resume(user_id: str, file, filename: str, content_type: str, parsed_data: dict = None, file_id=None):
     # Remove old resume if exists
     old = db.resumes.find_one({"user_id": user_id})
     if old:
-        gfs.delete(old["file_id"])
+        release_blob(old["file_id"])
         db.resumes.delete_one({"user_id": user_id})
-    file_id = gfs.put(file, filename=filename, content_type=content_type, upload_date=get_ist_now())
-    parsed_data = parse_resume(file, content_type)
+    if file_id is None:
+        file_id = put_blob(file, filename=filename, content_type=content_type, upload_date=get_ist_now())
+    if parsed_data is None:
+        parsed_data = parse_resume(file, content_type)
     db.resumes.insert_one({
         "user_id": user_id,
         "file_id": file_id,
@@ -104,13 +63,17 @@ def get_resume(user_id: str):
     file = gfs.get(meta["file_id"])
     return file, meta
 
+# Resume metadata only (file routes stream the blob themselves)
+def get_resume_meta(user_id: str):
+    return db.resumes.find_one({"user_id": user_id})
+
 # Delete resume
 def delete_resume(user_id: str):
     meta = db.resumes.find_one({"user_id": user_id})
     if not meta:
         return False
-    gfs.delete(meta["file_id"])
     db.resumes.delete_one({"user_id": user_id})
+    release_blob(meta["file_id"])
     return True
 
 # List all resumes (admin/HR)
@@ -0,0 +1,216 @@
+"""Resume text extraction and field parsing.
+
+Pure functions with no database access, so they can run in parse-engine
+worker processes (app.utils.parse_engine) without opening Mongo clients.
+"""
+import re
+import threading
+from io import BytesIO
+from app.config.settings import (
+    RESUME_NLP_MODEL, RESUME_NLP_EXCLUDE, RESUME_NER_MAX_CHARS, RESUME_PDF_ENGINE, RESUME_PDF_MAX_PAGES,
+    RESUME_PDF_MIN_CHARS_PER_PAGE,
+)
+
+# Identifies the extraction logic behind a parse result; cached results (app.utils.parse_cache)
+# from another version are ignored. Bump PARSER_REVISION whenever extraction output changes.
+PARSER_REVISION = 2
+PARSER_VERSION = f"{PARSER_REVISION}:{RESUME_NLP_MODEL}:{RESUME_NER_MAX_CHARS}:{RESUME_PDF_ENGINE}:{RESUME_PDF_MAX_PAGES}"
+
+# spaCy, pdfplumber and python-docx are imported on first use: loading them costs
+# seconds and most processes (and serverless cold starts) never parse a resume.
+_nlp = None
+_nlp_lock = threading.Lock()
+
+def get_nlp():
+    """Load the spaCy model once, on first use (thread-safe).
+
+    Only NER is needed, so the tagger/parser/lemmatizer etc. are excluded
+    (RESUME_NLP_EXCLUDE) - they are never loaded into memory.
+    """
+    global _nlp
+    if _nlp is None:
+        with _nlp_lock:
+            if _nlp is None:
+                import spacy
+                _nlp = spacy.load(RESUME_NLP_MODEL, exclude=[c.strip() for c in RESUME_NLP_EXCLUDE.split(",") if c.strip()])
+    return _nlp
+
+def warm_up():
+    """Load the NLP model and document parsers now instead of on the first parse."""
+    get_nlp()
+    import pypdfium2, pdfplumber, docx  # noqa: F401
+
+def __getattr__(name):
+    # Backwards compatible `resume_functions.nlp`
+    if name == "nlp":
+        return get_nlp()
+    raise AttributeError(name)
+
+def _pdf_text_pdfium(file_bytes, max_pages):
+    """(text, pages read, page count) via pdfium's text layer - no layout analysis."""
+    import pypdfium2
+    pdf = pypdfium2.PdfDocument(file_bytes)
+    try:
+        page_count = len(pdf)
+        texts = []
+        for index in range(min(page_count, max_pages)):
+            page = pdf[index]
+            textpage = page.get_textpage()
+            texts.append(textpage.get_text_bounded().replace("\r\n", "\n").replace("\r", "\n"))
+            textpage.close()
+            page.close()
+    finally:
+        pdf.close()
+    return "\n".join(texts), len(texts), page_count
+
+def _pdf_text_pdfplumber(file_bytes, max_pages):
+    """(text, pages read, page count) via pdfplumber's character layout analysis (slow)."""
+    import pdfplumber
+    texts = []
+    with pdfplumber.open(BytesIO(file_bytes)) as pdf:
+        page_count = len(pdf.pages)
+        for page in pdf.pages[:max_pages]:
+            texts.append(page.extract_text() or '')
+            page.close()  # drop the page's parsed objects as we go
+    return "\n".join(texts), len(texts), page_count
+
+PDF_ENGINES = {"pdfium": _pdf_text_pdfium, "pdfplumber": _pdf_text_pdfplumber}
+
+def _needs_fallback(text, pages):
+    """pdfium text that is missing, too sparse or full of unmapped glyphs (custom font encodings)."""
+    stripped = "".join(text.split())
+    if len(stripped) < RESUME_PDF_MIN_CHARS_PER_PAGE * max(pages, 1):
+        return True
+    return stripped.count("\ufffd") > len(stripped) * 0.05
+
+def extract_pdf_text(file_bytes, engine=None, max_pages=None):
+    """Text of the first `max_pages` pages plus which engine produced it.
+
+    "auto" reads pdfium's text layer (an order of magnitude faster, far less memory)
+    and only falls back to pdfplumber when that text looks unusable or pdfium fails.
+    """
+    engine = engine or RESUME_PDF_ENGINE
+    max_pages = max_pages or RESUME_PDF_MAX_PAGES
+    fallback_reason = None
+    if engine in ("auto", "pdfium"):
+        try:
+            text, pages, page_count = _pdf_text_pdfium(file_bytes, max_pages)
+        except Exception as e:
+            if engine == "pdfium":
+                raise
+            fallback_reason = f"pdfium failed: {e.__class__.__name__}"
+        else:
+            if engine == "pdfium" or not _needs_fallback(text, pages):
+                return text, {"engine": "pdfium", "pages": pages, "page_count": page_count}
+            fallback_reason = "sparse text"
+    text, pages, page_count = _pdf_text_pdfplumber(file_bytes, max_pages)
+    info = {"engine": "pdfplumber", "pages": pages, "page_count": page_count}
+    if fallback_reason:
+        info["fallback_reason"] = fallback_reason
+    return text, info
+
+def extract_text_from_pdf(file_bytes):
+    return extract_pdf_text(file_bytes)[0]
+
+def extract_text_from_docx(file_bytes):
+    import docx
+    doc = docx.Document(BytesIO(file_bytes))
+    return "\n".join([p.text for p in doc.paragraphs])
+
+def extract_email(text):
+    match = re.search(r"[\w\.-]+@[\w\.-]+", text)
+    return match.group(0) if match else None
+
+def extract_phone(text):
+    match = re.search(r"(\+?\d{1,3}[\s-]?)?(\(?\d{3}\)?[\s-]?)?\d{3}[\s-]?\d{4}", text)
+    return match.group(0) if match else None
+
+def _name_window(text):
+    """Head of the resume where the candidate's name appears, cut at a line break."""
+    if not text or len(text) <= RESUME_NER_MAX_CHARS:
+        return text or ""
+    head = text[:RESUME_NER_MAX_CHARS]
+    cut = head.rfind("\n")
+    return head[:cut] if cut > 0 else head
+
+def _first_person(doc):
+    for ent in doc.ents:
+        if ent.label_ == "PERSON":
+            return ent.text
+    return None
+
+def extract_name(text):
+    return _first_person(get_nlp()(_name_window(text)))
+
+def extract_names(texts, n_process=1, batch_size=32):
+    """Batch extract_name over many texts with nlp.pipe (n_process > 1 forks model workers)."""
+    docs = get_nlp().pipe((_name_window(t) for t in texts), n_process=n_process, batch_size=batch_size)
+    return [_first_person(doc) for doc in docs]
+
+def extract_skills(text):
+    skills = []
+    lines = text.splitlines()
+    for i, line in enumerate(lines):
+        if 'skill' in line.lower():
+            for l in lines[i+1:i+10]:
+                if l.strip() == '' or len(l.strip()) < 2:
+                    break
+                skills.extend([s.strip() for s in re.split(r",|;|\|", l) if s.strip()])
+            break
+    return list(set(skills))
+
+def extract_education(text):
+    education_keywords = ["bachelor", "master", "phd", "b.sc", "m.sc", "btech", "mtech", "university", "college", "school"]
+    lines = text.splitlines()
+    education = [l for l in lines if any(k in l.lower() for k in education_keywords)]
+    return education
+
+def extract_experience(text):
+    exp_keywords = ["experience", "worked", "company", "role", "position", "employer"]
+    lines = text.splitlines()
+    experience = [l for l in lines if any(k in l.lower() for k in exp_keywords)]
+    return experience
+
+def extractor_for(content_type):
+    """"pdf" or "docx" for the extractor that handles `content_type`, None if unsupported."""
+    if content_type == "application/pdf":
+        return "pdf"
+    if content_type in ["application/vnd.openxmlformats-officedocument.wordprocessingml.document", "application/msword"]:
+        return "docx"
+    return None
+
+def _extract(file_bytes, content_type):
+    """(text, extraction info), or (None, None) for unsupported types."""
+    extractor = extractor_for(content_type)
+    if extractor == "pdf":
+        return extract_pdf_text(file_bytes)
+    if extractor == "docx":
+        return extract_text_from_docx(file_bytes), {"engine": "python-docx"}
+    return None, None
+
+def extract_text(file_bytes, content_type):
+    return _extract(file_bytes, content_type)[0]
+
+def _parsed_fields(text, name, extraction=None):
+    return {
+        "name": name,
+        "email": extract_email(text),
+        "phone": extract_phone(text),
+        "skills": extract_skills(text),
+        "education": extract_education(text),
+        "experience": extract_experience(text),
+        "raw_text": text,
+        "extraction": extraction,
+    }
+
+def parse_resume(file_bytes, content_type):
+    text, extraction = _extract(file_bytes, content_type)
+    if text is None:
+        return {"error": "Unsupported file type"}
+    return _parsed_fields(text, extract_name(text), extraction)
+
+def parse_resumes(files, n_process=1, batch_size=32):
+    """Batch parse_resume for (file_bytes, content_type) pairs; NER runs once through nlp.pipe."""
+    extracted = [_extract(file_bytes, content_type) for file_bytes, content_type in files]
+    names = iter(extract_names([t for t, _ in extracted if t is not None], n_process=n_process, batch_size=batch_size))
+    return [{"error": "Unsupported file type"} if t is None else _parsed_fields(t, next(names), info) for t, info in extracted]
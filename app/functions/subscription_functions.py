@@ -71,45 +71,9 @@ def _subscription_collection():
     return db.subscriptions
 
 def ensure_subscription_indexes():
-    """Create indexes needed for performance and uniqueness."""
-    try:
-        db.jobs.create_index([("employer_id", 1), ("posted_at", 1)])
-    except Exception as e:
-        logger.debug("jobs index create skipped: %s", e)
-
-    try:
-        db.subscriptions.create_index([("employer_id", 1), ("status", 1), ("expires_at", 1)])
-        db.subscriptions.create_index([("company_id", 1), ("status", 1), ("expires_at", 1)])
-        db.subscriptions.create_index([("subscription_id", 1)], unique=True)
-        db.subscriptions.create_index([("plan_id", 1)])
-    except Exception as e:
-        logger.debug("subscriptions index create skipped: %s", e)
-
-    try:
-        db.subscription_members.create_index([("subscription_id", 1)])
-        db.subscription_members.create_index([("employer_email", 1)])
-        db.subscription_members.create_index([("owner_id", 1)])
-        db.subscription_members.create_index([("status", 1)])
-    except Exception as e:
-        logger.debug("subscription_members index create skipped: %s", e)
-
-    try:
-        db.subscription_orders.create_index([("merchant_transaction_id", 1)], unique=True)
-        db.subscription_orders.create_index([("employer_id", 1), ("status", 1)])
-        db.subscription_orders.create_index([("plan_id", 1)])
-        db.subscription_orders.create_index(
-            [("created_at", 1)],
-            expireAfterSeconds=86400,
-            partialFilterExpression={"status": "pending"},
-        )
-    except Exception as e:
-        logger.debug("subscription_orders index create skipped: %s", e)
-
-    try:
-        db.phonepe_callbacks.create_index([("merchant_transaction_id", 1)])
-        db.phonepe_callbacks.create_index([("received_at", 1)])
-    except Exception as e:
-        logger.debug("phonepe_callbacks index create skipped: %s", e)
+    """Create indexes needed for performance and uniqueness (declared in app.indexes)."""
+    from app.indexes import reconcile_indexes
+    reconcile_indexes(["jobs", "subscriptions", "subscription_members", "subscription_orders", "phonepe_callbacks"])
 
 # Backwards compatibility
 _ensure_indexes = ensure_subscription_indexes
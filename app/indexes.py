@@ -0,0 +1,228 @@
+"""Declarative index registry and reconciliation.
+
+Every index the app relies on is listed in INDEXES. `reconcile_indexes()`
+creates the missing ones and reports indexes that exist in MongoDB but not
+here ("extra") plus, via $indexStats, indexes with no recorded use since the
+server started ("unused"). It runs from the FastAPI lifespan and can be run
+offline:
+
+    python -m app.indexes               # create missing, print report
+    python -m app.indexes --dry-run     # only report what would change
+    python -m app.indexes --collection jobs --collection applications
+"""
+import argparse
+import json
+import logging
+import sys
+from app.db import db
+from app.config.settings import RESUME_PARSE_CACHE_TTL_DAYS
+
+logger = logging.getLogger(__name__)
+
+TEXT_INDEX_NAME = "jobs_text_search"
+
+# collection -> [(keys, options)]; options are passed straight to create_index
+INDEXES = {
+    "jobs": [
+        ([("job_id", 1)], {}),
+        ([("posted_at", -1), ("job_id", -1)], {}),  # keyset pagination for list/search
+        ([("status", 1), ("expires_at", 1)], {}),  # expiry sweep, move_expired_jobs, active filters
+        ([("company_id", 1), ("status", 1)], {}),
+        ([("employer_id", 1), ("posted_at", 1)], {}),
+        ([("title", 1)], {}),
+        # Weighted text search: title > skills > description (JOB_SEARCH_ENGINE="text")
+        ([("title", "text"), ("skills", "text"), ("description", "text")],
+         {"name": TEXT_INDEX_NAME, "weights": {"title": 10, "skills": 5, "description": 1}, "default_language": "english"}),
+    ],
+    "expired_jobs": [
+        ([("job_id", 1)], {}),
+    ],
+    "deleted_jobs": [
+        ([("employer_id", 1)], {}),
+        ([("job_id", 1), ("employer_id", 1)], {}),
+    ],
+    "job_removals": [
+        ([("removal_id", 1)], {"unique": True}),
+        ([("job_id", 1), ("employer_id", 1), ("status", 1)], {}),
+    ],
+    "applications": [
+        ([("job_id", 1), ("user_id", 1)], {}),
+        ([("user_id", 1), ("status", 1)], {}),
+        ([("resume_file_id", 1)], {}),  # blob reference checks
+    ],
+    "interviews": [
+        ([("job_id", 1), ("candidate_id", 1)], {}),
+        ([("candidate_id", 1)], {}),
+        ([("hr_id", 1)], {}),
+    ],
+    "notifications": [
+        ([("user_id", 1), ("time", -1)], {}),
+    ],
+    "chats": [
+        ([("sender_id", 1), ("recipient_id", 1), ("time", -1)], {}),
+        ([("recipient_id", 1), ("sender_id", 1), ("read", 1)], {}),
+    ],
+    "saved_jobs": [
+        ([("user_id", 1), ("job_id", 1)], {}),
+    ],
+    "companies": [
+        ([("company_id", 1)], {}),
+        ([("employer_id", 1)], {}),
+        ([("logo", 1)], {"sparse": True}),
+    ],
+    "company_reviews": [
+        ([("company_id", 1)], {}),
+        ([("user_id", 1)], {}),
+    ],
+    "users": [
+        ([("email", 1)], {}),
+        ([("user_id", 1)], {}),
+        ([("profile_photo_id", 1)], {"sparse": True}),
+        ([("cover_photo_id", 1)], {"sparse": True}),
+    ],
+    "resumes": [
+        ([("user_id", 1)], {}),
+        ([("file_id", 1)], {}),
+    ],
+    "temp_resume": [
+        ([("user_id", 1)], {}),
+        ([("file_id", 1)], {}),
+    ],
+    "deleted_applications": [
+        ([("resume_file_id", 1)], {}),
+    ],
+    # GridFS files are content-addressed (app.functions.blob_functions); older files have no sha256
+    "fs.files": [
+        ([("sha256", 1)], {"unique": True, "partialFilterExpression": {"sha256": {"$exists": True}}}),
+        ([("unreferenced_at", 1)], {"sparse": True}),
+    ],
+    "resume_parse_cache": [
+        # Replaces the old unique (sha256, parser_version) index; drop that one once this exists
+        ([("sha256", 1), ("extractor", 1), ("parser_version", 1)], {"unique": True}),
+        ([("created_at", 1)], {"expireAfterSeconds": RESUME_PARSE_CACHE_TTL_DAYS * 24 * 3600}),
+    ],
+    "password_reset_tokens": [
+        ([("email", 1), ("expires_at", 1)], {}),
+        # TTL: drop the whole doc once expires_at passes
+        ([("expires_at", 1)], {"expireAfterSeconds": 0}),
+        ([("reset_token", 1)], {"unique": True, "sparse": True}),
+    ],
+    "subscriptions": [
+        ([("employer_id", 1), ("status", 1), ("expires_at", 1)], {}),
+        ([("company_id", 1), ("status", 1), ("expires_at", 1)], {}),
+        ([("subscription_id", 1)], {"unique": True}),
+        ([("plan_id", 1)], {}),
+    ],
+    "subscription_members": [
+        ([("subscription_id", 1)], {}),
+        ([("employer_email", 1)], {}),
+        ([("owner_id", 1)], {}),
+        ([("status", 1)], {}),
+    ],
+    "subscription_orders": [
+        ([("merchant_transaction_id", 1)], {"unique": True}),
+        ([("employer_id", 1), ("status", 1)], {}),
+        ([("plan_id", 1)], {}),
+        ([("created_at", 1)], {"expireAfterSeconds": 86400, "partialFilterExpression": {"status": "pending"}}),
+    ],
+    "profiles": [
+        ([("created_at", -1)], {"expireAfterSeconds": 7 * 24 * 3600}),  # keep request profiles for a week
+        ([("profile_id", 1)], {"unique": True}),
+    ],
+    "phonepe_callbacks": [
+        ([("merchant_transaction_id", 1)], {}),
+        ([("received_at", 1)], {}),
+    ],
+}
+
+
+def _is_text(keys) -> bool:
+    return any(direction == "text" for _, direction in keys)
+
+
+def _existing_key(info: dict):
+    """Hashable key pattern for an index from index_information(); all text indexes share one."""
+    key = info.get("key", [])
+    if any(k == "_fts" for k, _ in key):
+        return "text"
+    return tuple((k, int(v) if isinstance(v, (int, float)) else v) for k, v in key)
+
+
+def _spec_key(keys):
+    return "text" if _is_text(keys) else tuple(keys)
+
+
+def index_usage(collection: str, database=None) -> dict:
+    """{index name: ops since server start} from $indexStats (empty when not permitted)."""
+    database = db if database is None else database
+    try:
+        return {s["name"]: s.get("accesses", {}).get("ops", 0) for s in database[collection].aggregate([{"$indexStats": {}}])}
+    except Exception as e:
+        logger.debug("$indexStats unavailable for %s: %s", collection, e)
+        return {}
+
+
+def reconcile_collection(collection: str, specs: list, dry_run: bool = False, database=None) -> dict:
+    database = db if database is None else database
+    coll = database[collection]
+    existing = {name: _existing_key(info) for name, info in coll.index_information().items()}
+    by_key = {key: name for name, key in existing.items()}
+    report = {"created": [], "present": [], "failed": [], "extra": [], "unused": []}
+    wanted = set()
+    for keys, options in specs:
+        spec_key = _spec_key(keys)
+        wanted.add(spec_key)
+        if spec_key in by_key:
+            report["present"].append(by_key[spec_key])
+            continue
+        if dry_run:
+            report["created"].append(options.get("name") or "_".join(f"{k}_{v}" for k, v in keys))
+            continue
+        try:
+            report["created"].append(coll.create_index(keys, **options))
+        except Exception as e:
+            logger.warning("%s index %s create failed: %s", collection, keys, e)
+            report["failed"].append({"keys": keys, "error": str(e)})
+    report["extra"] = sorted(name for name, key in existing.items() if name != "_id_" and key not in wanted)
+    usage = index_usage(collection, database)
+    report["unused"] = sorted(name for name, ops in usage.items() if name != "_id_" and ops == 0)
+    return report
+
+
+def reconcile_indexes(collections=None, dry_run: bool = False, database=None) -> dict:
+    """Create missing registry indexes and report extra/unused ones, per collection.
+
+    `database` defaults to the app database; benchmarks pass their own scratch one.
+    """
+    results = {}
+    for collection, specs in INDEXES.items():
+        if collections and collection not in collections:
+            continue
+        try:
+            results[collection] = reconcile_collection(collection, specs, dry_run, database)
+        except Exception as e:
+            logger.warning("Index reconciliation skipped for %s: %s", collection, e)
+            results[collection] = {"error": str(e)}
+            continue
+        r = results[collection]
+        if r["created"]:
+            logger.info("%s: %s indexes %s", collection, "would create" if dry_run else "created", r["created"])
+        if r["extra"]:
+            logger.info("%s: indexes not in registry: %s", collection, r["extra"])
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Create missing MongoDB indexes and report extra/unused ones.")
+    parser.add_argument("--dry-run", action="store_true", help="report only, do not create indexes")
+    parser.add_argument("--collection", action="append", help="limit to a collection (repeatable)")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    results = reconcile_indexes(args.collection, dry_run=args.dry_run)
+    json.dump(results, sys.stdout, indent=2, default=str)
+    sys.stdout.write("\n")
+    return 1 if any(r.get("failed") or r.get("error") for r in results.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
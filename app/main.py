@@ -1,10 +1,16 @@
-from fastapi import FastAPI
-from app.routes import auth, user, job,application, get_application, save_job, interview, resume, email,recommendation_routes, get_my_applications, active_application, profile, employee, company, chat, notification, application_management, company_review, ratings, send_notification, follow, subscription
+from fastapi import FastAPI, Request, Header, HTTPException
+from fastapi.responses import PlainTextResponse, JSONResponse
+from app.routes import auth, user, job,application, get_application, save_job, interview, resume, email,recommendation_routes, get_my_applications, active_application, profile, employee, company, chat, notification, application_management, company_review, ratings, send_notification, follow, subscription, profiling
 from fastapi.middleware.cors import CORSMiddleware
 from apscheduler.schedulers.background import BackgroundScheduler
-from app.functions import job_functions
+from app.functions import job_functions, blob_functions
 from contextlib import asynccontextmanager
-from app.functions.subscription_functions import ensure_subscription_indexes
+from app.indexes import reconcile_indexes
+from app import db as database
+from app.config.settings import JOB_EXPIRY_MODE, JOB_EXPIRY_SWEEP_INTERVAL_SECONDS, DB_QUERY_STATS, DB_QUERY_LOG_MIN_QUERIES, DB_QUERY_LOG_MIN_MS, METRICS_ENABLED, METRICS_TOKEN, PROFILING_ENABLED, LOOP_MONITOR_ENABLED, RESUME_PARSER_WARMUP, BLOB_GC_INTERVAL_SECONDS, UPLOAD_REQUEST_MAX_MB
+from app.utils import metrics, event_stream, profiling as request_profiling
+from app.utils.loop_monitor import monitor as loop_monitor
+from app.utils.parse_engine import engine as parse_engine
 import logging
 import asyncio
 
@@ -14,11 +20,29 @@ scheduler = BackgroundScheduler()
 @asynccontextmanager
 async def lifespan(app):
     logger = logging.getLogger("app.lifespan")
-    # Create indexes once at startup (keep failures non-fatal)
+    # Open and warm the Mongo connection pools before taking traffic
     try:
-        ensure_subscription_indexes()
+        await database.open_clients()
+    except Exception as e:  # pragma: no cover
+        logger.warning("MongoDB warm-up failed: %s", e)
+    # Create missing registry indexes once at startup off the event loop (keep failures non-fatal)
+    try:
+        await asyncio.to_thread(reconcile_indexes)
     except Exception as e:  # pragma: no cover
         logger.warning("Index creation skipped: %s", e)
+    # Start the resume parse workers (each loads the NLP model) while startup continues; the first parse waits for them
+    if RESUME_PARSER_WARMUP:
+        try:
+            warm_up = parse_engine.warm_up()
+            warm_up.add_done_callback(lambda f: not f.cancelled() and f.exception() and logger.warning("Resume parser warm-up failed: %s", f.exception()))
+        except Exception as e:  # pragma: no cover
+            logger.warning("Resume parser warm-up failed: %s", e)
+    # Watch event-loop lag so blocking calls inside async handlers show up in logs and /metrics
+    if LOOP_MONITOR_ENABLED:
+        try:
+            loop_monitor.start()
+        except Exception as e:  # pragma: no cover
+            logger.warning("Loop monitor start failed: %s", e)
     # Start scheduler
     try:
         if not scheduler.running:
@@ -34,11 +58,23 @@ async def lifespan(app):
         logger.exception("Unhandled lifespan exception: %s", e)
         raise
     finally:
+        try:
+            await loop_monitor.stop()
+        except Exception as e:  # pragma: no cover
+            logger.debug("Loop monitor stop issue: %s", e)
+        try:
+            parse_engine.shutdown()
+        except Exception as e:  # pragma: no cover
+            logger.debug("Resume parse engine shutdown issue: %s", e)
         try:
             if scheduler.running:
                 scheduler.shutdown(wait=False)
         except Exception as e:  # pragma: no cover
             logger.debug("Scheduler shutdown issue: %s", e)
+        try:
+            database.close_clients()
+        except Exception as e:  # pragma: no cover
+            logger.debug("MongoDB client close issue: %s", e)
 
 app = FastAPI(lifespan=lifespan)
 app.add_middleware(
@@ -47,10 +83,56 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-DB-Queries", "X-DB-Time", "X-DB-Slowest", "ETag", "Content-Range", "Content-Disposition"],
 )
 
+query_logger = logging.getLogger("app.db.queries")
+
+@app.middleware("http")
+async def db_query_stats(request: Request, call_next):
+    """Count the Mongo commands each request issues (see app.db.QueryStatsListener)."""
+    if not DB_QUERY_STATS:
+        return await call_next(request)
+    stats = database.RequestQueryStats()
+    token = database.request_query_stats.set(stats)
+    try:
+        response = await call_next(request)
+    finally:
+        database.request_query_stats.reset(token)
+    slowest = stats.describe_slowest()
+    response.headers["X-DB-Queries"] = str(stats.count)
+    response.headers["X-DB-Time"] = f"{stats.total_ms:.1f}"
+    if slowest:
+        response.headers["X-DB-Slowest"] = slowest
+    # Many queries per request is the N+1 signature; log those loudly, everything else at debug
+    level = logging.WARNING if stats.count >= DB_QUERY_LOG_MIN_QUERIES or stats.total_ms >= DB_QUERY_LOG_MIN_MS else logging.DEBUG
+    if query_logger.isEnabledFor(level):
+        route = getattr(request.scope.get("route"), "path", request.url.path)
+        query_logger.log(
+            level, "%s %s -> %s: %d db queries, %.1fms db time, slowest %s",
+            request.method, route, response.status_code, stats.count, stats.total_ms, slowest or "-",
+            extra={"method": request.method, "route": route, "status": response.status_code,
+                   "db_queries": stats.count, "db_time_ms": round(stats.total_ms, 1), "db_slowest": slowest},
+        )
+    return response
+
+@app.middleware("http")
+async def limit_upload_size(request: Request, call_next):
+    """Reject oversized multipart uploads from Content-Length, before the body is read or spooled."""
+    length = request.headers.get("content-length")
+    if (length and length.isdigit() and int(length) > UPLOAD_REQUEST_MAX_MB * 1024 * 1024
+            and request.headers.get("content-type", "").startswith("multipart/form-data")):
+        return JSONResponse(status_code=413, content={"detail": f"Upload is larger than {UPLOAD_REQUEST_MAX_MB} MB"})
+    return await call_next(request)
+
 # Schedule the job expiration check to run every day at midnight
 scheduler.add_job(job_functions.move_expired_jobs, 'interval', days=1)
+# Persist read-time expiry in one throttled sweep instead of a write on every read
+if JOB_EXPIRY_MODE == "read_time":
+    scheduler.add_job(job_functions.sweep_expired_jobs, 'interval', seconds=JOB_EXPIRY_SWEEP_INTERVAL_SECONDS, max_instances=1, coalesce=True)
+# Delete GridFS blobs nothing references any more
+if BLOB_GC_INTERVAL_SECONDS > 0:
+    scheduler.add_job(blob_functions.sweep_unreferenced_blobs, 'interval', seconds=BLOB_GC_INTERVAL_SECONDS, max_instances=1, coalesce=True)
 
 app.include_router(auth.router, prefix="/api/auth", tags=["Auth"])
 app.include_router(user.router, prefix="/api/user", tags=["User"])
@@ -75,6 +157,29 @@ app.include_router(ratings.router, prefix="/api/ratings", tags=["ratings"])
 app.include_router(send_notification.router, prefix="/api/notifications", tags=["Notifications"])
 app.include_router(follow.router, prefix="/api", tags=["Follow"])
 app.include_router(subscription.router, prefix="/api/subscription", tags=["Subscription"])
+app.include_router(profiling.router, prefix="/api/admin/profiles", tags=["Admin"])
+
+# Connection gauges are read from the in-memory managers at scrape time
+WEBSOCKET_CONNECTIONS = metrics.Gauge("websocket_connections", "Open WebSocket connections per manager.", ("manager",))
+WEBSOCKET_CONNECTIONS.set_function(lambda: {
+    ("chat",): sum(len(sockets) for sockets in chat.manager.active_connections.values()),
+    ("notification",): len(notification.notification_manager.active_connections),
+})
+SSE_SUBSCRIBERS = metrics.Gauge("sse_subscribers", "Connected /api/job/stream SSE subscribers.")
+SSE_SUBSCRIBERS.set_function(event_stream.subscriber_count)
+
+# Debug profiling of signed or sampled requests; results listed under /api/admin/profiles
+if PROFILING_ENABLED:
+    app.middleware("http")(request_profiling.profile_requests)
+
+if METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
+
+    @app.get("/metrics", include_in_schema=False)
+    def prometheus_metrics(authorization: str = Header(None)):
+        if METRICS_TOKEN and authorization != f"Bearer {METRICS_TOKEN}":
+            raise HTTPException(status_code=401, detail="Missing or invalid authorization header")
+        return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
 
 @app.get("/")
 def root():
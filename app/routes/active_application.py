@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
 from app.utils.jwt_handler import verify_token
 from app.db import db
+from app.utils.batch_lookup import fetch_related
 
 router = APIRouter()
 
@@ -29,12 +30,14 @@ async def get_active_applications(user=Depends(get_current_user)):
         {"_id": 0}
     ))
 
+    jobs = fetch_related(active_applications, "job_id", db.jobs, "job_id")
+    employers = fetch_related(list(jobs.values()), "employer_id", db.users, "user_id", {"_id": 0, "company_name": 1})
     enriched = []
     for app in active_applications:
-        job = db.jobs.find_one({"job_id": app["job_id"]})
+        job = jobs.get(app["job_id"])
         if not job:
             continue
-        employer = db.users.find_one({"user_id": job.get("employer_id")})
+        employer = employers.get(job.get("employer_id"))
         company_name = employer["company_name"] if employer and "company_name" in employer else None
         enriched.append({
             "jobTitle": job.get("title"),
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Header, Request, Depends
+from fastapi.concurrency import run_in_threadpool
 from app.utils.jwt_handler import verify_token
-from app.db import db
+from app.db import repos
 from datetime import datetime
 from typing import Optional
 import uuid
@@ -8,6 +9,9 @@ from bson import ObjectId
 from app.functions import application_functions
 from app.routes.notification import notification_manager, serialize_notification
 from app.utils.timezone_utils import get_ist_now
+from app.utils.parse_cache import cache as parse_cache
+from app.functions.blob_functions import store_upload, add_blob_ref, release_blob, UploadTooLarge
+from app.config.settings import RESUME_UPLOAD_MAX_MB, RESUME_PARSE_MAX_MB
 
 router = APIRouter()
 
@@ -46,17 +50,19 @@ async def apply_for_job(
         raise HTTPException(status_code=401, detail="Invalid or expired token")
     
     # Step 2: Check if already applied
-    existing_application = db.applications.find_one({
+    existing_application = await repos.applications.find_one({
         "job_id": job_id,
         "user_id": user_data["user_id"]
     })
     if existing_application:
         raise HTTPException(status_code=400, detail="You have already applied for this job")
 
-    # Step 3: Save resume file directly in MongoDB using GridFS
-    file_bytes = await resume.read()
-    from app.functions import resume_functions
-    file_id = resume_functions.gfs.put(file_bytes, filename=resume.filename, content_type=resume.content_type)
+    # Step 3: Stream resume file into GridFS (identical files are stored once)
+    try:
+        stored = await store_upload(resume, RESUME_UPLOAD_MAX_MB * 1024 * 1024, RESUME_PARSE_MAX_MB * 1024 * 1024)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    file_id = stored["file_id"]
 
     application = {
         "job_id": job_id,
@@ -71,19 +77,20 @@ async def apply_for_job(
         "status": "pending",
         "applied_at": get_ist_now(),
     }
-    db.applications.insert_one(application)
+    await repos.applications.insert_one(application)
 
     # Also insert resume into temp_resume collection, referencing the same file_id
-    from app.functions.resume_functions import parse_resume
     user_id = user_data["user_id"]
     filename = resume.filename
     content_type = resume.content_type
-    old = db.temp_resume.find_one({"user_id": user_id})
+    old = await repos.temp_resume.find_one({"user_id": user_id})
     if old:
-        resume_functions.gfs.delete(old["file_id"])
-        db.temp_resume.delete_one({"user_id": user_id})
-    parsed_data = parse_resume(file_bytes, content_type)
-    db.temp_resume.insert_one({
+        await repos.temp_resume.delete_one({"user_id": user_id})
+        # Only drop temp_resume's reference: the blob may still back an earlier application
+        await run_in_threadpool(release_blob, old["file_id"])
+    await run_in_threadpool(add_blob_ref, file_id)
+    parsed_data = await parse_cache.parse_stored(stored, content_type)
+    await repos.temp_resume.insert_one({
         "user_id": user_id,
         "file_id": file_id,  # reference the same file_id
         "filename": filename,
@@ -93,7 +100,7 @@ async def apply_for_job(
     })
 
     # --- Notify employer ---
-    job = db.jobs.find_one({"job_id": job_id})
+    job = await repos.jobs.find_one({"job_id": job_id})
     if job and "employer_id" in job:
         employer_id = job["employer_id"]
         notification = {
@@ -105,7 +112,7 @@ async def apply_for_job(
             "read": False,
             "link": f"/employer/dashboard/applications/{job_id}"
         }
-        db.notifications.insert_one(notification)
+        await repos.notifications.insert_one(notification)
         await notification_manager.send_notification(employer_id, serialize_notification(notification))
     return {"message": "Application submitted successfully", "application": fix_objectid(application)}
 
@@ -117,25 +124,25 @@ async def delete_application(application_id: str, user=Depends(get_current_user)
     # First try as ObjectId (real application ID)
     try:
         if ObjectId.is_valid(application_id):
-            application = db.applications.find_one({"_id": ObjectId(application_id)})
+            application = await repos.applications.find_one({"_id": ObjectId(application_id)})
     except:
         pass
     
     # If not found, try as job_id (UUID format)
     if not application:
-        application = db.applications.find_one({"job_id": application_id, "user_id": user["user_id"]})
+        application = await repos.applications.find_one({"job_id": application_id, "user_id": user["user_id"]})
     
     employer_id = None
     job = None
     if application:
         # Save the application to deleted_applications before deleting
-        db.deleted_applications.insert_one(application)
-        job = db.jobs.find_one({"job_id": application["job_id"]})
+        await repos.deleted_applications.insert_one(application)
+        job = await repos.jobs.find_one({"job_id": application["job_id"]})
         if job and "employer_id" in job:
             employer_id = job["employer_id"]
     
     # Use the actual ObjectId for deletion
-    response = application_functions.delete_application(str(application["_id"]) if application else application_id, user["user_id"])
+    response = await application_functions.delete_application(str(application["_id"]) if application else application_id, user["user_id"])
 
     if response["status"] == "success":
         if employer_id:
@@ -148,7 +155,7 @@ async def delete_application(application_id: str, user=Depends(get_current_user)
                 "read": False,
                 "link": f"/employer/dashboard/applications/{job['job_id']}" if job else ""
             }
-            db.notifications.insert_one(notification)
+            await repos.notifications.insert_one(notification)
             await notification_manager.send_notification(employer_id, serialize_notification(notification))
         return {"message": "Application deleted successfully"}
     else:
@@ -169,13 +176,13 @@ async def edit_application(
     # First try as ObjectId (real application ID)
     try:
         if ObjectId.is_valid(application_id):
-            application = db.applications.find_one({"_id": ObjectId(application_id)})
+            application = await repos.applications.find_one({"_id": ObjectId(application_id)})
     except:
         pass
     
     # If not found, try as job_id (UUID format)
     if not application:
-        application = db.applications.find_one({"job_id": application_id, "user_id": user["user_id"]})
+        application = await repos.applications.find_one({"job_id": application_id, "user_id": user["user_id"]})
     
     if not application:
         raise HTTPException(status_code=404, detail="Application not found")
@@ -189,7 +196,7 @@ async def edit_application(
         raise HTTPException(status_code=400, detail="Application cannot be edited in current status")
     
     # Find the job to check deadline
-    job = db.jobs.find_one({"job_id": application["job_id"]})
+    job = await repos.jobs.find_one({"job_id": application["job_id"]})
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     
@@ -212,19 +219,17 @@ async def edit_application(
     
     # Handle resume update if provided
     if resume is not None:
-        # Delete old resume file from GridFS
+        # Stream new resume file into GridFS
+        try:
+            stored = await store_upload(resume, RESUME_UPLOAD_MAX_MB * 1024 * 1024, RESUME_PARSE_MAX_MB * 1024 * 1024)
+        except UploadTooLarge as e:
+            raise HTTPException(status_code=413, detail=str(e))
+        file_id = stored["file_id"]
+        
+        # Release the old resume file (deleted by the blob GC once nothing references it)
         old_file_id = application.get("resume_file_id")
         if old_file_id:
-            from app.functions import resume_functions
-            try:
-                resume_functions.gfs.delete(old_file_id)
-            except Exception:
-                pass  # File might not exist
-        
-        # Save new resume file
-        file_bytes = await resume.read()
-        from app.functions import resume_functions
-        file_id = resume_functions.gfs.put(file_bytes, filename=resume.filename, content_type=resume.content_type)
+            await run_in_threadpool(release_blob, old_file_id)
         
         update_data.update({
             "resume_file_id": str(file_id),
@@ -233,18 +238,15 @@ async def edit_application(
         })
         
         # Update temp_resume collection as well
-        from app.functions.resume_functions import parse_resume
         user_id = user["user_id"]
-        old_temp = db.temp_resume.find_one({"user_id": user_id})
+        old_temp = await repos.temp_resume.find_one({"user_id": user_id})
         if old_temp and old_temp.get("file_id"):
-            try:
-                resume_functions.gfs.delete(old_temp["file_id"])
-            except Exception:
-                pass
-            db.temp_resume.delete_one({"user_id": user_id})
+            await repos.temp_resume.delete_one({"user_id": user_id})
+            await run_in_threadpool(release_blob, old_temp["file_id"])
+        await run_in_threadpool(add_blob_ref, file_id)
         
-        parsed_data = parse_resume(file_bytes, resume.content_type)
-        db.temp_resume.insert_one({
+        parsed_data = await parse_cache.parse_stored(stored, resume.content_type)
+        await repos.temp_resume.insert_one({
             "user_id": user_id,
             "file_id": file_id,
             "filename": resume.filename,
@@ -257,7 +259,7 @@ async def edit_application(
     update_data["updated_at"] = get_ist_now()
     
     # Update the application
-    result = db.applications.update_one(
+    result = await repos.applications.update_one(
         {"_id": application["_id"]},
         {"$set": update_data}
     )
@@ -277,11 +279,11 @@ async def edit_application(
             "read": False,
             "link": f"/employer/dashboard/applications/{job['job_id']}"
         }
-        db.notifications.insert_one(notification)
+        await repos.notifications.insert_one(notification)
         await notification_manager.send_notification(employer_id, serialize_notification(notification))
     
     # Return updated application
-    updated_application = db.applications.find_one({"_id": application["_id"]})
+    updated_application = await repos.applications.find_one({"_id": application["_id"]})
     return {"message": "Application updated successfully", "application": fix_objectid(updated_application)}
 
 @router.get("/application_for_edit/{application_id}")
@@ -292,13 +294,13 @@ async def get_application_for_edit(application_id: str, user=Depends(get_current
     # First try as ObjectId (real application ID)
     try:
         if ObjectId.is_valid(application_id):
-            application = db.applications.find_one({"_id": ObjectId(application_id)})
+            application = await repos.applications.find_one({"_id": ObjectId(application_id)})
     except:
         pass
     
     # If not found, try as job_id (UUID format)
     if not application:
-        application = db.applications.find_one({"job_id": application_id, "user_id": user["user_id"]})
+        application = await repos.applications.find_one({"job_id": application_id, "user_id": user["user_id"]})
     
     if not application:
         raise HTTPException(status_code=404, detail="Application not found")
@@ -312,7 +314,7 @@ async def get_application_for_edit(application_id: str, user=Depends(get_current
         raise HTTPException(status_code=400, detail="Application cannot be edited in current status")
     
     # Find the job to check deadline and get job details
-    job = db.jobs.find_one({"job_id": application["job_id"]})
+    job = await repos.jobs.find_one({"job_id": application["job_id"]})
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     
@@ -342,7 +344,7 @@ async def get_application_for_edit(application_id: str, user=Depends(get_current
 @router.get("/application_for_edit_by_job/{job_id}")
 async def get_application_for_edit_by_job(job_id: str, user=Depends(get_current_user)):
     # Find the application by job_id and user_id
-    application = db.applications.find_one({"job_id": job_id, "user_id": user["user_id"]})
+    application = await repos.applications.find_one({"job_id": job_id, "user_id": user["user_id"]})
     if not application:
         raise HTTPException(status_code=404, detail="Application not found")
     
@@ -351,7 +353,7 @@ async def get_application_for_edit_by_job(job_id: str, user=Depends(get_current_
         raise HTTPException(status_code=400, detail="Application cannot be edited in current status")
     
     # Find the job to check deadline and get job details
-    job = db.jobs.find_one({"job_id": application["job_id"]})
+    job = await repos.jobs.find_one({"job_id": application["job_id"]})
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     
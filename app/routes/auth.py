@@ -1,9 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, Request, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
 from app.functions import auth_functions, company_functions
 from app.utils.jwt_handler import verify_token
 from app.db import db
-from bson import ObjectId
-from gridfs import GridFS
+from app.functions.blob_functions import store_upload, add_blob_ref, release_blob, UploadTooLarge
+from app.config.settings import IMAGE_UPLOAD_MAX_MB
 
 router = APIRouter()
 
@@ -49,11 +50,19 @@ async def upload_logo(request: Request,file: UploadFile = File(...)):
     user_data = verify_token(token)
     if not user_data:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
-    contents = await file.read()
-    # Initialize GridFS
-    fs = GridFS(db)
-
-    # --- Find and delete the old logo if it exists ---
+    # Nothing points at the new logo until /onboarding saves it, so it is stored
+    # unreferenced; an abandoned or replaced upload is left to the blob GC
+    try:
+        stored = await store_upload(file, IMAGE_UPLOAD_MAX_MB * 1024 * 1024, take_ref=False)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    file_id = stored["file_id"]
+    # The blob may be shared, so this upload's own name/type wait on the user until /onboarding saves them
+    await run_in_threadpool(db.users.update_one, {"user_id": user_data.get("user_id")}, {"$set": {"onboarding_logo": {
+        "file_id": str(file_id), "filename": stored["filename"], "content_type": stored["content_type"],
+    }}})
+
+    # --- Find and release the old logo if it exists ---
     # Assume user_data was obtained from the token earlier in the function
     old_logo_id_str = None
     if user_data and user_data.get("user_type") == "employer":
@@ -69,20 +78,12 @@ async def upload_logo(request: Request,file: UploadFile = File(...)):
                     if company:
                         old_logo_id_str = company.get("logo") # Assumes company doc has logo field with GridFS ID string
 
-    # If an old logo ID was found, attempt to delete it from GridFS
+    # If an old logo ID was found, drop its reference; the blob GC keeps it while the
+    # company document still points at it (the new id is only saved by /onboarding)
     if old_logo_id_str:
-        try:
-            # Convert string ID to ObjectId and delete
-            fs.delete(ObjectId(old_logo_id_str))
-            # Optional: Log successful deletion
-            # print(f"Deleted old logo file: {old_logo_id_str}")
-        except Exception as e:
-            # Log other potential errors during deletion (e.g., invalid ObjectId format)
-            # print(f"Error deleting old logo {old_logo_id_str}: {e}")
-            pass # Decide if upload should proceed despite deletion error
-    # --- End find and delete ---
-
-    file_id = fs.put(contents, filename=file.filename, content_type=file.content_type)
+        await run_in_threadpool(release_blob, old_logo_id_str)
+    # --- End find and release ---
+
     return {"logo_file_id": str(file_id)}
 
 @router.post("/onboarding")
@@ -111,11 +112,18 @@ async def onboarding(request: Request):
         }
         if "logo_file_id" in data:
             company_data["logo"] = data.get("logo_file_id")
+            user = await run_in_threadpool(db.users.find_one, {"user_id": user_data.get("user_id")}, {"onboarding_logo": 1})
+            pending = (user or {}).get("onboarding_logo") or {}
+            if pending.get("file_id") == company_data["logo"]:
+                company_data["logo_filename"] = pending.get("filename")
+                company_data["logo_content_type"] = pending.get("content_type")
 
         isNewCompany = data.get("isNewCompany", False)
         if isNewCompany:
             result = company_functions.add_company(company_data)
             company = result["data"]
+            if company.get("logo"):
+                await run_in_threadpool(add_blob_ref, company["logo"])
         else:
             company = company_functions.get_company_by_id(data.get("companyId"))
             if not company:
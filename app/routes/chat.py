@@ -1,16 +1,14 @@
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, HTTPException, Header, Response
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, HTTPException, Header, Request
 from app.utils.jwt_handler import verify_token
-from app.db import db
-from gridfs import GridFS
+from app.db import repos
 from bson import ObjectId
 from typing import Dict, List
 import uuid
 from app.utils.timezone_utils import get_ist_now
+from app.utils.file_response import blob_response, CACHE_PUBLIC_REVALIDATE
 
 router = APIRouter()
 
-gfs = GridFS(db)
-
 # In-memory connection manager for demo (use Redis or DB pub/sub for production)
 class ConnectionManager:
     def __init__(self):
@@ -69,7 +67,7 @@ async def websocket_chat(websocket: WebSocket, recipient_id: str, token: str = N
                 "time": get_ist_now().isoformat(),
                 "read": False  # unread for recipient initially
             }
-            db.chats.insert_one(message)
+            await repos.chats.insert_one(message)
             # Remove _id (ObjectId) before sending to client
             message.pop("_id", None)
             # Send to recipient if online
@@ -91,26 +89,26 @@ async def get_chat_recipients(authorization: str = Header(None)):
         {"$project": {"other": {"$cond": [{"$eq": ["$sender_id", user_id]}, "$recipient_id", "$sender_id"]}}},
         {"$group": {"_id": "$other"}}
     ]
-    partners = [doc["_id"] for doc in db.chats.aggregate(pipeline)]
-    users = list(db.users.find({"user_id": {"$in": partners}}, {"user_id": 1, "first_name": 1, "last_name": 1, "avatar": 1, "user_type": 1, "company_id": 1}))
+    partners = [doc["_id"] for doc in await repos.chats.aggregate(pipeline)]
+    users = await repos.users.find({"user_id": {"$in": partners}}, {"user_id": 1, "first_name": 1, "last_name": 1, "avatar": 1, "user_type": 1, "company_id": 1})
 
     # Batch load companies for employer users to avoid N+1 queries
     employer_company_ids = {u.get("company_id") for u in users if u.get("user_type") == "employer" and u.get("company_id")}
     companies_by_id = {}
     if employer_company_ids:
-        for comp in db.companies.find({"company_id": {"$in": list(employer_company_ids)}}, {"company_id": 1, "company_name": 1, "logo": 1}):
+        for comp in await repos.companies.find({"company_id": {"$in": list(employer_company_ids)}}, {"company_id": 1, "company_name": 1, "logo": 1}):
             companies_by_id[comp["company_id"]] = comp
 
     result = []
     for u in users:
-        last_msg = db.chats.find_one({
+        last_msg = await repos.chats.find_one({
             "$or": [
                 {"sender_id": user_id, "recipient_id": u["user_id"]},
                 {"sender_id": u["user_id"], "recipient_id": user_id}
             ]
         }, sort=[("time", -1)])
         # Unread count (messages sent TO current user from this partner not marked read)
-        unread_count = db.chats.count_documents({
+        unread_count = await repos.chats.count({
             "sender_id": u["user_id"],
             "recipient_id": user_id,
             "$or": [
@@ -157,9 +155,9 @@ async def get_chat_messages(recipient_id: str, authorization: str = Header(None)
             {"sender_id": recipient_id, "recipient_id": user_id}
         ]
     }
-    messages = list(db.chats.find(query, {"_id": 0}))
+    messages = await repos.chats.find(query, {"_id": 0})
     # Mark all messages sent to current user as read
-    db.chats.update_many({
+    await repos.chats.update_many({
         "sender_id": recipient_id,
         "recipient_id": user_id,
         "$or": [
@@ -179,7 +177,7 @@ async def mark_conversation_read(other_id: str, authorization: str = Header(None
         raise HTTPException(status_code=401, detail="Missing or invalid authorization header")
     token = authorization.split(" ", 1)[1]
     user_id = get_user_id_from_token(token)
-    result = db.chats.update_many({
+    result = await repos.chats.update_many({
         "sender_id": other_id,
         "recipient_id": user_id,
         "$or": [
@@ -190,29 +188,32 @@ async def mark_conversation_read(other_id: str, authorization: str = Header(None
     return {"marked": result.modified_count}
 
 @router.get("/chat/profile-photo/{user_id}")
-async def get_user_profile_photo(user_id: str):
+async def get_user_profile_photo(user_id: str, request: Request):
     """
     Get profile photo for a user (both job seekers and employers) for chat interface
     """
     try:
         # First, get user info to determine their role and profile photo
-        user = db.users.find_one({"user_id": user_id})
+        user = await repos.users.find_one({"user_id": user_id})
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
         
         profile_photo_id = None
+        photo_type = None
         
         # Check user role and get appropriate profile photo
         if user.get("user_type") == "employer":
             # For employers, get their company logo as profile photo
             company_id = user.get("company_id")
             if company_id:
-                company = db.companies.find_one({"company_id": company_id})
+                company = await repos.companies.find_one({"company_id": company_id})
                 if company and company.get("logo"):
                     profile_photo_id = company.get("logo")
+                    photo_type = company.get("logo_content_type")
         else:
             # For job seekers, try different profile photo field names
             profile_photo_id = user.get("profile_photo_id")
+            photo_type = user.get("profile_photo_content_type")
     
         # Debug logging
         print(f"User {user_id}: type={user.get('user_type')}, profile_photo_id={profile_photo_id}")
@@ -221,12 +222,8 @@ async def get_user_profile_photo(user_id: str):
         # If we have a profile photo ID, fetch it from GridFS
         if profile_photo_id:
             try:
-                file = gfs.get(ObjectId(profile_photo_id))
-                return Response(
-                    content=file.read(), 
-                    media_type=file.content_type, 
-                    headers={"Content-Disposition": f"inline; filename={file.filename}"}
-                )
+                return await blob_response(request, ObjectId(profile_photo_id), cache_control=CACHE_PUBLIC_REVALIDATE,
+                                           content_type=photo_type)
             except Exception as e:
                 print(f"GridFS error for {profile_photo_id}: {e}")
                 pass
@@ -1,16 +1,18 @@
-from fastapi import APIRouter, Request, HTTPException, Depends, Response, Form
+from fastapi import APIRouter, Request, HTTPException, Depends, Form
+from fastapi.concurrency import run_in_threadpool
 from app.functions import company_functions, auth_functions
 from app.utils.jwt_handler import verify_token
-from gridfs import GridFS
 from bson import ObjectId
-from app.db import db
+from gridfs.errors import NoFile
+from bson.errors import InvalidId
+from app.functions.blob_functions import store_upload, release_blob, UploadTooLarge
+from app.config.settings import IMAGE_UPLOAD_MAX_MB
+from app.utils.file_response import blob_response, CACHE_IMMUTABLE, CACHE_PUBLIC_REVALIDATE
 from fastapi import UploadFile, File
 from datetime import datetime
 
 router = APIRouter()
 
-gfs = GridFS(db)
-
 def get_current_user(request: Request):
     token = request.headers.get("Authorization", "").replace("Bearer ", "")
     user_data = verify_token(token)
@@ -38,22 +40,25 @@ async def get_company_by_id(company_id: str):
     return company
 
 @router.get("/logo/{logo_id}")
-async def get_company_logo(logo_id: str):
+async def get_company_logo(logo_id: str, request: Request):
+    # The id names immutable content, so browsers may cache this URL for good. Companies that
+    # uploaded the same image share the id, so only the type is taken from one of them (no filename).
+    company = await run_in_threadpool(company_functions.get_company_by_logo, logo_id)
     try:
-        file = gfs.get(ObjectId(logo_id))
-        return Response(content=file.read(), media_type=file.content_type, headers={"Content-Disposition": f"inline; filename={file.filename}"})
-    except Exception:
+        return await blob_response(request, ObjectId(logo_id), cache_control=CACHE_IMMUTABLE,
+                                   content_type=(company or {}).get("logo_content_type"))
+    except (NoFile, InvalidId, TypeError):
         raise HTTPException(status_code=404, detail="Logo not found")
     
 @router.get("/logo/company/{company_id}")
-async def get_logo_by_company_id(company_id: str):
+async def get_logo_by_company_id(company_id: str, request: Request):
     company = company_functions.get_company_by_id(company_id)
     if not company or not company.get("logo"):
         raise HTTPException(status_code=404, detail="Company or logo not found")
     try:
-        file = gfs.get(ObjectId(company["logo"]))
-        return Response(content=file.read(), media_type=file.content_type, headers={"Content-Disposition": f"inline; filename={file.filename}"})
-    except Exception:
+        return await blob_response(request, ObjectId(company["logo"]), filename=company.get("logo_filename"),
+                                   cache_control=CACHE_PUBLIC_REVALIDATE, content_type=company.get("logo_content_type"))
+    except (NoFile, InvalidId, TypeError):
         raise HTTPException(status_code=404, detail="Logo not found")
     
 @router.put("/edit")
@@ -107,10 +112,13 @@ async def edit_company_details(
 
     # Handle logo update
     if logo is not None:
-        file_data = await logo.read()
-        gfs.delete(ObjectId(company["logo"]))
-        new_logo_id = gfs.put(file_data, filename=logo.filename, content_type=logo.content_type)
-        update_data["logo"] = str(new_logo_id)
+        try:
+            stored = await store_upload(logo, IMAGE_UPLOAD_MAX_MB * 1024 * 1024)
+        except UploadTooLarge as e:
+            raise HTTPException(status_code=413, detail=str(e))
+        update_data["logo"] = str(stored["file_id"])
+        update_data["logo_filename"] = stored["filename"]
+        update_data["logo_content_type"] = stored["content_type"]
 
     update_data["latest_edit_at"] = datetime.utcnow().isoformat()
     update_data["latest_edit_by"] = user_data.get("user_id")
@@ -118,4 +126,6 @@ async def edit_company_details(
     updated_company = company_functions.update_company_by_id(company_id, update_data)
     if not updated_company:
         raise HTTPException(status_code=500, detail="Failed to update company details")
+    if logo is not None and company.get("logo"):
+        await run_in_threadpool(release_blob, company["logo"])
     return updated_company
\ No newline at end of file
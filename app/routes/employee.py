@@ -1,11 +1,12 @@
-from fastapi import APIRouter, Header, HTTPException, Response, Request
+from fastapi import APIRouter, Header, HTTPException, Request
+from gridfs.errors import NoFile
+from bson.errors import InvalidId
 from app.utils.jwt_handler import verify_token
 from app.db import db
-from gridfs import GridFS
 from bson import ObjectId
 from app.functions import auth_functions
-
-gfs = GridFS(db)
+from app.utils.batch_lookup import fetch_related
+from app.utils.file_response import blob_response
 
 router = APIRouter()
 
@@ -195,9 +196,10 @@ async def get_job_applications(job_id: str, authorization: str = Header(None)):
             "interview_time": 1
         }
     ))
+    candidates = fetch_related(applications, "user_id", db.users, "user_id", {"_id": 0, "user_id": 1, "first_name": 1, "last_name": 1, "email": 1, "phone": 1, "location": 1, "avatar": 1})
     enriched_apps = []
     for app in applications:
-        candidate = db.users.find_one({"user_id": app["user_id"]}, {"_id": 0, "user_id": 1, "first_name": 1, "last_name": 1, "email": 1, "phone": 1, "location": 1, "avatar": 1})
+        candidate = candidates.get(app["user_id"])
         # print("candidate :",candidate)
         if not candidate:
             continue
@@ -226,7 +228,7 @@ async def get_job_applications(job_id: str, authorization: str = Header(None)):
     }
 
 @router.get("/get_resume_by_user/{job_id}/{user_id}")
-async def get_resume_by_user(job_id: str, user_id: str, authorization: str = Header(None)):
+async def get_resume_by_user(job_id: str, user_id: str, request: Request, authorization: str = Header(None)):
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Missing or invalid authorization header")
     token = authorization.split(" ", 1)[1]
@@ -245,7 +247,7 @@ async def get_resume_by_user(job_id: str, user_id: str, authorization: str = Hea
         raise HTTPException(status_code=404, detail="Application or resume not found")
     resume_file_id = application["resume_file_id"]
     try:
-        file = gfs.get(ObjectId(resume_file_id))
-    except Exception:
+        return await blob_response(request, ObjectId(resume_file_id), filename=application.get("resume_filename"),
+                                   content_type=application.get("resume_content_type"))
+    except (NoFile, InvalidId, TypeError):
         raise HTTPException(status_code=404, detail="Resume file not found in storage")
-    return Response(content=file.read(), media_type=file.content_type, headers={"Content-Disposition": f"inline; filename={file.filename}"})
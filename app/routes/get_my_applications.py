@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, Request
 from app.utils.jwt_handler import verify_token
 from app.db import db
 from bson import ObjectId
-from app.functions import company_functions
+from app.utils.batch_lookup import fetch_related
 
 router = APIRouter()
 
@@ -18,6 +18,14 @@ def get_current_user(request: Request):
         raise HTTPException(status_code=401, detail="Invalid or expired token")
     return user_data
 
+def _load_related(applications):
+    """Batch-load the jobs, employers and companies referenced by a list of applications."""
+    jobs = fetch_related(applications, "job_id", db.jobs, "job_id")
+    job_docs = list(jobs.values())
+    employers = fetch_related(job_docs, "employer_id", db.users, "user_id", {"password": 0})
+    companies = fetch_related(job_docs, "company_id", db.companies, "company_id", {"_id": 0})
+    return jobs, employers, companies
+
 # GET /applications/my-applications
 @router.get("/applications/my-applications")
 async def get_my_applications(user=Depends(get_current_user)):
@@ -25,13 +33,14 @@ async def get_my_applications(user=Depends(get_current_user)):
     if not user_id:
         raise HTTPException(status_code=400, detail="Invalid user data")
     applications = list(db.applications.find({"user_id": user_id}))
+    jobs, employers, companies = _load_related(applications)
     enriched = []
     for app in applications:
-        job = db.jobs.find_one({"job_id": app["job_id"]})
+        job = jobs.get(app["job_id"])
         if not job:
             continue
-        employer = db.users.find_one({"user_id": job.get("employer_id")})
-        company = company_functions.get_company_by_id(job.get("company_id"))
+        employer = employers.get(job.get("employer_id"))
+        company = companies.get(job.get("company_id"))
         
         # Get company logo ID if available
         company_logo_id = None
@@ -41,7 +50,7 @@ async def get_my_applications(user=Depends(get_current_user)):
         enriched.append({
             "id": str(app["_id"]), 
             "jobTitle": job.get("title"),
-            "company": company.get("company_name", "") if company else employer.get("company_name", ""),
+            "company": company.get("company_name", "") if company else (employer.get("company_name", "") if employer else ""),
             "companyId": job.get("company_id"),  # Add company ID for logo fetching
             "logo": company_logo_id,  # Use company logo ID instead of job logo
             "location": job.get("location"),
@@ -76,13 +85,14 @@ async def get_active_applications(user=Depends(get_current_user)):
         {"_id": 0}
     ))
 
+    jobs, employers, companies = _load_related(active_applications)
     enriched = []
     for app in active_applications:
-        job = db.jobs.find_one({"job_id": app["job_id"]})
+        job = jobs.get(app["job_id"])
         if not job:
             continue
-        employer = db.users.find_one({"user_id": job.get("employer_id")})
-        company = company_functions.get_company_by_id(job.get("company_id"))
+        employer = employers.get(job.get("employer_id"))
+        company = companies.get(job.get("company_id"))
         
         # Get company logo ID if available
         company_logo_id = None
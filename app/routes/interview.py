@@ -5,6 +5,7 @@ from app.db import db
 from bson import ObjectId
 from app.routes.notification import notification_manager, serialize_notification
 from app.functions.notification_function import create_and_send_notification
+from app.utils.batch_lookup import collect_ids, fetch_related, group_by
 
 router = APIRouter()
 
@@ -146,14 +147,18 @@ async def get_employer_interviews(authorization: str = Header(None)):
     if user_type != "employer":
         raise HTTPException(status_code=403, detail="Only employers can view their jobs' interviews.")
     jobs = list(db.jobs.find({"employer_id": user_id}, {"_id": 0}))
+    # One query for all interviews and one for all candidates instead of per job / per interview
+    job_ids = collect_ids(jobs, "job_id")
+    all_interviews = list(db.interviews.find({"job_id": {"$in": job_ids}})) if job_ids else []
+    candidates = fetch_related(all_interviews, "candidate_id", db.users, "user_id", {"_id": 0, "user_id": 1, "first_name": 1, "last_name": 1})
+    interviews_by_job = group_by(all_interviews, "job_id")
     for job in jobs:
-        job_id = job["job_id"]
-        interviews = list(db.interviews.find({"job_id": job_id}))
+        interviews = interviews_by_job.get(job["job_id"], [])
         for interview in interviews:
             interview["id"] = str(interview["_id"])
             interview.pop("_id", None)
             # Optionally, add applicant name
-            candidate = db.users.find_one({"user_id": interview["candidate_id"]})
+            candidate = candidates.get(interview["candidate_id"])
             interview["applicant_name"] = f"{candidate.get('first_name', '')} {candidate.get('last_name', '')}" if candidate else interview["candidate_id"]
         job["interviews"] = interviews
     return jobs
@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Request, HTTPException, Header
+from fastapi import APIRouter, Request, HTTPException, Header, BackgroundTasks
 from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from app.functions import job_functions, auth_functions, subscription_functions
 from app.utils.jwt_handler import verify_token
-from app.db import db
+from app.db import repos, search_repos, analytics_repos
 from app.utils.timezone_utils import get_ist_now
-from app.config.settings import BASE_URL
+from app.config.settings import BASE_URL, JOB_EXPIRY_MODE, JOB_REMOVAL_INLINE_MAX
 from app.utils import event_stream
 import asyncio
 
@@ -29,13 +30,14 @@ async def post_job(request: Request, authorization: str = Header(None)):
     if payload.get("user_type") != "employer":
         raise HTTPException(status_code=403, detail="Only employers can post jobs")
     data = await request.json()
-    user = auth_functions.get_user_by_id(payload.get("user_id"))
+    user = await run_in_threadpool(auth_functions.get_user_by_id, payload.get("user_id"))
     
     # Get user email for team membership check
     user_email = user.get("email") if user else None
     
     # Enforce subscription posting limits (atomic) - now includes team membership check
-    can_post, plan_id, reason, subscription_id = subscription_functions.can_employer_post_job(
+    can_post, plan_id, reason, subscription_id = await run_in_threadpool(
+        subscription_functions.can_employer_post_job,
         payload.get("user_id"), 
         user_email
     )
@@ -43,13 +45,17 @@ async def post_job(request: Request, authorization: str = Header(None)):
         raise HTTPException(status_code=403, detail=f"Cannot post job: {reason}. Upgrade your plan.")
     
     # If posting is allowed, attempt to post the job (increments counters)
-    attempt_success, attempt_plan, attempt_reason, attempt_sub_id = subscription_functions.attempt_post_job(payload.get("user_id"))
+    attempt_success, attempt_plan, attempt_reason, attempt_sub_id = await run_in_threadpool(
+        subscription_functions.attempt_post_job, payload.get("user_id")
+    )
     if not attempt_success:
         # If team member, try to increment on the team subscription
         if user_email:
-            team_sub = subscription_functions.get_employer_subscription_access(user_email)
+            team_sub = await run_in_threadpool(subscription_functions.get_employer_subscription_access, user_email)
             if team_sub:
-                subscription_functions.increment_post_counters(payload.get("user_id"), team_sub["subscription_id"])
+                await run_in_threadpool(
+                    subscription_functions.increment_post_counters, payload.get("user_id"), team_sub["subscription_id"]
+                )
             else:
                 raise HTTPException(status_code=403, detail=f"Cannot post job: {attempt_reason}")
         else:
@@ -59,13 +65,13 @@ async def post_job(request: Request, authorization: str = Header(None)):
     data["company_id"] = user.get("company_id", "")
     # Set job visibility, default to public if not provided
     data["visibility"] = data.get("visibility", "public")
-    result = job_functions.create_job(data)
+    result = await job_functions.create_job(data)
     # Broadcast SSE event about new job (best-effort, no await failure)
     try:
-        job_doc = db.jobs.find_one({"job_id": result.get("job_id")}, {"_id": 0, "job_id": 1, "title": 1, "company_id": 1, "location": 1, "posted_at": 1})
+        job_doc = await repos.jobs.find_one({"job_id": result.get("job_id")}, {"_id": 0, "job_id": 1, "title": 1, "company_id": 1, "location": 1, "posted_at": 1})
         company = None
         if job_doc and job_doc.get("company_id"):
-            company = db.companies.find_one({"company_id": job_doc["company_id"]}, {"_id": 0, "company_name": 1, "logo": 1, "company_id": 1})
+            company = await repos.companies.find_one({"company_id": job_doc["company_id"]}, {"_id": 0, "company_name": 1, "logo": 1, "company_id": 1})
         await event_stream.publish({
             "type": "job_created",
             "job": {
@@ -78,26 +84,32 @@ async def post_job(request: Request, authorization: str = Header(None)):
     return result
 
 @router.get("/list")
-async def list_all_jobs():
-    return job_functions.list_jobs()
+async def list_all_jobs(limit: int = None, cursor: str = None, include_total: bool = True, legacy: bool = False):
+    try:
+        return await job_functions.list_jobs(limit, cursor, include_total, legacy)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/search/{title}")
 async def search_job(title: str):
-    job = job_functions.get_job_by_title(title)
+    job = await job_functions.get_job_by_title(title)
     if job:
         return job
     return {"msg": "Job not found"}
 
 @router.get("/search")
-async def search_jobs(query: str = None, category: str = None, job_type: str = None, experience_level: str = None, min_salary: int = None, max_salary: int = None, location: str = None, industry: str = None, skills: str = None):
-    return job_functions.advanced_search_jobs(query, category, job_type, experience_level, min_salary, max_salary, location, industry, skills)
+async def search_jobs(query: str = None, category: str = None, job_type: str = None, experience_level: str = None, min_salary: int = None, max_salary: int = None, location: str = None, industry: str = None, skills: str = None, limit: int = None, cursor: str = None, include_total: bool = True, facets: str = None, legacy: bool = False):
+    try:
+        return await job_functions.advanced_search_jobs(query, category, job_type, experience_level, min_salary, max_salary, location, industry, skills, limit=limit, cursor=cursor, include_total=include_total, facets=facets, legacy=legacy)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/companies")
 async def get_companies():
-    return job_functions.list_companies()
+    return await job_functions.list_companies()
 
 @router.delete("/remove_job/{job_id}")
-async def remove_job(job_id: str, authorization: str = Header(None)):
+async def remove_job(job_id: str, background_tasks: BackgroundTasks, background: bool = None, authorization: str = Header(None)):
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Missing or invalid authorization header")
     token = authorization.split(" ", 1)[1]
@@ -106,7 +118,38 @@ async def remove_job(job_id: str, authorization: str = Header(None)):
         raise HTTPException(status_code=401, detail="Invalid or expired token")
     if payload.get("user_type") != "employer":
         raise HTTPException(status_code=403, detail="Only employers can remove jobs")
-    return job_functions.remove_job(job_id, payload.get("user_id"))
+    employer_id = payload.get("user_id")
+    if background is None:
+        # Small jobs keep the synchronous response; large cascades run after the response is sent.
+        # Dependents are only counted for the caller's own live job; a job that is already gone
+        # (resuming an earlier removal) goes to the background path.
+        owned = await job_functions.owns_job(job_id, employer_id)
+        background = not owned or sum(await job_functions.count_job_dependents(job_id)) > JOB_REMOVAL_INLINE_MAX
+    if not background:
+        return await job_functions.remove_job(job_id, employer_id)
+    removal = await job_functions.start_job_removal(job_id, employer_id)
+    if "removal_id" not in removal:
+        return removal
+    # run_job_removal's claim decides: a live run is left alone, a stale one is taken over
+    background_tasks.add_task(job_functions.run_job_removal, removal["removal_id"])
+    return {
+        "msg": "Job deleted; archiving applications in background",
+        "removal_id": removal["removal_id"],
+        "status_url": f"/api/job/remove_job/status/{removal['removal_id']}",
+    }
+
+@router.get("/remove_job/status/{removal_id}")
+async def remove_job_status(removal_id: str, authorization: str = Header(None)):
+    if not authorization or not authorization.startswith("Bearer "):
+        raise HTTPException(status_code=401, detail="Missing or invalid authorization header")
+    token = authorization.split(" ", 1)[1]
+    payload = verify_token(token)
+    if not payload:
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+    removal = await job_functions.get_job_removal(removal_id, payload.get("user_id"))
+    if not removal:
+        raise HTTPException(status_code=404, detail="Removal not found")
+    return removal
 
 @router.patch("/update_visibility/{job_id}")
 async def update_job_visibility(job_id: str, visibility: str, authorization: str = Header(None)):
@@ -118,7 +161,7 @@ async def update_job_visibility(job_id: str, visibility: str, authorization: str
         raise HTTPException(status_code=401, detail="Invalid or expired token")
     if payload.get("user_type") != "employer":
         raise HTTPException(status_code=403, detail="Only employers can update job visibility")
-    return job_functions.update_job_visibility(job_id, visibility, payload.get("user_id"))
+    return await job_functions.update_job_visibility(job_id, visibility, payload.get("user_id"))
 
 @router.post("/add_company")
 async def add_company(request: Request, authorization: str = Header(None)):
@@ -131,7 +174,7 @@ async def add_company(request: Request, authorization: str = Header(None)):
     if payload.get("user_type") != "employer":
         raise HTTPException(status_code=403, detail="Only employers can add companies")
     data = await request.json()
-    return job_functions.add_company(data, payload.get("user_id"))
+    return await job_functions.add_company(data, payload.get("user_id"))
 
 @router.put("/update_job/{job_id}")
 async def update_job(job_id: str, request: Request, authorization: str = Header(None)):
@@ -144,7 +187,7 @@ async def update_job(job_id: str, request: Request, authorization: str = Header(
     if payload.get("user_type") != "employer":
         raise HTTPException(status_code=403, detail="Only employers can update jobs")
     update_data = await request.json()
-    return job_functions.update_job_details(job_id, payload.get("user_id"), update_data)
+    return await job_functions.update_job_details(job_id, payload.get("user_id"), update_data)
 
 @router.post("/move_expired_jobs")
 async def move_expired_jobs_endpoint(authorization: str = Header(None)):
@@ -156,7 +199,7 @@ async def move_expired_jobs_endpoint(authorization: str = Header(None)):
     if not payload:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
     # You can add more role checks here if needed
-    return job_functions.move_expired_jobs()
+    return await run_in_threadpool(job_functions.move_expired_jobs)
 
 @router.post("/reactivate_job/{job_id}")
 async def reactivate_job(job_id: str, validity_days: int = 15, authorization: str = Header(None)):
@@ -168,32 +211,31 @@ async def reactivate_job(job_id: str, validity_days: int = 15, authorization: st
         raise HTTPException(status_code=401, detail="Invalid or expired token")
     if payload.get("user_type") != "employer":
         raise HTTPException(status_code=403, detail="Only employers can reactivate jobs")
-    return job_functions.reactivate_expired_job(job_id, payload.get("user_id"), validity_days)
+    return await job_functions.reactivate_expired_job(job_id, payload.get("user_id"), validity_days)
 
 @router.get("/get-job/{job_id}")
 async def get_job_with_saved_status(job_id: str, request: Request):
     user = get_current_user(request)
-    job = db.jobs.find_one({"job_id": job_id}, {"_id": 0})
+    job = await repos.jobs.find_one({"job_id": job_id}, {"_id": 0})
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
-    # Auto-mark expired if needed (single fetch path)
+    # Report expired status as of now; only persist it here in legacy on_read mode
     try:
-        now = get_ist_now()
-        expires_at = job.get("expires_at")
-        if expires_at and job.get("status") == "active" and expires_at < now:
-            db.jobs.update_one({"job_id": job_id}, {"$set": {"status": "expired"}})
+        if job_functions.is_expired(job, get_ist_now()):
+            if JOB_EXPIRY_MODE == "on_read":
+                await repos.jobs.update_one({"job_id": job_id}, {"$set": {"status": "expired"}})
             job["status"] = "expired"
     except Exception:
         pass
-    company = db.companies.find_one({"employer_id": job.get("employer_id")}, {"_id": 0})
+    company = await repos.companies.find_one({"employer_id": job.get("employer_id")}, {"_id": 0})
     if company:
         job["company_details"] = company
-    is_saved = db.saved_jobs.find_one({"user_id": user["user_id"], "job_id": job_id})
+    is_saved = await repos.saved_jobs.find_one({"user_id": user["user_id"], "job_id": job_id})
     return {"job": job, "is_saved": bool(is_saved)}
 
 @router.get("/categories/popular")
 async def get_popular_job_categories():
-    return job_functions.get_popular_job_categories()
+    return await job_functions.get_popular_job_categories()
 
 @router.get("/featured-jobs")
 async def get_featured_jobs():
@@ -212,15 +254,14 @@ async def get_featured_jobs():
                 "$limit": 10
             }
         ]
-        popular_jobs = list(db.applications.aggregate(application_pipeline))
+        popular_jobs = await analytics_repos.applications.aggregate(application_pipeline)
         popular_job_ids = [job["_id"] for job in popular_jobs]
         if not popular_job_ids:
             return {"featured_jobs": []}
 
-        jobs = list(db.jobs.find({
-            "job_id": {"$in": popular_job_ids},
-            "status": "active"  # Only active jobs
-        }, {
+        jobs = await search_repos.jobs.find(job_functions.active_jobs_filter(
+            job_id={"$in": popular_job_ids}  # Only active jobs
+        ), {
             "_id": 0,
             "company_id": 1,
             "job_id": 1,
@@ -232,7 +273,7 @@ async def get_featured_jobs():
             "max_salary": {"$cond": {"if": "$show_salary", "then": "$max_salary", "else": None}},
             "posted_at": 1,
             "employment_type": 1,
-        }))  # Fetch relevant fields
+        })  # Fetch relevant fields
         
         # Step 3: Fetch company details for the jobs
         company_ids = list({
@@ -240,10 +281,10 @@ async def get_featured_jobs():
         })
 
         # Step 3: Fetch company details
-        companies = list(db.companies.find(
+        companies = await repos.companies.find(
             {"company_id": {"$in": company_ids}},
             {"_id": 0, "company_id": 1, "company_name": 1, "logo": 1}
-        ))
+        )
 
         # Make sure keys match: use str keys for consistency
         company_map = {str(company["company_id"]): company for company in companies}
@@ -266,16 +307,13 @@ async def get_featured_jobs():
         return {"error": str(e)}
 
 @router.get("/company/{company_id}")
-def get_jobs_by_company_route(company_id: str):
-    return job_functions.get_jobs_by_company(company_id)
+async def get_jobs_by_company_route(company_id: str):
+    return await job_functions.get_jobs_by_company(company_id)
 
 @router.get("/jobs/by_company/{company_id}")
 async def get_jobs_by_company(company_id: str):
     # Only return active jobs
-    jobs = list(db.jobs.find({
-        "company_id": company_id, 
-        "status": "active"
-    }, {"_id": 0}))
+    jobs = await search_repos.jobs.find(job_functions.active_jobs_filter(company_id=company_id), {"_id": 0})
     return {"jobs": jobs}
 
 @router.get("/stream")
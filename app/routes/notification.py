@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status, WebSocket, WebSocketDisconnect, BackgroundTasks
-from app.db import db
+from app.db import repos
 from app.utils.jwt_handler import verify_token as decode_jwt
 from bson import ObjectId
 from datetime import datetime, timezone
@@ -51,15 +51,15 @@ def get_current_user(token: str):
         raise HTTPException(status_code=401, detail="Invalid token")
 
 @router.get("/", response_model=List[dict])
-def get_notifications(token: str):
+async def get_notifications(token: str):
     user = get_current_user(token)
-    notifications = list(db.notifications.find({"user_id": user["user_id"]}).sort("time", -1))
+    notifications = await repos.notifications.find({"user_id": user["user_id"]}, sort=[("time", -1)])
     return [serialize_notification(n) for n in notifications]
 
 @router.post("/mark-read/{notification_id}")
-def mark_notification_read(notification_id: str, token: str):
+async def mark_notification_read(notification_id: str, token: str):
     user = get_current_user(token)
-    result = db.notifications.update_one(
+    result = await repos.notifications.update_one(
         {"_id": ObjectId(notification_id), "user_id": user["user_id"]},
         {"$set": {"read": True}}
     )
@@ -68,16 +68,16 @@ def mark_notification_read(notification_id: str, token: str):
     return {"success": True}
 
 @router.post("/mark-all-read")
-def mark_all_notifications_read(token: str):
+async def mark_all_notifications_read(token: str):
     user = get_current_user(token)
-    db.notifications.update_many({"user_id": user["user_id"]}, {"$set": {"read": True}})
+    await repos.notifications.update_many({"user_id": user["user_id"]}, {"$set": {"read": True}})
     return {"success": True}
 
 @router.post("/mark-unread/{notification_id}")
-def mark_notification_unread(notification_id: str, token: str):
+async def mark_notification_unread(notification_id: str, token: str):
     """Mark a single notification as unread."""
     user = get_current_user(token)
-    result = db.notifications.update_one(
+    result = await repos.notifications.update_one(
         {"_id": ObjectId(notification_id), "user_id": user["user_id"]},
         {"$set": {"read": False}}
     )
@@ -86,10 +86,10 @@ def mark_notification_unread(notification_id: str, token: str):
     return {"success": True}
 
 @router.delete("/{notification_id}")
-def delete_notification(notification_id: str, token: str):
+async def delete_notification(notification_id: str, token: str):
     """Delete a single notification belonging to the current user."""
     user = get_current_user(token)
-    result = db.notifications.delete_one({"_id": ObjectId(notification_id), "user_id": user["user_id"]})
+    result = await repos.notifications.delete_one({"_id": ObjectId(notification_id), "user_id": user["user_id"]})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Notification not found")
     return {"success": True}
@@ -98,7 +98,7 @@ class BulkDeleteRequest(BaseModel):
     ids: List[str]
 
 @router.delete("/")
-def bulk_delete_notifications(request: BulkDeleteRequest, token: str):
+async def bulk_delete_notifications(request: BulkDeleteRequest, token: str):
     """Delete a list of notifications for the current user."""
     user = get_current_user(token)
     # Filter valid ObjectIds
@@ -110,7 +110,7 @@ def bulk_delete_notifications(request: BulkDeleteRequest, token: str):
             continue
     if not object_ids:
         return {"success": True, "deleted": 0}
-    result = db.notifications.delete_many({"_id": {"$in": object_ids}, "user_id": user["user_id"]})
+    result = await repos.notifications.delete_many({"_id": {"$in": object_ids}, "user_id": user["user_id"]})
     return {"success": True, "deleted": result.deleted_count}
 
 # --- WebSocket for real-time notifications ---
@@ -1,12 +1,15 @@
-from fastapi import APIRouter, Request, HTTPException, Header, UploadFile, File, Response
+from fastapi import APIRouter, Request, HTTPException, Header, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
+from gridfs.errors import NoFile
 from app.functions import auth_functions
 from app.utils.jwt_handler import verify_token
 from app.db import db
-from gridfs import GridFS
+from app.functions.blob_functions import store_upload, release_blob, UploadTooLarge
+from app.config.settings import IMAGE_UPLOAD_MAX_MB
+from app.utils.file_response import blob_response, CACHE_PUBLIC_REVALIDATE
 from bson import ObjectId
 
 router = APIRouter()
-gfs = GridFS(db)
 
 @router.put("/update_profile")
 async def update_profile(request: Request, authorization: str = Header(None)):
@@ -39,19 +42,23 @@ async def upload_cover_photo(authorization: str = Header(None), file: UploadFile
     user = db.users.find_one({"email": user_email})
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    # Remove old cover photo if exists
+    try:
+        stored = await store_upload(file, IMAGE_UPLOAD_MAX_MB * 1024 * 1024)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    file_id = stored["file_id"]
+    db.users.update_one({"email": user_email}, {"$set": {
+        "cover_photo_id": str(file_id),
+        "cover_photo_filename": stored["filename"],
+        "cover_photo_content_type": stored["content_type"],
+    }})
+    # Release the old cover photo (the blob is deleted once nothing else references it)
     if user.get("cover_photo_id"):
-        try:
-            gfs.delete(ObjectId(user["cover_photo_id"]))
-        except Exception:
-            pass
-    file_bytes = await file.read()
-    file_id = gfs.put(file_bytes, filename=file.filename, content_type=file.content_type)
-    db.users.update_one({"email": user_email}, {"$set": {"cover_photo_id": str(file_id)}})
+        await run_in_threadpool(release_blob, user["cover_photo_id"])
     return {"msg": "Cover photo uploaded", "cover_photo_id": str(file_id)}
 
 @router.get("/cover_photo")
-async def get_cover_photo(authorization: str = Header(None)):
+async def get_cover_photo(request: Request, authorization: str = Header(None)):
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Missing or invalid authorization header")
     token = authorization.split(" ", 1)[1]
@@ -64,9 +71,11 @@ async def get_cover_photo(authorization: str = Header(None)):
     user = db.users.find_one({"email": user_email})
     if not user or not user.get("cover_photo_id"):
         raise HTTPException(status_code=404, detail="Cover photo not found")
-    file_id = user["cover_photo_id"]
-    file = gfs.get(ObjectId(file_id))
-    return Response(content=file.read(), media_type=file.content_type, headers={"Content-Disposition": f"inline; filename={file.filename}"})
+    try:
+        return await blob_response(request, ObjectId(user["cover_photo_id"]), filename=user.get("cover_photo_filename"),
+                                   content_type=user.get("cover_photo_content_type"))
+    except NoFile:
+        raise HTTPException(status_code=404, detail="Cover photo not found")
 
 @router.put("/upload_profile_photo")
 async def upload_profile_photo(authorization: str = Header(None), file: UploadFile = File(...)):
@@ -82,19 +91,23 @@ async def upload_profile_photo(authorization: str = Header(None), file: UploadFi
     user = db.users.find_one({"email": user_email})
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    # Remove old profile photo if exists
+    try:
+        stored = await store_upload(file, IMAGE_UPLOAD_MAX_MB * 1024 * 1024)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    file_id = stored["file_id"]
+    db.users.update_one({"email": user_email}, {"$set": {
+        "profile_photo_id": str(file_id),
+        "profile_photo_filename": stored["filename"],
+        "profile_photo_content_type": stored["content_type"],
+    }})
+    # Release the old profile photo (the blob is deleted once nothing else references it)
     if user.get("profile_photo_id"):
-        try:
-            gfs.delete(ObjectId(user["profile_photo_id"]))
-        except Exception:
-            pass
-    file_bytes = await file.read()
-    file_id = gfs.put(file_bytes, filename=file.filename, content_type=file.content_type)
-    db.users.update_one({"email": user_email}, {"$set": {"profile_photo_id": str(file_id)}})
+        await run_in_threadpool(release_blob, user["profile_photo_id"])
     return {"msg": "Profile photo uploaded", "profile_photo_id": str(file_id)}
 
 @router.get("/profile_photo")
-async def get_profile_photo(authorization: str = Header(None)):
+async def get_profile_photo(request: Request, authorization: str = Header(None)):
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Missing or invalid authorization header")
     token = authorization.split(" ", 1)[1]
@@ -107,19 +120,19 @@ async def get_profile_photo(authorization: str = Header(None)):
     user = db.users.find_one({"email": user_email})
     if not user or not user.get("profile_photo_id"):
         raise HTTPException(status_code=404, detail="Profile photo not found")
-    file_id = user["profile_photo_id"]
-    file = gfs.get(ObjectId(file_id))
-    return Response(content=file.read(), media_type=file.content_type, headers={"Content-Disposition": f"inline; filename={file.filename}"})
+    try:
+        return await blob_response(request, ObjectId(user["profile_photo_id"]), filename=user.get("profile_photo_filename"),
+                                   content_type=user.get("profile_photo_content_type"))
+    except NoFile:
+        raise HTTPException(status_code=404, detail="Profile photo not found")
 
 @router.get("/profile_photo/{user_id}")
-async def get_profile_photo_by_user_id(user_id: str):
+async def get_profile_photo_by_user_id(user_id: str, request: Request):
     user = db.users.find_one({"_id": ObjectId(user_id)})
     if not user or not user.get("profile_photo_id"):
         raise HTTPException(status_code=404, detail="Profile photo not found")
-    file_id = user["profile_photo_id"]
-    file = gfs.get(ObjectId(file_id))
-    return Response(
-        content=file.read(),
-        media_type=file.content_type,
-        headers={"Content-Disposition": f"inline; filename={file.filename}"}
-    )
+    try:
+        return await blob_response(request, ObjectId(user["profile_photo_id"]), filename=user.get("profile_photo_filename"),
+                                   cache_control=CACHE_PUBLIC_REVALIDATE, content_type=user.get("profile_photo_content_type"))
+    except NoFile:
+        raise HTTPException(status_code=404, detail="Profile photo not found")
@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Header, HTTPException, Response
+from app.utils.jwt_handler import verify_token
+from app.utils import profiling
+
+router = APIRouter()
+
+def require_admin(authorization: str):
+    if not authorization or not authorization.startswith("Bearer "):
+        raise HTTPException(status_code=401, detail="Missing or invalid authorization header")
+    payload = verify_token(authorization.split(" ", 1)[1])
+    if not payload:
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+    if payload.get("user_type") != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized")
+    return payload
+
+@router.get("/")
+async def list_request_profiles(limit: int = 50, path: str = None, authorization: str = Header(None)):
+    require_admin(authorization)
+    return {"profiles": await profiling.list_profiles(max(1, min(limit, 500)), path)}
+
+@router.get("/{profile_id}")
+async def get_request_profile(profile_id: str, format: str = "json", authorization: str = Header(None)):
+    require_admin(authorization)
+    profile = await profiling.get_profile(profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if format == "folded":
+        # Plain folded stacks for flamegraph.pl / speedscope (sampling profiles only)
+        stacks = profile.get("result", {}).get("stacks", [])
+        return Response(content="\n".join(f"{s['stack']} {s['count']}" for s in stacks) + "\n", media_type="text/plain")
+    return profile
@@ -1,5 +1,13 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Header, Response
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Header, Request
+from gridfs.errors import NoFile
+from fastapi.concurrency import run_in_threadpool
 from app.functions import resume_functions
+from app.functions.blob_functions import store_upload, read_upload, UploadTooLarge
+from app.config.settings import RESUME_UPLOAD_MAX_MB, RESUME_PARSE_MAX_MB
+from app.utils.timezone_utils import get_ist_now
+from app.utils.file_response import blob_response
+from app.utils.parse_cache import cache as parse_cache
+from app.utils.parse_engine import ParserBusy, ParseTimeout
 from app.utils.jwt_handler import verify_token
 
 router = APIRouter()
@@ -18,16 +26,25 @@ def get_current_user_id(authorization: str = Header(None)):
 async def upload_resume(file: UploadFile = File(...), user_id: str = Depends(get_current_user_id)):
     if file.content_type not in ["application/pdf", "application/vnd.openxmlformats-officedocument.wordprocessingml.document", "application/msword"]:
         raise HTTPException(status_code=400, detail="Only PDF or DOCX files are allowed")
-    content = await file.read()
-    return resume_functions.upload_resume(user_id, content, file.filename, file.content_type)
+    try:
+        stored = await store_upload(file, RESUME_UPLOAD_MAX_MB * 1024 * 1024, RESUME_PARSE_MAX_MB * 1024 * 1024, upload_date=get_ist_now())
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    parsed_data = await parse_cache.parse_stored(stored, file.content_type)
+    return await run_in_threadpool(resume_functions.upload_resume, user_id, None, file.filename, file.content_type, parsed_data, stored["file_id"])
 
-@router.get("/download_resume")
-async def download_resume(user_id: str = Depends(get_current_user_id)):
-    result = resume_functions.get_resume(user_id)
-    if not result:
+async def _resume_file_response(request: Request, user_id: str, disposition: str):
+    meta = await run_in_threadpool(resume_functions.get_resume_meta, user_id)
+    if not meta:
+        raise HTTPException(status_code=404, detail="Resume not found")
+    try:
+        return await blob_response(request, meta["file_id"], disposition, meta["filename"], content_type=meta.get("content_type"))
+    except NoFile:
         raise HTTPException(status_code=404, detail="Resume not found")
-    file, meta = result
-    return Response(content=file.read(), media_type=meta["content_type"], headers={"Content-Disposition": f"attachment; filename={meta['filename']}"})
+
+@router.get("/download_resume")
+async def download_resume(request: Request, user_id: str = Depends(get_current_user_id)):
+    return await _resume_file_response(request, user_id, "attachment")
 
 @router.delete("/delete_resume")
 async def delete_resume(user_id: str = Depends(get_current_user_id)):
@@ -47,32 +64,26 @@ async def list_resumes(authorization: str = Header(None)):
 async def parse_resume_endpoint(file: UploadFile = File(...), user_id: str = Depends(get_current_user_id)):
     if file.content_type not in ["application/pdf", "application/vnd.openxmlformats-officedocument.wordprocessingml.document", "application/msword"]:
         raise HTTPException(status_code=400, detail="Only PDF or DOCX files are allowed")
-    content = await file.read()
-    parsed = resume_functions.parse_resume(content, file.content_type)
-    return parsed
+    try:
+        content = await read_upload(file, RESUME_PARSE_MAX_MB * 1024 * 1024)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    try:
+        return await parse_cache.parse(content, file.content_type)
+    except ParserBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    except ParseTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except Exception:
+        raise HTTPException(status_code=422, detail="Could not parse resume")
 
 @router.get("/preview_resume")
-async def preview_resume(user_id: str = Depends(get_current_user_id)):
-    result = resume_functions.get_resume(user_id)
-    if not result:
-        raise HTTPException(status_code=404, detail="Resume not found")
-    file, meta = result
-    return Response(content=file.read(), media_type=meta["content_type"], headers={"Content-Disposition": f"inline; filename={meta['filename']}"})
+async def preview_resume(request: Request, user_id: str = Depends(get_current_user_id)):
+    return await _resume_file_response(request, user_id, "inline")
 
 @router.get("/get_profile_resume")
-async def get_profile_resume(user_id: str = Depends(get_current_user_id)):
-    result = resume_functions.get_resume(user_id)
-    if not result:
-        raise HTTPException(status_code=404, detail="Resume not found")
-    file, meta = result
-    file_content = file.read()
-    response = Response(
-        content=file_content,
-        media_type=meta["content_type"],
-        headers={
-            "Content-Disposition": f"attachment; filename={meta['filename']}"
-        }
-    )
+async def get_profile_resume(request: Request, user_id: str = Depends(get_current_user_id)):
+    response = await _resume_file_response(request, user_id, "attachment")
     # Expose headers for CORS
     response.headers["Access-Control-Expose-Headers"] = "Content-Disposition, Content-Type"
     return response
@@ -0,0 +1,67 @@
+"""Batch hydration helpers.
+
+Replace "one find_one per document" loops (N+1 queries) with a single
+`$in` query: collect the foreign keys, fetch the referenced documents once,
+and map them back by key.
+
+    companies = fetch_related(jobs, "company_id", db.companies, "company_id")
+    for job in jobs:
+        company = companies.get(job.get("company_id"))
+"""
+
+
+def collect_ids(docs, key: str) -> list:
+    """Unique, non-empty values of `key` across `docs`, in first-seen order."""
+    seen = {}
+    for doc in docs:
+        value = doc.get(key) if doc else None
+        if value is None or value == "":
+            continue
+        seen.setdefault(value, None)
+    return list(seen)
+
+
+def _with_key(projection: dict | None, field: str):
+    """Make sure an inclusion projection still returns the field we map on."""
+    if not projection:
+        return projection
+    inclusive = any(v not in (0, False) for k, v in projection.items() if k != "_id")
+    if inclusive and field not in projection:
+        return {**projection, field: 1}
+    return projection
+
+
+def fetch_by_ids(collection, field: str, ids, projection: dict | None = None) -> dict:
+    """Return {value: document} for documents whose `field` is in `ids` (sync pymongo collection)."""
+    ids = list(ids)
+    if not ids:
+        return {}
+    cursor = collection.find({field: {"$in": ids}}, _with_key(projection, field))
+    return {doc[field]: doc for doc in cursor if field in doc}
+
+
+async def fetch_by_ids_async(repo, field: str, ids, projection: dict | None = None) -> dict:
+    """Async variant of `fetch_by_ids` for an `app.db.AsyncRepository`."""
+    ids = list(ids)
+    if not ids:
+        return {}
+    docs = await repo.find({field: {"$in": ids}}, _with_key(projection, field))
+    return {doc[field]: doc for doc in docs if field in doc}
+
+
+def fetch_related(docs, key: str, collection, field: str, projection: dict | None = None) -> dict:
+    """Collect `key` from `docs` and load the matching documents from `collection` in one query."""
+    return fetch_by_ids(collection, field, collect_ids(docs, key), projection)
+
+
+async def fetch_related_async(docs, key: str, repo, field: str, projection: dict | None = None) -> dict:
+    """Async variant of `fetch_related`."""
+    return await fetch_by_ids_async(repo, field, collect_ids(docs, key), projection)
+
+
+def group_by(docs, key: str) -> dict:
+    """Group documents into {value: [documents]} by `key` (for one-to-many joins)."""
+    grouped = {}
+    for doc in docs:
+        grouped.setdefault(doc.get(key), []).append(doc)
+    return grouped
@@ -29,6 +29,11 @@ async def unsubscribe(q: asyncio.Queue) -> None:
         pass
 
 
+def subscriber_count() -> int:
+    """Number of connected SSE subscribers (read without the lock; for metrics)."""
+    return len(_subscribers)
+
+
 async def publish(event: Dict[str, Any]) -> None:
     """Publish an event to all subscribers."""
     # Copy current subscribers snapshot to avoid holding lock while putting
@@ -0,0 +1,193 @@
+"""Streaming GridFS file responses with caching headers, conditional GET and Range.
+
+`blob_response` replaces `Response(content=gfs.get(id).read())` in the file
+routes:
+
+- the body is streamed chunk by chunk from GridFS (reads run in the
+  threadpool), never loaded whole;
+- a single `Range: bytes=...` is answered with 206 / Content-Range (416 when
+  unsatisfiable; multi-range requests get the whole file);
+- ETag is the blob id. Blobs are immutable (uploads always create or reuse a
+  content-addressed blob, see app.functions.blob_functions), so an id always
+  names the same bytes and a matching If-None-Match gets a 304 without
+  touching Mongo at all. If-Modified-Since is checked against uploadDate;
+- Cache-Control is the caller's: CACHE_IMMUTABLE when the blob id is part of
+  the URL, a revalidating policy when the URL maps to whatever file a
+  user/company currently has;
+- blobs up to FILE_CACHE_MAX_ITEM_KB (logos, avatars) are kept in an
+  in-process LRU of FILE_CACHE_MAX_MB, so repeated first views from different
+  browsers don't hit Mongo either.
+
+Filename and content type come from the caller (the user/company/application
+document that references the blob), never from the GridFS file: a
+deduplicated blob carries whatever its first uploader sent.
+"""
+import threading
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+from datetime import timezone
+from fastapi import Request, Response
+from fastapi.concurrency import run_in_threadpool
+from starlette.responses import StreamingResponse
+from app.config.settings import FILE_CACHE_MAX_AGE_SECONDS, FILE_CACHE_MAX_ITEM_KB, FILE_CACHE_MAX_MB
+from app.functions.blob_functions import get_blob
+
+CACHE_IMMUTABLE = f"public, max-age={FILE_CACHE_MAX_AGE_SECONDS}, immutable"
+CACHE_PUBLIC_REVALIDATE = "public, no-cache"
+CACHE_PRIVATE_REVALIDATE = "private, no-cache"
+
+
+class _BlobCache:
+    """Byte-bounded LRU of small blobs: file id -> (meta, content)."""
+
+    def __init__(self, max_item_bytes: int, max_total_bytes: int):
+        self.max_item_bytes = max_item_bytes
+        self.max_total_bytes = max_total_bytes
+        self.total = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None:
+                self._items.move_to_end(key)
+            return item
+
+    def put(self, key: str, meta: dict, content: bytes):
+        if len(content) > self.max_item_bytes:
+            return
+        with self._lock:
+            if key in self._items:
+                return
+            self._items[key] = (meta, content)
+            self.total += len(content)
+            while self.total > self.max_total_bytes and self._items:
+                _, (_, evicted) = self._items.popitem(last=False)
+                self.total -= len(evicted)
+
+
+blob_cache = _BlobCache(FILE_CACHE_MAX_ITEM_KB * 1024, FILE_CACHE_MAX_MB * 1024 * 1024)
+
+
+def _etag(file_id) -> str:
+    return f'"{file_id}"'
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+def _parse_range(header: str, size: int):
+    """(start, end) inclusive for a single byte range; None to serve the whole file; "invalid" for 416."""
+    unit, _, spec = header.partition("=")
+    if unit.strip() != "bytes" or "," in spec:
+        return None
+    first, _, last = spec.strip().partition("-")
+    try:
+        if not first:  # suffix: last N bytes
+            length = int(last)
+            if length <= 0:
+                return "invalid"
+            return max(size - length, 0), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+    if start >= size or end < start:
+        return "invalid"
+    return start, min(end, size - 1)
+
+
+def _meta(grid_out) -> dict:
+    upload_date = grid_out.upload_date
+    if upload_date and upload_date.tzinfo is None:
+        upload_date = upload_date.replace(tzinfo=timezone.utc)
+    return {"length": grid_out.length, "upload_date": upload_date}
+
+
+def _not_modified(request: Request, etag: str, meta: dict = None) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and meta and meta["upload_date"]:
+        try:
+            return meta["upload_date"].replace(microsecond=0) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+async def _stream(grid_out, start: int, length: int):
+    try:
+        if start:
+            await run_in_threadpool(grid_out.seek, start)
+        remaining = length
+        while remaining > 0:
+            data = await run_in_threadpool(grid_out.read, min(grid_out.chunk_size, remaining))
+            if not data:
+                break
+            remaining -= len(data)
+            yield data
+    finally:
+        grid_out.close()
+
+
+async def blob_response(request: Request, file_id, disposition: str = "inline", filename: str = None,
+                        cache_control: str = CACHE_PRIVATE_REVALIDATE, content_type: str = None) -> Response:
+    """Serve a stored blob as `content_type` / `filename` (the referencing document's own values).
+
+    Raises gridfs.NoFile (or bson InvalidId) when the blob does not exist.
+    """
+    media_type = content_type or "application/octet-stream"
+    key = str(file_id)
+    etag = _etag(key)
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    # Same id, same bytes: a matching validator is answered before any lookup
+    if request.headers.get("if-none-match") is not None and _not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    cached = blob_cache.get(key)
+    grid_out = None
+    if cached:
+        meta, content = cached
+    else:
+        grid_out = await run_in_threadpool(get_blob, file_id)
+        meta, content = _meta(grid_out), None
+        if meta["length"] <= blob_cache.max_item_bytes:
+            content = await run_in_threadpool(grid_out.read)
+            grid_out.close()
+            grid_out = None
+            blob_cache.put(key, meta, content)
+
+    if meta["upload_date"]:
+        headers["Last-Modified"] = formatdate(meta["upload_date"].timestamp(), usegmt=True)
+    if _not_modified(request, etag, meta):
+        if grid_out is not None:
+            grid_out.close()
+        return Response(status_code=304, headers=headers)
+    headers["Accept-Ranges"] = "bytes"
+    headers["Content-Disposition"] = f"{disposition}; filename={filename}" if filename else disposition
+
+    size = meta["length"]
+    start, end, status = 0, size - 1, 200
+    range_header = request.headers.get("range")
+    if range_header and size and (not request.headers.get("if-range") or _etag_matches(request.headers["if-range"], etag)):
+        byte_range = _parse_range(range_header, size)
+        if byte_range == "invalid":
+            if grid_out is not None:
+                grid_out.close()
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+        if byte_range:
+            start, end = byte_range
+            status = 206
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    length = max(end - start + 1, 0)
+    headers["Content-Length"] = str(length)
+
+    if content is not None:
+        return Response(content=content[start:start + length], status_code=status, media_type=media_type, headers=headers)
+    return StreamingResponse(_stream(grid_out, start, length), status_code=status, media_type=media_type, headers=headers)
@@ -0,0 +1,93 @@
+"""Event-loop lag monitor.
+
+A probe coroutine sleeps for a fixed interval and records how late it wakes up (lag).
+A watchdog thread watches the probe's heartbeat: when the loop has not come back for
+LOOP_LAG_THRESHOLD_MS it logs the loop thread's current stack, i.e. the call that is blocking.
+"""
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from app.config.settings import LOOP_LAG_INTERVAL_MS, LOOP_LAG_THRESHOLD_MS, LOOP_LAG_WINDOW
+from app.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+LOOP_LAG = metrics.Histogram(
+    "event_loop_lag_seconds", "Delay between a scheduled event-loop wake-up and when it ran.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+LOOP_LAG_QUANTILES = metrics.Gauge("event_loop_lag_quantile_seconds", "Event-loop lag percentiles over the recent window.", ("quantile",))
+LOOP_STALLS = metrics.Counter("event_loop_stalls_total", "Times the event loop stayed blocked longer than LOOP_LAG_THRESHOLD_MS.")
+
+
+class LoopMonitor:
+    def __init__(self, interval: float, threshold: float, window: int):
+        self.interval = interval
+        self.threshold = threshold
+        self.lags = deque(maxlen=window)
+        self._beat = time.monotonic()
+        self._loop_thread_id = None
+        self._task = None
+        self._watchdog = None
+        self._stop = threading.Event()
+
+    def start(self):
+        if self._task:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._probe(), name="loop-lag-probe")
+        self._watchdog = threading.Thread(target=self._watch, name="loop-lag-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self):
+        self._stop.set()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _probe(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._beat = now
+            lag = max(now - expected, 0.0)
+            self.lags.append(lag)
+            LOOP_LAG.observe(lag)
+
+    def _watch(self):
+        stalled = False
+        while not self._stop.wait(self.interval):
+            blocked_for = time.monotonic() - self._beat - self.interval
+            if blocked_for < self.threshold:
+                stalled = False
+                continue
+            if stalled:
+                continue  # one report per stall
+            stalled = True
+            LOOP_STALLS.inc()
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame else "<loop thread not found>"
+            logger.warning("Event loop blocked for %.0fms+; loop thread stack:\n%s", blocked_for * 1000, stack,
+                           extra={"loop_blocked_ms": round(blocked_for * 1000)})
+
+    def percentiles(self) -> dict:
+        values = sorted(self.lags)
+        if not values:
+            return {}
+        pick = lambda p: values[min(int(p * len(values)), len(values) - 1)]
+        return {("0.5",): pick(0.5), ("0.95",): pick(0.95), ("0.99",): pick(0.99), ("max",): values[-1]}
+
+
+monitor = LoopMonitor(LOOP_LAG_INTERVAL_MS / 1000, LOOP_LAG_THRESHOLD_MS / 1000, LOOP_LAG_WINDOW)
+LOOP_LAG_QUANTILES.set_function(monitor.percentiles)
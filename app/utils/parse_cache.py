@@ -0,0 +1,129 @@
+"""Resume parse results cached by content hash.
+
+Most applicants attach the same file again and again, so parse results are
+keyed by the SHA-256 of the file bytes, the extractor its content type selects
+(resume_parser.extractor_for) and resume_parser.PARSER_VERSION, so the same
+bytes uploaded under another type never reuse a parse that would have gone
+down a different path:
+
+1. an in-process LRU of RESUME_PARSE_CACHE_SIZE entries;
+2. the `resume_parse_cache` collection (unique on sha256 + extractor +
+   parser_version,
+   expired after RESUME_PARSE_CACHE_TTL_DAYS), shared by all workers;
+3. a miss goes to the parse engine and the result is written back to both.
+
+Bumping PARSER_REVISION (or changing the model) changes PARSER_VERSION, so
+older results are simply never matched again and age out via the TTL.
+Failed parses and unsupported content types are not cached.
+"""
+import asyncio
+import copy
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from pymongo.errors import DuplicateKeyError
+from app.config.settings import RESUME_PARSE_CACHE_SIZE
+from app.db import repos
+from app.functions.resume_parser import PARSER_VERSION, extractor_for
+from app.utils import metrics
+from app.utils.parse_engine import engine as parse_engine
+
+logger = logging.getLogger(__name__)
+
+PARSE_CACHE_LOOKUPS = metrics.Counter("resume_parse_cache_lookups_total", "Resume parse cache lookups by result.", ("result",))
+
+# Hash off the event loop above this size (hashlib releases the GIL for large inputs)
+_HASH_INLINE_MAX_BYTES = 256 * 1024
+
+
+async def content_hash(file_bytes: bytes) -> str:
+    if len(file_bytes) <= _HASH_INLINE_MAX_BYTES:
+        return hashlib.sha256(file_bytes).hexdigest()
+    return (await asyncio.to_thread(hashlib.sha256, file_bytes)).hexdigest()
+
+
+class ParseCache:
+    def __init__(self, engine, size: int, parser_version: str):
+        self.engine = engine
+        self.size = size
+        self.parser_version = parser_version
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _lru_get(self, key: tuple):
+        with self._lock:
+            parsed = self._lru.get(key)
+            if parsed is not None:
+                self._lru.move_to_end(key)
+            return parsed
+
+    def _lru_put(self, key: tuple, parsed: dict):
+        if self.size <= 0:
+            return
+        with self._lock:
+            self._lru[key] = parsed
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.size:
+                self._lru.popitem(last=False)
+
+    async def parse(self, file_bytes: bytes, content_type: str, digest: str = None) -> dict:
+        """Cached `engine.parse`; raises the same errors on a miss. Pass `digest` when already known."""
+        extractor = extractor_for(content_type)
+        if extractor is None:
+            return await self.engine.parse(file_bytes, content_type)
+        digest = digest or await content_hash(file_bytes)
+        lru_key = (digest, extractor)
+        parsed = self._lru_get(lru_key)
+        if parsed is not None:
+            PARSE_CACHE_LOOKUPS.inc(result="memory")
+            return copy.deepcopy(parsed)
+        key = {"sha256": digest, "extractor": extractor, "parser_version": self.parser_version}
+        try:
+            doc = await repos.resume_parse_cache.find_one(key, {"_id": 0, "parsed_data": 1})
+        except Exception as e:
+            logger.warning("Resume parse cache lookup failed: %s", e)
+            doc = None
+        if doc:
+            PARSE_CACHE_LOOKUPS.inc(result="mongo")
+            self._lru_put(lru_key, doc["parsed_data"])
+            return copy.deepcopy(doc["parsed_data"])
+        PARSE_CACHE_LOOKUPS.inc(result="miss")
+        parsed = await self.engine.parse(file_bytes, content_type)
+        if "error" not in parsed:
+            self._lru_put(lru_key, copy.deepcopy(parsed))
+            try:
+                await repos.resume_parse_cache.insert_one({
+                    **key,
+                    "content_type": content_type,
+                    "size": len(file_bytes),
+                    "parsed_data": parsed,
+                    "created_at": datetime.now(timezone.utc),
+                })
+            except DuplicateKeyError:
+                pass  # parsed concurrently by another request/worker
+            except Exception as e:
+                logger.warning("Resume parse cache write failed: %s", e)
+        return parsed
+
+    async def parse_or_error(self, file_bytes: bytes, content_type: str, digest: str = None) -> dict:
+        """`parse`, but failures come back as {"error": ...} like unsupported files do."""
+        try:
+            return await self.parse(file_bytes, content_type, digest)
+        except Exception as e:
+            logger.warning("Resume parsing failed: %s", e)
+            return {"error": str(e) or e.__class__.__name__}
+
+    async def parse_stored(self, stored: dict, content_type: str) -> dict:
+        """parse_or_error for a blob_functions.store_upload result (its in-memory head and hash)."""
+        if not stored["complete"]:
+            return {"error": "File too large to parse"}
+        return await self.parse_or_error(stored["head"], content_type, stored["sha256"])
+
+    def clear(self):
+        with self._lock:
+            self._lru.clear()
+
+
+cache = ParseCache(parse_engine, RESUME_PARSE_CACHE_SIZE, PARSER_VERSION)
@@ -0,0 +1,172 @@
+"""Resume parse engine: CPU-bound parsing off the event loop and out of the API process.
+
+Parsing (pdfplumber + spaCy NER) holds the GIL for hundreds of milliseconds, so
+running it in the threadpool still stalls every other request in the worker.
+The engine runs it in a ProcessPoolExecutor instead:
+
+- workers are spawned once and load the spaCy model in their initializer, so
+  no job pays the model load;
+- at most RESUME_PARSE_WORKERS jobs run and RESUME_PARSE_QUEUE_SIZE wait;
+  beyond that `parse` raises ParserBusy immediately instead of queueing;
+- a job slower than RESUME_PARSE_TIMEOUT_SECONDS raises ParseTimeout and the
+  pool is torn down and replaced (a running process cannot be cancelled);
+- each worker's address space is capped at RESUME_PARSE_MEMORY_LIMIT_MB
+  (RLIMIT_AS, POSIX only) so a pathological file fails with an error instead
+  of taking the host down, and workers are recycled every
+  RESUME_PARSE_MAX_TASKS_PER_CHILD jobs to return fragmented memory.
+
+RESUME_PARSE_WORKERS=0 runs jobs in the threadpool with the same queue bound
+and timeout (no isolation), e.g. where processes cannot be spawned.
+"""
+import asyncio
+import logging
+import multiprocessing
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from app.config.settings import (
+    RESUME_PARSE_WORKERS, RESUME_PARSE_QUEUE_SIZE, RESUME_PARSE_TIMEOUT_SECONDS, RESUME_PARSE_MEMORY_LIMIT_MB,
+    RESUME_PARSE_MAX_TASKS_PER_CHILD,
+)
+from app.functions import resume_parser
+from app.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+PARSE_JOBS = metrics.Counter("resume_parse_jobs_total", "Resume parse jobs by outcome.", ("outcome",))
+PARSE_DURATION = metrics.Histogram("resume_parse_duration_seconds", "Resume parse time including queueing.")
+PARSE_PENDING = metrics.Gauge("resume_parse_pending", "Resume parse jobs running or queued.")
+
+
+class ParserBusy(RuntimeError):
+    """All workers are busy and the queue is full."""
+
+
+class ParseTimeout(RuntimeError):
+    """The job ran longer than RESUME_PARSE_TIMEOUT_SECONDS."""
+
+
+def _init_worker(memory_limit_mb: int):
+    if memory_limit_mb > 0:
+        try:
+            import resource
+            limit = memory_limit_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (ImportError, ValueError, OSError):  # pragma: no cover - non-POSIX or not permitted
+            pass
+    try:
+        resume_parser.warm_up()
+    except Exception as e:
+        # an initializer error breaks the whole pool; let the job itself report it instead
+        logger.warning("Resume parser warm-up failed in worker: %s", e)
+
+
+def _parse_in_worker(file_bytes: bytes, content_type: str) -> dict:
+    try:
+        return resume_parser.parse_resume(file_bytes, content_type)
+    except MemoryError:
+        raise RuntimeError("memory limit exceeded while parsing")
+
+
+def _ping():
+    return True
+
+
+class ParseEngine:
+    def __init__(self, workers: int, queue_size: int, timeout: float, memory_limit_mb: int, max_tasks_per_child: int):
+        self.workers = workers
+        self.capacity = max(workers, 1) + queue_size
+        self.timeout = timeout
+        self.memory_limit_mb = memory_limit_mb
+        self.max_tasks_per_child = max_tasks_per_child
+        self.pending = 0
+        self._pool = None
+        PARSE_PENDING.set_function(lambda: self.pending)
+
+    def _get_pool(self):
+        if self._pool is None and self.workers > 0:
+            kwargs = {}
+            if self.max_tasks_per_child and sys.version_info >= (3, 11):
+                kwargs["max_tasks_per_child"] = self.max_tasks_per_child
+            try:
+                # spawn: forking a process that holds Mongo clients and threads is unsafe
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker, initargs=(self.memory_limit_mb,), **kwargs,
+                )
+            except (OSError, NotImplementedError) as e:  # pragma: no cover
+                logger.warning("Resume parse pool unavailable, parsing in threads: %s", e)
+                self.workers = 0
+        return self._pool
+
+    def _restart(self, pool):
+        """Kill `pool` (if still current); the next job starts a fresh one."""
+        if pool is None or pool is not self._pool:
+            return
+        self._pool = None
+        for process in list((getattr(pool, "_processes", None) or {}).values()):
+            process.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    async def parse(self, file_bytes: bytes, content_type: str) -> dict:
+        """Parse a resume in a worker. Raises ParserBusy, ParseTimeout or RuntimeError."""
+        if self.pending >= self.capacity:
+            PARSE_JOBS.inc(outcome="rejected")
+            raise ParserBusy("Resume parser is busy, try again shortly")
+        self.pending += 1
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        try:
+            for attempt in (1, 2):
+                pool = self._get_pool()
+                if pool is None:
+                    job = asyncio.to_thread(resume_parser.parse_resume, file_bytes, content_type)
+                else:
+                    job = loop.run_in_executor(pool, _parse_in_worker, file_bytes, content_type)
+                try:
+                    result = await asyncio.wait_for(job, self.timeout)
+                except asyncio.TimeoutError:
+                    PARSE_JOBS.inc(outcome="timeout")
+                    self._restart(pool)
+                    raise ParseTimeout(f"Resume parsing took longer than {self.timeout:g}s")
+                except BrokenProcessPool:
+                    # a worker died (OOM kill, crash, or a timeout restart); retry once on a new pool
+                    self._restart(pool)
+                    if attempt == 2:
+                        PARSE_JOBS.inc(outcome="error")
+                        raise RuntimeError("Resume parser worker crashed")
+                    continue
+                except Exception:
+                    PARSE_JOBS.inc(outcome="error")
+                    raise
+                PARSE_JOBS.inc(outcome="ok")
+                return result
+        finally:
+            self.pending -= 1
+            PARSE_DURATION.observe(loop.time() - started)
+
+    async def parse_or_error(self, file_bytes: bytes, content_type: str) -> dict:
+        """`parse`, but failures come back as {"error": ...} like unsupported files do."""
+        try:
+            return await self.parse(file_bytes, content_type)
+        except Exception as e:
+            logger.warning("Resume parsing failed: %s", e)
+            return {"error": str(e) or e.__class__.__name__}
+
+    def warm_up(self):
+        """Start the workers (each loads the NLP model) without waiting for them."""
+        pool = self._get_pool()
+        if pool is None:
+            return asyncio.get_running_loop().run_in_executor(None, resume_parser.warm_up)
+        return asyncio.gather(*(asyncio.wrap_future(pool.submit(_ping)) for _ in range(self.workers)))
+
+    def shutdown(self):
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+engine = ParseEngine(
+    RESUME_PARSE_WORKERS, RESUME_PARSE_QUEUE_SIZE, RESUME_PARSE_TIMEOUT_SECONDS, RESUME_PARSE_MEMORY_LIMIT_MB,
+    RESUME_PARSE_MAX_TASKS_PER_CHILD,
+)
@@ -0,0 +1,230 @@
+"""Opt-in per-request profiling (PROFILING_ENABLED).
+
+A request is profiled when it carries a valid X-Profile-Signature header or
+when PROFILE_SAMPLE_RATE picks it. Two profilers are available:
+
+- "sampling" (default): a background thread snapshots every thread's stack
+  every PROFILE_SAMPLE_INTERVAL_MS, so work pushed to the threadpool
+  (parse_resume, GridFS, spaCy) is captured too. Output is folded stacks
+  ("root;...;leaf" -> samples), ready for flamegraph tools. Other requests in
+  flight at the same time show up as well.
+- "cprofile": deterministic cProfile of the event-loop thread only; output is
+  the top functions by cumulative time. cProfile follows the thread, not the
+  request, so every coroutine step the loop runs while the profile is open is
+  counted, including those of other requests in flight at the same time.
+
+Each profile records `concurrent_requests`, the most other requests that were
+in flight while it ran; treat profiles where it is non-zero as mixed.
+
+One request is profiled at a time per process. Results go to the `profiles`
+collection (PROFILE_STORE="mongo") or to JSON files in PROFILE_DIR ("disk")
+and are listed by the admin routes in app.routes.profiling.
+
+Sign a request with `python -m app.utils.profiling /api/job/list`.
+"""
+import asyncio
+import cProfile
+import hashlib
+import hmac
+import json
+import os
+import pstats
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from app.config.settings import (
+    PROFILE_SECRET, PROFILE_SAMPLE_RATE, PROFILE_MODE, PROFILE_SAMPLE_INTERVAL_MS, PROFILE_STORE, PROFILE_DIR, PROFILE_TOP_N,
+)
+from app.db import repos
+
+SIGNATURE_HEADER = "X-Profile-Signature"
+SIGNATURE_TTL_SECONDS = 300
+
+_busy = threading.Lock()
+# Requests currently inside the middleware and the peak since the current profile began
+_in_flight = 0
+_peak_in_flight = 0
+
+
+def sign(path: str, timestamp: int = None) -> str:
+    """Header value authorising a profile of `path`: "<unix ts>:<hmac-sha256 hex>"."""
+    timestamp = int(timestamp or time.time())
+    digest = hmac.new(PROFILE_SECRET.encode(), f"{timestamp}:{path}".encode(), hashlib.sha256).hexdigest()
+    return f"{timestamp}:{digest}"
+
+
+def verify_signature(value: str | None, path: str) -> bool:
+    if not PROFILE_SECRET or not value or ":" not in value:
+        return False
+    timestamp, _, _ = value.partition(":")
+    if not timestamp.isdigit() or abs(time.time() - int(timestamp)) > SIGNATURE_TTL_SECONDS:
+        return False
+    return hmac.compare_digest(value, sign(path, int(timestamp)))
+
+
+class StackSampler(threading.Thread):
+    """Collect folded stacks of all other threads at a fixed interval."""
+
+    def __init__(self, interval: float):
+        super().__init__(name="profile-sampler", daemon=True)
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        own = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        while not self._stop_event.wait(self.interval):
+            self.samples += 1
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                if ident not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                stack.append(names.get(ident, str(ident)))
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self) -> dict:
+        self._stop_event.set()
+        self.join()
+        return {
+            "samples": self.samples,
+            "interval_ms": self.interval * 1000,
+            "stacks": [{"stack": s, "count": n} for s, n in self.stacks.most_common(PROFILE_TOP_N)],
+        }
+
+
+def _cprofile_summary(profiler: cProfile.Profile) -> dict:
+    stats = pstats.Stats(profiler)
+    rows = []
+    for (filename, line, name), (calls, primitive, total, cumulative, _) in stats.stats.items():
+        rows.append({"function": f"{name} ({os.path.basename(filename)}:{line})", "calls": calls,
+                     "total_s": round(total, 6), "cumulative_s": round(cumulative, 6)})
+    rows.sort(key=lambda r: r["cumulative_s"], reverse=True)
+    return {"functions": rows[:PROFILE_TOP_N], "total_calls": stats.total_calls}
+
+
+def _trigger(request) -> str | None:
+    if verify_signature(request.headers.get(SIGNATURE_HEADER), request.url.path):
+        return "header"
+    if PROFILE_SAMPLE_RATE and random.random() < PROFILE_SAMPLE_RATE:
+        return "sample"
+    return None
+
+
+async def save_profile(doc: dict):
+    if PROFILE_STORE == "disk":
+        def write():
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            with open(os.path.join(PROFILE_DIR, f"{doc['profile_id']}.json"), "w") as fh:
+                json.dump(doc, fh, default=str)
+        await asyncio.to_thread(write)
+    else:
+        await repos.profiles.insert_one(dict(doc))
+
+
+async def list_profiles(limit: int = 50, path: str = None) -> list:
+    if PROFILE_STORE == "disk":
+        def read():
+            if not os.path.isdir(PROFILE_DIR):
+                return []
+            docs = []
+            for name in os.listdir(PROFILE_DIR):
+                with open(os.path.join(PROFILE_DIR, name)) as fh:
+                    doc = json.load(fh)
+                docs.append({k: doc.get(k) for k in ("profile_id", "method", "path", "route", "status", "duration_ms", "mode", "trigger", "concurrent_requests", "created_at")})
+            return docs
+        docs = [d for d in await asyncio.to_thread(read) if not path or d["path"].startswith(path)]
+        return sorted(docs, key=lambda d: d["created_at"] or "", reverse=True)[:limit]
+    query = {"path": {"$regex": f"^{re.escape(path)}"}} if path else {}
+    return await repos.profiles.find(query, {"_id": 0, "result": 0}, sort=[("created_at", -1)], limit=limit)
+
+
+async def get_profile(profile_id: str):
+    if PROFILE_STORE == "disk":
+        file_path = os.path.join(PROFILE_DIR, f"{os.path.basename(profile_id)}.json")
+        if not os.path.exists(file_path):
+            return None
+        def read():
+            with open(file_path) as fh:
+                return json.load(fh)
+        return await asyncio.to_thread(read)
+    return await repos.profiles.find_one({"profile_id": profile_id}, {"_id": 0})
+
+
+async def profile_requests(request, call_next):
+    """HTTP middleware: run the request under the configured profiler when triggered."""
+    global _in_flight, _peak_in_flight
+    _in_flight += 1
+    _peak_in_flight = max(_peak_in_flight, _in_flight)
+    try:
+        return await _profile_request(request, call_next)
+    finally:
+        _in_flight -= 1
+
+
+async def _profile_request(request, call_next):
+    global _peak_in_flight
+    trigger = _trigger(request)
+    if not trigger or not _busy.acquire(blocking=False):
+        return await call_next(request)
+    started = time.perf_counter()
+    _peak_in_flight = _in_flight
+    try:
+        if PROFILE_MODE == "cprofile":
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:  # another profiler/monitoring tool already owns the thread
+                return await call_next(request)
+            try:
+                response = await call_next(request)
+            finally:
+                profiler.disable()
+            result = _cprofile_summary(profiler)
+        else:
+            sampler = StackSampler(PROFILE_SAMPLE_INTERVAL_MS / 1000)
+            sampler.start()
+            try:
+                response = await call_next(request)
+            finally:
+                result = sampler.stop()
+    finally:
+        concurrent = _peak_in_flight - 1
+        _busy.release()
+    doc = {
+        "profile_id": uuid.uuid4().hex,
+        "method": request.method,
+        "path": request.url.path,
+        "route": getattr(request.scope.get("route"), "path", None),
+        "status": response.status_code,
+        "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+        "mode": PROFILE_MODE,
+        "trigger": trigger,
+        "concurrent_requests": concurrent,
+        "created_at": datetime.now(timezone.utc),
+        "result": result,
+    }
+    try:
+        await save_profile(doc)
+        response.headers["X-Profile-Id"] = doc["profile_id"]
+    except Exception:
+        pass
+    return response
+
+
+if __name__ == "__main__":
+    if not PROFILE_SECRET or len(sys.argv) != 2:
+        sys.exit("usage: PROFILE_SECRET=... python -m app.utils.profiling <path>")
+    print(f"{SIGNATURE_HEADER}: {sign(sys.argv[1])}")
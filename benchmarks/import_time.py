@@ -0,0 +1,85 @@
+"""Cold-start benchmark: how long `import app.main` takes in a fresh interpreter.
+
+Each run is a new `python -X importtime` process, like a serverless cold start.
+Reports the median/max wall time, the slowest top-level imports, and whether
+heavy libraries that should load lazily (spaCy, pdfplumber, pypdfium2,
+python-docx) were pulled in at import time.
+
+    python -m benchmarks.import_time --runs 5
+    python -m benchmarks.import_time --budget-ms 1500 --json   # exit 1 over budget or on eager heavy imports
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+MODULE = "app.main"
+LAZY_MODULES = ("spacy", "pdfplumber", "pypdfium2", "docx")
+
+PROBE = (
+    "import sys, json; import {module}; "
+    "print('@@' + json.dumps([m for m in {lazy!r} if m in sys.modules]))"
+)
+
+
+def run_once(module: str) -> dict:
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE.format(module=module, lazy=LAZY_MODULES)],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+    eager = json.loads(next(line[2:] for line in proc.stdout.splitlines() if line.startswith("@@")))
+    # -X importtime lines: "import time: self [us] | cumulative | imported package"
+    top_level = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not name[1:].startswith(" "):  # nested imports are indented
+            top_level[name.strip()] = int(cumulative) / 1000
+    return {"wall_ms": wall_ms, "eager_heavy_imports": eager, "top_level_ms": top_level}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure cold import time of the app.")
+    parser.add_argument("--module", default=MODULE)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="slowest top-level packages to list")
+    parser.add_argument("--budget-ms", type=float, help="fail when the median import exceeds this")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    run_once(args.module)  # first run compiles bytecode; not a cold start we care about
+    runs = [run_once(args.module) for _ in range(args.runs)]
+    walls = [r["wall_ms"] for r in runs]
+    slowest = sorted(runs[-1]["top_level_ms"].items(), key=lambda kv: kv[1], reverse=True)[: args.top]
+    eager = sorted({m for r in runs for m in r["eager_heavy_imports"]})
+    report = {
+        "module": args.module,
+        "runs": args.runs,
+        "median_ms": round(statistics.median(walls), 1),
+        "max_ms": round(max(walls), 1),
+        "eager_heavy_imports": eager,
+        "slowest_imports_ms": {name: round(ms, 1) for name, ms in slowest},
+    }
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    else:
+        print(f"import {args.module}: median {report['median_ms']}ms, max {report['max_ms']}ms over {args.runs} runs")
+        print("eager heavy imports: " + (", ".join(eager) or "none"))
+        for name, ms in report["slowest_imports_ms"].items():
+            print(f"  {name:30} {ms:>9.1f}ms")
+    over_budget = args.budget_ms is not None and report["median_ms"] > args.budget_ms
+    return 1 if eager or over_budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,332 @@
+"""End-to-end HTTP load test for app.main:app.
+
+Virtual users run weighted, scripted journeys for a fixed duration and every
+request is timed under its route template. The report lists throughput,
+p50/p95/p99/max latency and error rate per route.
+
+    # in-process (ASGI transport, lifespan included); point the app at a seeded local mongod
+    MONGO_URL=mongodb://localhost:27017 DB_NAME=job_portal_bench python -m benchmarks.load_test --users 20 --duration 60
+
+    # against a running server (uvicorn app.main:app --workers 4)
+    python -m benchmarks.load_test --url http://localhost:8000 --users 200 --duration 300 --json
+
+Seed the database first with `python -m benchmarks.seed_data`; logins use its
+seeker<N>/employer<N>@bench.test accounts and BENCH_USER_PASSWORD. The chat
+WebSocket and the /api/job/stream SSE journeys need a real server (--url):
+the in-process transport buffers whole responses and has no WebSocket support.
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+import uuid
+from collections import defaultdict
+import httpx
+from benchmarks.seed_data import PASSWORD, plan_counts, _fake_pdf
+
+DEFAULT_JOURNEYS = {
+    "browse": 35,
+    "search": 25,
+    "seeker_dashboard": 12,
+    "employer_dashboard": 10,
+    "apply": 6,
+    "register_login": 4,
+    "chat_ws": 5,
+    "sse": 3,
+}
+LIVE_ONLY = {"chat_ws", "sse"}
+SEARCH_TERMS = ["python", "engineer", "design", "senior data", "react developer", "sales", "remote manager"]
+SEARCH_FILTERS = [{}, {"category": "Engineering"}, {"location": "Remote"}, {"job_type": "Contract"}, {"min_salary": 1000000}]
+
+
+def percentile(sorted_values: list, p: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(p / 100.0 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+class Stats:
+    """Latencies and errors per route template, plus journeys that ended in an exception."""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.error_samples = {}
+        self.journey_errors = defaultdict(int)
+
+    def record(self, route: str, seconds: float, ok: bool, detail=None):
+        self.latencies[route].append(seconds * 1000)
+        if not ok:
+            self.errors[route] += 1
+            self.error_samples.setdefault(route, detail)
+
+    def record_journey_error(self, journey: str, detail):
+        self.journey_errors[journey] += 1
+        self.error_samples.setdefault(f"journey {journey}", detail)
+
+    def report(self, elapsed: float) -> dict:
+        routes = {}
+        for route, values in sorted(self.latencies.items()):
+            values = sorted(values)
+            routes[route] = {
+                "requests": len(values),
+                "rps": round(len(values) / elapsed, 2),
+                "errors": self.errors[route],
+                "error_rate": round(self.errors[route] / len(values), 4),
+                "p50_ms": round(percentile(values, 50), 1),
+                "p95_ms": round(percentile(values, 95), 1),
+                "p99_ms": round(percentile(values, 99), 1),
+                "max_ms": round(values[-1], 1),
+            }
+        total = sum(r["requests"] for r in routes.values())
+        errors = sum(r["errors"] for r in routes.values())
+        return {
+            "elapsed_s": round(elapsed, 1),
+            "requests": total,
+            "rps": round(total / elapsed, 2) if elapsed else 0,
+            "error_rate": round(errors / total, 4) if total else 0,
+            "routes": routes,
+            "journey_errors": dict(self.journey_errors),
+            "error_samples": self.error_samples,
+        }
+
+
+class VirtualUser:
+    def __init__(self, client: httpx.AsyncClient, stats: Stats, rng: random.Random, args):
+        self.client = client
+        self.stats = stats
+        self.rng = rng
+        self.args = args
+        self.tokens = {}
+        self.profiles = {}
+
+    async def call(self, method: str, route: str, url: str, accept=None, **kwargs):
+        """Send one request and record it; returns the response when it succeeded (or `accept(response)`), else None."""
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except Exception as e:
+            self.stats.record(route, time.perf_counter() - started, False, repr(e))
+            return None
+        ok = response.status_code < 400 or bool(accept and accept(response))
+        self.stats.record(route, time.perf_counter() - started, ok, None if ok else f"{response.status_code} {response.text[:200]}")
+        return response if ok else None
+
+    async def login(self, role: str):
+        if role not in self.tokens:
+            n = self.rng.randrange(self.args.employers if role == "employer" else self.args.seekers)
+            email = f"{role}{n}@bench.test"
+            response = await self.call("POST", "POST /api/auth/login", "/api/auth/login",
+                                       json={"email": email, "password": PASSWORD, "remember_me": False})
+            self.tokens[role] = response.json()["access_token"] if response else None
+        return self.tokens[role]
+
+    def auth(self, token):
+        return {"Authorization": f"Bearer {token}"}
+
+    async def browse(self):
+        page = await self.call("GET", "GET /api/job/list", "/api/job/list", params={"limit": 20, "include_total": "false"})
+        if not page:
+            return
+        body = page.json()
+        if body.get("next_cursor") and self.rng.random() < 0.5:
+            await self.call("GET", "GET /api/job/list?cursor", "/api/job/list", params={"limit": 20, "cursor": body["next_cursor"], "include_total": "false"})
+        for job in self.rng.sample(body["jobs"], min(2, len(body["jobs"]))):
+            await self.call("GET", "GET /api/job/get-job/{job_id}", f"/api/job/get-job/{job['job_id']}")
+        await self.call("GET", "GET /api/job/featured-jobs", "/api/job/featured-jobs")
+
+    async def search(self):
+        params = {"query": self.rng.choice(SEARCH_TERMS), "limit": 20, **self.rng.choice(SEARCH_FILTERS)}
+        if self.rng.random() < 0.3:
+            params["facets"] = "category,location"
+        await self.call("GET", "GET /api/job/search", "/api/job/search", params=params)
+
+    async def seeker_dashboard(self):
+        token = await self.login("seeker")
+        if not token:
+            return
+        await self.call("GET", "GET /api/gma/applications/my-applications", "/api/gma/applications/my-applications", headers=self.auth(token))
+        await self.call("GET", "GET /api/notifications/", "/api/notifications/", headers=self.auth(token))
+        await self.call("GET", "GET /api/chat/chat/recipients", "/api/chat/chat/recipients", headers=self.auth(token))
+
+    async def employer_dashboard(self):
+        token = await self.login("employer")
+        if not token:
+            return
+        await self.call("GET", "GET /api/emp/job_stats", "/api/emp/job_stats", headers=self.auth(token))
+        await self.call("GET", "GET /api/emp/employer_stats", "/api/emp/employer_stats", headers=self.auth(token))
+        postings = await self.call("GET", "GET /api/emp/job_postings", "/api/emp/job_postings", headers=self.auth(token))
+        job_ids = [j["id"] for j in (postings.json()["jobPostings"] if postings else []) if j.get("id")]
+        if job_ids:
+            job_id = self.rng.choice(job_ids)
+            await self.call("GET", "GET /api/emp/job_applications/{job_id}", f"/api/emp/job_applications/{job_id}", headers=self.auth(token))
+
+    async def apply(self):
+        token = await self.login("seeker")
+        page = await self.call("GET", "GET /api/job/list", "/api/job/list", params={"limit": 50, "include_total": "false"})
+        if not token or not page or not page.json()["jobs"]:
+            return
+        job = self.rng.choice(page.json()["jobs"])
+        files = {"resume": ("resume.pdf", _fake_pdf(self.rng, "Load Test"), "application/pdf")}
+        # "already applied" is an expected outcome for reused seeker accounts
+        await self.call("POST", "POST /api/application/apply/{job_id}", f"/api/application/apply/{job['job_id']}",
+                        accept=lambda r: r.status_code == 400 and "already applied" in r.text,
+                        files=files, data={"cover_letter": "Load test application"}, headers=self.auth(token))
+
+    async def register_login(self):
+        email = f"lt-{uuid.uuid4().hex[:12]}@bench.test"
+        role = self.rng.choice(["job_seeker", "job_seeker", "employer"])
+        registered = await self.call("POST", "POST /api/auth/register", "/api/auth/register", json={
+            "user_type": role, "first_name": "Load", "last_name": "Test", "email": email, "password": PASSWORD})
+        if registered:
+            await self.call("POST", "POST /api/auth/login", "/api/auth/login", json={"email": email, "password": PASSWORD, "remember_me": False})
+
+    async def chat_ws(self):
+        import websockets
+        token = await self.login("seeker")
+        if not token:
+            return
+        recipient = self.profiles.get("partner")
+        if recipient is None:
+            recipients = await self.call("GET", "GET /api/chat/chat/recipients", "/api/chat/chat/recipients", headers=self.auth(token))
+            partners = recipients.json() if recipients else []
+            recipient = self.profiles["partner"] = partners[0]["id"] if partners else str(uuid.uuid4())
+        url = self.args.url.replace("http", "ws", 1).rstrip("/") + f"/api/chat/ws/chat/{recipient}?token={token}"
+        started = time.perf_counter()
+        try:
+            async with websockets.connect(url, open_timeout=10) as ws:
+                self.stats.record("WS /api/chat/ws/chat/{recipient_id} connect", time.perf_counter() - started, True)
+                for _ in range(self.args.chat_messages):
+                    sent = time.perf_counter()
+                    await ws.send(json.dumps({"text": "load test message"}))
+                    await asyncio.wait_for(ws.recv(), timeout=10)  # echo to sender
+                    self.stats.record("WS chat message round trip", time.perf_counter() - sent, True)
+        except Exception as e:
+            self.stats.record("WS /api/chat/ws/chat/{recipient_id} connect", time.perf_counter() - started, False, repr(e))
+
+    async def sse(self):
+        started = time.perf_counter()
+        try:
+            async with self.client.stream("GET", "/api/job/stream", timeout=httpx.Timeout(10, read=self.args.sse_hold + 5)) as response:
+                first = None
+                async for _ in response.aiter_raw():
+                    first = first or time.perf_counter()
+                    if time.perf_counter() - started > self.args.sse_hold:
+                        break
+                ok = response.status_code == 200
+                self.stats.record("SSE /api/job/stream first byte", (first or time.perf_counter()) - started, ok, None if ok else response.status_code)
+        except httpx.ReadTimeout:
+            # Idle stream with no events for the whole hold: connected fine
+            self.stats.record("SSE /api/job/stream first byte", time.perf_counter() - started, True)
+        except Exception as e:
+            self.stats.record("SSE /api/job/stream first byte", time.perf_counter() - started, False, repr(e))
+
+    async def run(self, journeys: dict, deadline: float):
+        names, weights = list(journeys), list(journeys.values())
+        while time.perf_counter() < deadline:
+            journey = self.rng.choices(names, weights)[0]
+            try:
+                await getattr(self, journey)()
+            except Exception as e:
+                # An unexpected body (or a bug here) ends this journey, not the run
+                self.stats.record_journey_error(journey, repr(e))
+            if self.args.think_time:
+                await asyncio.sleep(self.rng.expovariate(1 / self.args.think_time))
+
+
+def parse_journeys(spec: str | None, live: bool) -> dict:
+    journeys = dict(DEFAULT_JOURNEYS)
+    if spec:
+        journeys = {}
+        for part in spec.split(","):
+            name, _, weight = part.partition("=")
+            if name not in DEFAULT_JOURNEYS:
+                raise ValueError(f"Unknown journey {name!r}. Allowed: {', '.join(DEFAULT_JOURNEYS)}")
+            journeys[name] = float(weight or 1)
+    if not live:
+        journeys = {k: v for k, v in journeys.items() if k not in LIVE_ONLY}
+    return journeys
+
+
+async def run_load(args) -> dict:
+    journeys = parse_journeys(args.journeys, live=bool(args.url))
+    stats = Stats()
+    limits = httpx.Limits(max_connections=args.users * 2, max_keepalive_connections=args.users)
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=30, limits=limits)
+        lifespan = None
+    else:
+        from app.main import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://loadtest", timeout=30)
+        lifespan = app.router.lifespan_context(app)
+    if lifespan:
+        await lifespan.__aenter__()
+    try:
+        async with client:
+            started = time.perf_counter()
+            deadline = started + args.duration
+            users = []
+            for i in range(args.users):
+                users.append(asyncio.create_task(VirtualUser(client, stats, random.Random(args.seed + i), args).run(journeys, deadline)))
+                if args.ramp_up:
+                    await asyncio.sleep(args.ramp_up / args.users)
+            await asyncio.gather(*users)
+            elapsed = time.perf_counter() - started
+    finally:
+        if lifespan:
+            await lifespan.__aexit__(None, None, None)
+    report = stats.report(elapsed)
+    report["users"] = args.users
+    report["target"] = args.url or "in-process"
+    report["journeys"] = journeys
+    return report
+
+
+def print_report(report: dict):
+    print(f"{report['target']}: {report['users']} users, {report['elapsed_s']}s, {report['requests']} requests, "
+          f"{report['rps']} req/s, error rate {report['error_rate']:.2%}\n")
+    print(f"{'route':52} {'reqs':>7} {'rps':>8} {'err%':>6} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+    for route, r in report["routes"].items():
+        print(f"{route[:52]:52} {r['requests']:>7} {r['rps']:>8} {r['error_rate'] * 100:>6.1f} "
+              f"{r['p50_ms']:>8} {r['p95_ms']:>8} {r['p99_ms']:>8} {r['max_ms']:>8}")
+    for journey, count in report["journey_errors"].items():
+        print(f"\njourney {journey} aborted {count} times")
+    for route, sample in report["error_samples"].items():
+        print(f"\nfirst error on {route}: {sample}")
+
+
+def main(argv=None):
+    default_counts = plan_counts(100000)
+    parser = argparse.ArgumentParser(description="Drive the API through scripted user journeys and report latency percentiles.")
+    parser.add_argument("--url", help="base URL of a running server; omit to run in-process")
+    parser.add_argument("--users", type=int, default=20, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=60, help="seconds to run")
+    parser.add_argument("--ramp-up", type=float, default=0, help="seconds over which to start the users")
+    parser.add_argument("--think-time", type=float, default=0, help="mean pause between journeys in seconds")
+    parser.add_argument("--journeys", help="weights, e.g. browse=5,search=3,apply=1 (default: mixed traffic)")
+    parser.add_argument("--seekers", type=int, default=default_counts["seekers"], help="seeded job seeker accounts to log in as")
+    parser.add_argument("--employers", type=int, default=default_counts["employers"], help="seeded employer accounts to log in as")
+    parser.add_argument("--chat-messages", type=int, default=5, help="messages per chat WebSocket session")
+    parser.add_argument("--sse-hold", type=float, default=5, help="seconds to hold each SSE connection")
+    parser.add_argument("--max-error-rate", type=float, default=0.01, help="exit 1 above this overall error rate or when a journey aborted")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+    try:
+        report = asyncio.run(run_load(args))
+    except ValueError as e:
+        parser.error(str(e))
+    if args.json:
+        json.dump(report, sys.stdout, indent=2, default=str)
+        sys.stdout.write("\n")
+    else:
+        print_report(report)
+    return 1 if report["error_rate"] > args.max_error_rate or report["journey_errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,165 @@
+"""PDF text extraction benchmark: pypdfium2 vs pdfplumber vs the "auto" engine.
+
+For every PDF in the corpus it times each engine (best of --runs), compares
+the pdfium text with pdfplumber's (word-sequence similarity, and whether the
+email / phone / skills the parser extracts agree), and records which engine
+"auto" ended up using. Without a corpus it generates simple multi-page resumes.
+
+    python -m benchmarks.pdf_extraction ~/resumes/ --runs 3
+    python -m benchmarks.pdf_extraction --generate 50 --json
+    python -m benchmarks.pdf_extraction ~/resumes/ --min-similarity 0.9   # exit 1 below it
+"""
+import argparse
+import difflib
+import json
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from app.functions import resume_parser
+
+ENGINES = ("pdfium", "pdfplumber", "auto")
+
+SKILLS = ["python", "fastapi", "mongodb", "react", "typescript", "aws", "docker", "sql", "excel", "java"]
+WORDS = ("build ship scale design own improve lead collaborate customers platform data product team "
+         "services growth quality reliable fast modern cloud users insight strategy delivery").split()
+
+
+def load_corpus(paths) -> list:
+    files = []
+    for path in map(Path, paths):
+        candidates = sorted(path.rglob("*.pdf")) if path.is_dir() else [path]
+        files.extend((str(p), p.read_bytes()) for p in candidates)
+    return files
+
+
+def _sample_pdf(rng: random.Random, index: int) -> bytes:
+    """Minimal Helvetica PDF: a header block then 1-4 pages of experience lines."""
+    header = [f"Candidate {index}", f"candidate{index}@example.com  +91 98{rng.randint(10000000, 99999999)}",
+              "Skills: " + ", ".join(rng.sample(SKILLS, 5)), "Education: B.Tech Computer Science"]
+    pages = []
+    for number in range(rng.randint(1, 4)):
+        lines = (header if number == 0 else []) + [
+            f"Experience {number}.{i}: " + " ".join(rng.choices(WORDS, k=12)) for i in range(40)
+        ]
+        pages.append("BT /F1 10 Tf 12 TL 40 800 Td " + " ".join(f"({line}) Tj T*" for line in lines) + " ET")
+    objects = ["<</Type/Catalog/Pages 2 0 R>>",
+               f"<</Type/Pages/Kids[{' '.join(f'{4 + 2 * i} 0 R' for i in range(len(pages)))}]/Count {len(pages)}>>",
+               "<</Type/Font/Subtype/Type1/BaseFont/Helvetica>>"]
+    for i, stream in enumerate(pages):
+        objects.append(f"<</Type/Page/Parent 2 0 R/MediaBox[0 0 595 842]/Contents {5 + 2 * i} 0 R/Resources<</Font<</F1 3 0 R>>>>>>")
+        objects.append(f"<</Length {len(stream)}>>stream\n{stream}\nendstream\n")
+    out, offsets = "%PDF-1.4\n", []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj{body}endobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n" + "".join(f"{o:010d} 00000 n \n" for o in offsets)
+    out += f"trailer<</Size {len(objects) + 1}/Root 1 0 R>>\nstartxref\n{xref}\n%%EOF\n"
+    return out.encode()
+
+
+def generate_corpus(count: int, seed: int) -> list:
+    rng = random.Random(seed)
+    return [(f"generated-{i}.pdf", _sample_pdf(rng, i)) for i in range(count)]
+
+
+def _time(fn, runs: int):
+    best, result = None, None
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def similarity(a: str, b: str) -> float:
+    a_words, b_words = a.split(), b.split()
+    if not a_words and not b_words:
+        return 1.0
+    return difflib.SequenceMatcher(None, a_words, b_words, autojunk=False).ratio()
+
+
+def _fields(text: str) -> dict:
+    return {
+        "email": resume_parser.extract_email(text),
+        "phone": resume_parser.extract_phone(text),
+        "skills": sorted(resume_parser.extract_skills(text)),
+    }
+
+
+def measure(name: str, data: bytes, runs: int, max_pages: int) -> dict:
+    row = {"file": name, "bytes": len(data)}
+    texts = {}
+    for engine in ENGINES:
+        try:
+            seconds, (text, info) = _time(lambda: resume_parser.extract_pdf_text(data, engine, max_pages), runs)
+        except Exception as e:
+            row[engine] = {"error": f"{e.__class__.__name__}: {e}"}
+            continue
+        texts[engine] = text
+        row[engine] = {"ms": round(seconds * 1000, 2), "chars": len(text), **info}
+    if "pdfium" in texts and "pdfplumber" in texts:
+        row["similarity"] = round(similarity(texts["pdfium"], texts["pdfplumber"]), 4)
+        fast, slow = _fields(texts["pdfium"]), _fields(texts["pdfplumber"])
+        row["field_mismatches"] = [k for k in fast if fast[k] != slow[k]]
+        row["speedup"] = round(row["pdfplumber"]["ms"] / max(row["pdfium"]["ms"], 0.001), 1)
+    if "auto" in texts and "pdfplumber" in texts:
+        row["auto_similarity"] = round(similarity(texts["auto"], texts["pdfplumber"]), 4)
+    return row
+
+
+def summarize(rows: list) -> dict:
+    compared = [r for r in rows if "similarity" in r]
+    summary = {"files": len(rows), "compared": len(compared)}
+    for engine in ENGINES:
+        times = [r[engine]["ms"] for r in rows if "ms" in r.get(engine, {})]
+        if times:
+            summary[f"{engine}_total_ms"] = round(sum(times), 1)
+            summary[f"{engine}_p50_ms"] = round(statistics.median(times), 2)
+        summary[f"{engine}_errors"] = sum(1 for r in rows if "error" in r.get(engine, {}))
+    if compared:
+        summary["speedup_median"] = statistics.median(r["speedup"] for r in compared)
+        summary["similarity_mean"] = round(statistics.mean(r["similarity"] for r in compared), 4)
+        summary["similarity_min"] = min(r["similarity"] for r in compared)
+        summary["field_mismatch_files"] = sum(1 for r in compared if r["field_mismatches"])
+    summary["auto_fallbacks"] = sum(1 for r in rows if r.get("auto", {}).get("engine") == "pdfplumber")
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare PDF text extraction engines on a resume corpus.")
+    parser.add_argument("paths", nargs="*", help="PDF files or directories (searched recursively)")
+    parser.add_argument("--generate", type=int, default=20, help="synthetic resumes when no paths are given")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--max-pages", type=int, default=resume_parser.RESUME_PDF_MAX_PAGES)
+    parser.add_argument("--min-similarity", type=float, help="fail when any file's pdfium text is less similar than this")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    corpus = load_corpus(args.paths) if args.paths else generate_corpus(args.generate, args.seed)
+    if not corpus:
+        sys.exit("no PDFs found")
+    rows = [measure(name, data, args.runs, args.max_pages) for name, data in corpus]
+    summary = summarize(rows)
+    failed = args.min_similarity is not None and any(r.get("similarity", 0) < args.min_similarity for r in rows)
+
+    if args.json:
+        print(json.dumps({"summary": summary, "files": rows}, indent=2))
+    else:
+        print(f"{'file':40} {'pdfium ms':>10} {'plumber ms':>11} {'speedup':>8} {'similar':>8} {'auto':>11}  mismatches")
+        for r in rows:
+            print(f"{Path(r['file']).name[:40]:40} {r['pdfium'].get('ms', '-'):>10} {r['pdfplumber'].get('ms', '-'):>11} "
+                  f"{r.get('speedup', '-'):>8} {r.get('similarity', '-'):>8} {r['auto'].get('engine', 'error'):>11}  "
+                  f"{','.join(r.get('field_mismatches', []))}")
+        print()
+        for key, value in summary.items():
+            print(f"{key:24} {value}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
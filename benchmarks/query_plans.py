@@ -0,0 +1,283 @@
+"""Query-plan regression benchmark.
+
+Seeds a scratch database on a local mongod (benchmarks.seed_data), applies the index registry
+(app.indexes), runs the queries issued by job_functions and the job, employee,
+chat, application, notification and interview routes through
+explain("executionStats") and compares each plan against the budgets in
+query_budgets.json. Exits 1 when any query collection-scans without being
+allowed to, examines too many documents/keys per returned document, or is
+slower than its budget.
+
+Job listing/search queries are built from the helpers job_functions uses.
+Everything else is traced: the route handlers and functions in ROUTE_CASES
+are called against the seeded database and every read command they send
+(recorded through app.db.RequestQueryStats) is explained, so a change to a
+route's query is benchmarked as written. Traced results are named
+"<case>:<collection>.<command>", with "#2", "#3"... for further distinct
+query shapes on the same collection.
+
+    python -m benchmarks.query_plans                      # seed, check, report
+    python -m benchmarks.query_plans --docs 400000 --json
+    python -m benchmarks.query_plans --no-seed            # reuse an already seeded database
+
+MONGO_BENCH_URL (default mongodb://localhost:27017) and MONGO_BENCH_DB
+(default job_portal_bench) pick the target; the database is dropped before seeding,
+so never point it at real data. The app's own clients (app.db) are pointed at the
+same database for the traced handlers, so MONGO_URL / DB_NAME are overridden here.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from dotenv import load_dotenv
+
+# Must run before anything under app/ is imported: app.db binds its clients on import
+load_dotenv()
+APP_DB_NAME = os.getenv("DB_NAME")
+os.environ["MONGO_URL"] = os.getenv("MONGO_BENCH_URL", "mongodb://localhost:27017")
+os.environ["DB_NAME"] = os.getenv("MONGO_BENCH_DB", "job_portal_bench")
+os.environ["DB_QUERY_STATS"] = "true"
+
+from fastapi import HTTPException  # noqa: E402
+from pymongo import MongoClient  # noqa: E402
+from starlette.requests import Request  # noqa: E402
+from app.db import RequestQueryStats, request_query_stats, close_clients  # noqa: E402
+from app.indexes import reconcile_indexes  # noqa: E402
+from app.functions import job_functions  # noqa: E402
+from app.functions.job_functions import JOB_PAGE_SORT, active_jobs_filter, _search_filters, _after_cursor, encode_cursor  # noqa: E402
+from app.routes import application, chat, employee, get_my_applications, interview, notification  # noqa: E402
+from app.utils.jwt_handler import create_access_token  # noqa: E402
+from benchmarks.seed_data import BENCH_URL, BENCH_DB, generate  # noqa: E402
+
+BUDGETS_PATH = Path(__file__).with_name("query_budgets.json")
+
+# Applied to cases without an entry in query_budgets.json
+DEFAULT_BUDGET = {"allow_collscan": False, "max_docs_per_returned": 2.0, "max_keys_per_returned": 3.0, "max_ms": 50}
+
+def query_cases(s: dict) -> list:
+    """(name, collection, command) for the job listing/search patterns; commands are explainable as-is."""
+    now = datetime.utcnow()
+    sort = dict(JOB_PAGE_SORT)
+    after = _after_cursor(encode_cursor(s["mid_job"]))
+    return [
+        ("jobs.list_page", "jobs", {"find": "jobs", "filter": {}, "sort": sort, "limit": 21}),
+        ("jobs.list_page_deep", "jobs", {"find": "jobs", "filter": after, "sort": sort, "limit": 21}),
+        ("jobs.list_legacy", "jobs", {"find": "jobs", "filter": {}, "sort": {"posted_at": -1}}),
+        ("jobs.active_by_company", "jobs", {"find": "jobs", "filter": active_jobs_filter(now, company_id=s["company_id"])}),
+        ("jobs.search_text", "jobs", {"find": "jobs", "filter": _search_filters("python", use_text=True), "sort": sort, "limit": 21}),
+        ("jobs.search_regex", "jobs", {"find": "jobs", "filter": _search_filters("python"), "sort": sort, "limit": 21}),
+        ("jobs.search_filters", "jobs", {"find": "jobs", "filter": _search_filters(category="Design", job_type="Contract", min_salary=1000000), "sort": sort, "limit": 21}),
+        ("jobs.expiry_sweep", "jobs", {"find": "jobs", "filter": {"status": "active", "expires_at": {"$lt": now}}}),
+        ("jobs.popular_categories", "jobs", {"aggregate": "jobs", "pipeline": [{"$group": {"_id": "$job_category", "count": {"$sum": 1}}}, {"$sort": {"count": -1}}], "cursor": {}}),
+    ]
+
+
+def _request(authorization: str) -> Request:
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": [(b"authorization", authorization.encode())]})
+
+
+def route_cases(s: dict, employer: dict, seeker: dict) -> list:
+    """(name, zero-argument coroutine factory) calling the real handlers as the sample employer / job seeker."""
+    employer_token, seeker_token = create_access_token(employer), create_access_token(seeker)
+    employer_auth, seeker_auth = f"Bearer {employer_token}", f"Bearer {seeker_token}"
+    return [
+        ("jobs.by_title", lambda: job_functions.get_job_by_title(s["title"])),
+        ("jobs.by_company", lambda: job_functions.get_jobs_by_company(s["company_id"])),
+        ("jobs.dependents", lambda: job_functions.count_job_dependents(s["job_id"])),
+        ("employee.company_details", lambda: employee.get_company_details(_request(employer_auth))),
+        ("employee.job_stats", lambda: employee.get_job_stats(employer_auth)),
+        ("employee.employer_stats", lambda: employee.employer_stats(employer_auth)),
+        ("employee.job_postings", lambda: employee.get_job_postings(employer_auth)),
+        ("employee.job_applications", lambda: employee.get_job_applications(s["employer_job_id"], employer_auth)),
+        ("chat.recipients", lambda: chat.get_chat_recipients(employer_auth)),
+        ("chat.messages", lambda: chat.get_chat_messages(s["partner_id"], employer_auth)),
+        ("applications.mine", lambda: get_my_applications.get_my_applications(seeker)),
+        ("applications.active", lambda: get_my_applications.get_active_applications(seeker)),
+        ("applications.is_applied", lambda: get_my_applications.is_applied_for_job(s["job_id"], seeker)),
+        ("applications.for_edit_by_job", lambda: application.get_application_for_edit_by_job(s["job_id"], seeker)),
+        ("notifications.mine", lambda: notification.get_notifications(seeker_token)),
+        ("interviews.applicant", lambda: interview.get_applicant_interviews(seeker_auth)),
+        ("interviews.employer", lambda: interview.get_employer_interviews(employer_auth)),
+    ]
+
+
+# Wire-protocol fields explain rejects or does not need
+_SESSION_FIELDS = {"lsid", "txnNumber", "readConcern", "autocommit", "startTransaction"}
+
+
+def explainable(command: dict):
+    """(collection, command) for a recorded read command, ready for explain; None for anything else."""
+    name = next(iter(command))
+    if name not in ("find", "aggregate", "count", "distinct"):
+        return None
+    command = {k: v for k, v in command.items() if not k.startswith("$") and k not in _SESSION_FIELDS}
+    pipeline = command.get("pipeline") or []
+    # count_documents is sent as $match + $group {n: $sum 1}; explain it as the count it is
+    if name == "aggregate" and pipeline and pipeline[-1] == {"$group": {"_id": 1, "n": {"$sum": 1}}}:
+        command = {"count": command["aggregate"], "query": pipeline[0].get("$match", {})}
+    return next(iter(command.values())), command
+
+
+def _shape(value):
+    """The query with its values replaced by type names, so N+1 loops collapse to one case."""
+    if isinstance(value, dict):
+        return tuple((k, _shape(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return ("[]", _shape(value[0]) if value else None)
+    return type(value).__name__
+
+
+async def trace_cases(cases: list) -> list:
+    """Run each (name, factory) and return (name, collection, command) for every distinct read it sent."""
+    traced = []
+    for case, call in cases:
+        stats = RequestQueryStats(keep_commands=True)
+        token = request_query_stats.set(stats)
+        try:
+            await call()
+        except HTTPException:
+            pass  # e.g. a 404 for sample data the seed did not produce; the queries up to it still count
+        finally:
+            request_query_stats.reset(token)
+        seen, per_target = set(), {}
+        for recorded in stats.commands:
+            found = explainable(recorded)
+            if not found:
+                continue
+            collection, command = found
+            op = next(iter(command))
+            key = (collection, op, _shape({k: v for k, v in command.items() if k not in ("batchSize", "singleBatch")}))
+            if key in seen:
+                continue
+            seen.add(key)
+            n = per_target[(collection, op)] = per_target.get((collection, op), 0) + 1
+            traced.append((f"{case}:{collection}.{op}" + (f"#{n}" if n > 1 else ""), collection, command))
+    return traced
+
+
+def _walk(node):
+    if isinstance(node, dict):
+        yield node
+        for value in node.values():
+            yield from _walk(value)
+    elif isinstance(node, list):
+        for value in node:
+            yield from _walk(value)
+
+
+def summarize(explain: dict, returned=None) -> dict:
+    """Flatten find/count/aggregate explain output (classic and SBE, single or $cursor stage) into one record.
+
+    `returned` overrides nReturned for count commands, whose COUNT stage reports 0.
+    """
+    stats = [n["executionStats"] for n in _walk(explain) if isinstance(n.get("executionStats"), dict)]
+    plans = [n["winningPlan"] for n in _walk(explain) if isinstance(n.get("winningPlan"), dict)]
+    stages = sorted({n["stage"] for p in plans for n in _walk(p) if isinstance(n.get("stage"), str)})
+    indexes = sorted({n["indexName"] for p in plans for n in _walk(p) if isinstance(n.get("indexName"), str)})
+    if returned is None:
+        returned = sum(s.get("nReturned", 0) for s in stats)
+    docs = sum(s.get("totalDocsExamined", 0) for s in stats)
+    keys = sum(s.get("totalKeysExamined", 0) for s in stats)
+    return {
+        "collscan": "COLLSCAN" in stages,
+        "stages": stages,
+        "indexes": indexes,
+        "returned": returned,
+        "docs_examined": docs,
+        "keys_examined": keys,
+        "docs_per_returned": round(docs / max(returned, 1), 2),
+        "keys_per_returned": round(keys / max(returned, 1), 2),
+        "server_ms": max((s.get("executionTimeMillis", 0) for s in stats), default=0),
+    }
+
+
+def check(summary: dict, budget: dict) -> list:
+    problems = []
+    if summary["collscan"] and not budget["allow_collscan"]:
+        problems.append("COLLSCAN")
+    if summary["docs_per_returned"] > budget["max_docs_per_returned"]:
+        problems.append(f"docs/returned {summary['docs_per_returned']} > {budget['max_docs_per_returned']}")
+    if summary["keys_per_returned"] > budget["max_keys_per_returned"]:
+        problems.append(f"keys/returned {summary['keys_per_returned']} > {budget['max_keys_per_returned']}")
+    if summary["wall_ms"] > budget["max_ms"]:
+        problems.append(f"wall {summary['wall_ms']}ms > {budget['max_ms']}ms")
+    return problems
+
+
+def run(database, cases: list, budgets: dict, only=None) -> list:
+    results = []
+    for name, _, command in cases:
+        if only and not any(name.startswith(prefix) for prefix in only):
+            continue
+        started = time.perf_counter()
+        explain = database.command("explain", command, verbosity="executionStats")
+        returned = database.command(command)["n"] if "count" in command else None
+        summary = summarize(explain, returned)
+        summary["wall_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        budget = {**DEFAULT_BUDGET, **budgets.get(name, {})}
+        summary["problems"] = check(summary, budget)
+        results.append({"name": name, **summary})
+    return results
+
+
+def load_budgets(path: Path = BUDGETS_PATH) -> dict:
+    if not path.exists():
+        return {}
+    return {k: v for k, v in json.loads(path.read_text()).items() if not k.startswith("_")}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Explain app queries on a seeded database and fail on plan regressions.")
+    parser.add_argument("--docs", type=int, default=100000, help="approximate number of documents to seed")
+    parser.add_argument("--seed", type=int, default=42, help="random seed for the dataset")
+    parser.add_argument("--no-seed", action="store_true", help="reuse the existing benchmark database")
+    parser.add_argument("--only", action="append", help="run cases whose name starts with this prefix (repeatable)")
+    parser.add_argument("--budgets", type=Path, default=BUDGETS_PATH)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args(argv)
+
+    if BENCH_DB == APP_DB_NAME:
+        parser.error(f"MONGO_BENCH_DB is the app database ({APP_DB_NAME}); refusing to drop it")
+    client = MongoClient(BENCH_URL)
+    database = client[BENCH_DB]
+    samples_doc = database.bench_meta.find_one({"_id": "samples"})
+    if not args.no_seed or not samples_doc:
+        client.drop_database(BENCH_DB)
+        samples = generate(database, args.docs, args.seed)["samples"]
+        database.bench_meta.insert_one({"_id": "samples", **samples})
+    else:
+        samples = {k: v for k, v in samples_doc.items() if k != "_id"}
+    reconcile_indexes(database=database)
+    # A job from the middle of the listing, for the deep keyset page
+    total = database.jobs.estimated_document_count()
+    samples["mid_job"] = next(database.jobs.find({}, {"posted_at": 1, "job_id": 1}).sort(JOB_PAGE_SORT).skip(total // 2).limit(1), None)
+    samples["employer_job_id"] = (database.jobs.find_one({"employer_id": samples["employer_id"]}, {"job_id": 1}) or {}).get("job_id")
+    identity = {"_id": 0, "email": 1, "user_id": 1, "user_type": 1}
+    employer = database.users.find_one({"user_id": samples["employer_id"]}, identity)
+    seeker = database.users.find_one({"user_id": samples["seeker_id"]}, identity)
+
+    # The handlers run for real: chat.messages marks the sample conversation read, like the route does
+    cases = query_cases(samples) + asyncio.run(trace_cases(route_cases(samples, employer, seeker)))
+    results = run(database, cases, load_budgets(args.budgets), args.only)
+    failed = [r for r in results if r["problems"]]
+    if args.json:
+        json.dump(results, sys.stdout, indent=2, default=str)
+        sys.stdout.write("\n")
+    else:
+        print(f"{'query':48} {'plan':24} {'ret':>6} {'docs/r':>7} {'keys/r':>7} {'ms':>7}  status")
+        for r in results:
+            plan = "COLLSCAN" if r["collscan"] else ",".join(r["indexes"])[:24] or "-"
+            status = "FAIL: " + "; ".join(r["problems"]) if r["problems"] else "ok"
+            print(f"{r['name']:48} {plan:24} {r['returned']:>6} {r['docs_per_returned']:>7} {r['keys_per_returned']:>7} {r['wall_ms']:>7}  {status}")
+        print(f"\n{len(results) - len(failed)}/{len(results)} within budget")
+    client.close()
+    close_clients()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,381 @@
+"""Synthetic dataset generator for load tests and benchmarks.
+
+Fills a scratch database with users (job seekers and employers), companies,
+jobs, applications with GridFS resumes, interviews, chats, notifications,
+saved jobs and subscriptions shaped like the documents the app writes
+(auth_functions.register_user, job_functions.create_job,
+routes/application.apply_for_job, routes/chat, ...). Popularity is skewed with
+Zipf weights: a few jobs get most applications and a few users send most chat
+messages, like production traffic. Documents are generated lazily and written
+with unordered insert_many batches, so memory stays flat up to ~10M documents.
+
+    python -m benchmarks.seed_data --docs 100000 --drop
+    python -m benchmarks.seed_data --docs 10000000 --batch-size 10000 --resume-files 500
+
+Every user's password is BENCH_USER_PASSWORD (default "benchpass") and emails
+are seeker<N>@bench.test / employer<N>@bench.test, so load tests can log in.
+Targets MONGO_BENCH_URL / MONGO_BENCH_DB like benchmarks.query_plans and
+refuses to write into the app's DB_NAME.
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from gridfs import GridFS
+from pymongo import MongoClient
+from app.config.settings import DB_NAME
+from app.functions.auth_functions import hash_password
+from app.functions.subscription_functions import PLANS
+
+BENCH_URL = os.getenv("MONGO_BENCH_URL", "mongodb://localhost:27017")
+BENCH_DB = os.getenv("MONGO_BENCH_DB", "job_portal_bench")
+PASSWORD = os.getenv("BENCH_USER_PASSWORD", "benchpass")
+
+# Share of --docs per collection; companies and subscriptions follow the employer count
+MIX = {"users": 0.08, "jobs": 0.05, "applications": 0.30, "interviews": 0.02, "chats": 0.35, "notifications": 0.15, "saved_jobs": 0.05}
+EMPLOYER_SHARE = 0.1
+SUBSCRIBED_SHARE = 0.3
+
+CATEGORIES = ["Engineering", "Design", "Marketing", "Sales", "Finance", "Operations", "Support", "HR", "Data", "Legal"]
+INDUSTRIES = ["Software", "Fintech", "Healthcare", "E-commerce", "Education", "Manufacturing", "Media"]
+LOCATIONS = ["Bengaluru", "Mumbai", "Delhi", "Hyderabad", "Pune", "Chennai", "Kolkata", "Remote"]
+SKILLS = ["python", "fastapi", "mongodb", "react", "typescript", "aws", "docker", "sql", "figma", "excel",
+          "kubernetes", "java", "go", "seo", "salesforce", "tableau", "communication", "negotiation"]
+TITLES = ["Engineer", "Developer", "Designer", "Analyst", "Manager", "Specialist", "Consultant", "Executive"]
+LEVELS = ["Entry", "Mid", "Senior", "Lead"]
+JOB_TYPES = ["Full-time", "Part-time", "Contract", "Internship"]
+APPLICATION_STATUSES = ["pending", "pending", "pending", "review", "Shortlisted", "Rejected", "Selected"]
+WORDS = ("build ship scale design own improve lead collaborate customers platform data product team "
+         "services growth quality reliable fast modern cloud users insight strategy delivery").split()
+
+
+def zipf_cum_weights(n: int, s: float) -> list:
+    """Cumulative Zipf weights for n items: item 0 is the most popular."""
+    return list(itertools.accumulate(1.0 / (rank + 1) ** s for rank in range(n)))
+
+
+class Skewed:
+    """Draw items with Zipf-distributed popularity (s=0 is uniform)."""
+
+    def __init__(self, items: list, s: float, rng: random.Random):
+        self.items = items
+        self.rng = rng
+        self.cum = zipf_cum_weights(len(items), s) if s else None
+
+    def pick(self):
+        if self.cum is None:
+            return self.rng.choice(self.items)
+        return self.rng.choices(self.items, cum_weights=self.cum)[0]
+
+
+def _uuid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def _text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choices(WORDS, k=words)).capitalize() + "."
+
+
+def _fake_pdf(rng: random.Random, name: str) -> bytes:
+    body = f"{name} Resume. Skills: {', '.join(rng.sample(SKILLS, 6))}. Experience: {rng.randint(0, 15)} years. {_text(rng, 80)}"
+    stream = f"BT /F1 10 Tf 40 800 Td ({body}) Tj ET"
+    return (
+        "%PDF-1.4\n1 0 obj<</Type/Catalog/Pages 2 0 R>>endobj\n"
+        "2 0 obj<</Type/Pages/Kids[3 0 R]/Count 1>>endobj\n"
+        "3 0 obj<</Type/Page/Parent 2 0 R/MediaBox[0 0 595 842]/Contents 4 0 R"
+        "/Resources<</Font<</F1<</Type/Font/Subtype/Type1/BaseFont/Helvetica>>>>>>>>endobj\n"
+        f"4 0 obj<</Length {len(stream)}>>stream\n{stream}\nendstream endobj\ntrailer<</Root 1 0 R>>\n%%EOF\n"
+    ).encode()
+
+
+def bulk_insert(collection, docs, batch_size: int) -> int:
+    """Write an iterable of documents in unordered insert_many batches; returns the number inserted."""
+    inserted = 0
+    batch = []
+    for doc in docs:
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            inserted += len(collection.insert_many(batch, ordered=False).inserted_ids)
+            batch = []
+    if batch:
+        inserted += len(collection.insert_many(batch, ordered=False).inserted_ids)
+    return inserted
+
+
+def plan_counts(docs: int) -> dict:
+    counts = {name: max(int(docs * share), 1) for name, share in MIX.items()}
+    counts["employers"] = max(int(counts["users"] * EMPLOYER_SHARE), 1)
+    counts["seekers"] = max(counts["users"] - counts["employers"], 1)
+    return counts
+
+
+def generate(database, docs: int, seed: int = 42, batch_size: int = 5000, resume_files: int = 200,
+             job_skew: float = 1.1, chat_skew: float = 1.2, progress=None) -> dict:
+    """Seed `database` with roughly `docs` documents; returns per-collection counts and sample ids.
+
+    Sample ids point at the hottest entities (most applied-to job, chattiest
+    employer, most active seeker) so benchmarks exercise the worst cases.
+    """
+    rng = random.Random(seed)
+    counts = plan_counts(docs)
+    now = datetime.utcnow()
+    password = hash_password(PASSWORD)
+    report = {}
+
+    def log(name, n, started):
+        report[name] = n
+        if progress:
+            progress(f"{name}: {n} docs in {time.perf_counter() - started:.1f}s")
+
+    employers = [_uuid(rng) for _ in range(counts["employers"])]
+    seekers = [_uuid(rng) for _ in range(counts["seekers"])]
+    companies = {e: _uuid(rng) for e in employers}
+
+    def users():
+        for i, user_id in enumerate(employers + seekers):
+            employer = i < len(employers)
+            n = i if employer else i - len(employers)
+            registered = now - timedelta(days=rng.randint(0, 720))
+            doc = {
+                "user_id": user_id,
+                "email": f"{'employer' if employer else 'seeker'}{n}@bench.test",
+                "password": password,
+                "first_name": f"{'Emp' if employer else 'Seeker'}{n}",
+                "last_name": "Bench",
+                "user_type": "employer" if employer else "job_seeker",
+                "register_time": registered,
+                "onboarding": {"isComplete": True, "startedAt": registered.isoformat(), "formData": {}, "validationStatus": {},
+                               "validationMessages": {}, "lastStep": 4, "lastUpdated": registered.isoformat()},
+            }
+            if employer:
+                doc["company_id"] = companies[user_id]
+            else:
+                doc["skills"] = rng.sample(SKILLS, rng.randint(2, 6))
+                doc["location"] = rng.choice(LOCATIONS)
+            yield doc
+
+    started = time.perf_counter()
+    log("users", bulk_insert(database.users, users(), batch_size), started)
+
+    started = time.perf_counter()
+    log("companies", bulk_insert(database.companies, (
+        {"company_id": c, "employer_id": e, "company_name": f"Bench Company {i}", "industry": rng.choice(INDUSTRIES),
+         "location": rng.choice(LOCATIONS), "description": _text(rng, 30), "logo": None}
+        for i, (e, c) in enumerate(companies.items())
+    ), batch_size), started)
+
+    # A few employers post most of the jobs; employers[0] is the busiest
+    posting_employer = Skewed(employers, job_skew, rng)
+    job_ids, job_employers, job_titles = [], [], []
+
+    def jobs():
+        for i in range(counts["jobs"]):
+            employer = posting_employer.pick()
+            job_id = _uuid(rng)
+            posted_at = now - timedelta(minutes=rng.randint(0, 60 * 24 * 180))
+            validity_days = rng.choice([15, 30, 45, 60])
+            category = rng.choice(CATEGORIES)
+            title = f"{rng.choice(LEVELS)} {category} {rng.choice(TITLES)}"
+            min_salary = rng.randrange(200000, 3000000, 50000)
+            job_ids.append(job_id)
+            job_employers.append(employer)
+            job_titles.append(title)
+            yield {
+                "job_id": job_id,
+                "title": title,
+                "description": _text(rng, rng.randint(40, 160)),
+                "skills": rng.sample(SKILLS, rng.randint(3, 6)),
+                "required_skills": rng.sample(SKILLS, 2),
+                "category": category,
+                "job_category": category,
+                "type": rng.choice(JOB_TYPES),
+                "employment_type": rng.choice(JOB_TYPES),
+                "experience_level": rng.choice(LEVELS),
+                "industry": rng.choice(INDUSTRIES),
+                "department": category,
+                "location": rng.choice(LOCATIONS),
+                "salary": min_salary,
+                "min_salary": min_salary,
+                "max_salary": min_salary + rng.randrange(100000, 1500000, 50000),
+                "show_salary": rng.random() < 0.7,
+                "employer_id": employer,
+                "company_id": companies[employer],
+                "validity_days": validity_days,
+                "posted_at": posted_at,
+                "expires_at": posted_at + timedelta(days=validity_days),
+                "status": "active",
+                "views": int(rng.paretovariate(1.2) * 10),
+            }
+
+    started = time.perf_counter()
+    log("jobs", bulk_insert(database.jobs, jobs(), batch_size), started)
+
+    # Resumes: a pool of GridFS files shared by applications (one upload per application would dominate at 10M)
+    started = time.perf_counter()
+    fs = GridFS(database)
+    resume_pool = []
+    for i in range(max(resume_files, 1)):
+        file_id = fs.put(_fake_pdf(rng, f"Seeker{i}"), filename=f"resume_{i}.pdf", content_type="application/pdf")
+        resume_pool.append((str(file_id), f"resume_{i}.pdf"))
+    log("fs.files", len(resume_pool), started)
+
+    popular_job = Skewed(range(len(job_ids)), job_skew, rng)
+    active_seeker = Skewed(range(len(seekers)), 0.8, rng)
+
+    def applications():
+        for _ in range(counts["applications"]):
+            j, s = popular_job.pick(), active_seeker.pick()
+            file_id, filename = rng.choice(resume_pool)
+            applied_at = now - timedelta(minutes=rng.randint(0, 60 * 24 * 180))
+            yield {
+                "job_id": job_ids[j],
+                "user_id": seekers[s],
+                "email": f"seeker{s}@bench.test",
+                "cover_letter": _text(rng, 40),
+                "linked_in": "",
+                "portfolio": "",
+                "resume_file_id": file_id,
+                "resume_filename": filename,
+                "resume_content_type": "application/pdf",
+                "status": rng.choice(APPLICATION_STATUSES),
+                "applied_at": applied_at,
+            }
+
+    started = time.perf_counter()
+    log("applications", bulk_insert(database.applications, applications(), batch_size), started)
+
+    def interviews():
+        for _ in range(counts["interviews"]):
+            j, s = popular_job.pick(), active_seeker.pick()
+            yield {
+                "hr_id": job_employers[j],
+                "candidate_id": seekers[s],
+                "job_id": job_ids[j],
+                "scheduled_time": (now + timedelta(days=rng.randint(-30, 30))).isoformat(),
+                "details": {"interviewType": rng.choice(["video", "phone", "onsite"]), "duration": 30},
+                "created_at": now - timedelta(days=rng.randint(0, 60)),
+                "status": rng.choice(["scheduled", "scheduled", "completed", "cancelled"]),
+            }
+
+    started = time.perf_counter()
+    log("interviews", bulk_insert(database.interviews, interviews(), batch_size), started)
+
+    # Chatty users: senders drawn with Zipf over employers then seekers, so employers[0] talks the most
+    chatter = Skewed(employers + seekers, chat_skew, rng)
+    partners = {}
+
+    def chats():
+        for _ in range(counts["chats"]):
+            sender = chatter.pick()
+            if sender in companies:
+                recipient = seekers[active_seeker.pick()]
+            else:
+                recipient = posting_employer.pick()
+            partners.setdefault(sender, recipient)
+            yield {
+                "id": _uuid(rng),
+                "sender_id": sender,
+                "recipient_id": recipient,
+                "text": _text(rng, rng.randint(3, 25)),
+                "time": (now - timedelta(seconds=rng.randint(0, 60 * 60 * 24 * 90))).isoformat(),
+                "read": rng.random() < 0.8,
+            }
+
+    started = time.perf_counter()
+    log("chats", bulk_insert(database.chats, chats(), batch_size), started)
+
+    def notifications():
+        for _ in range(counts["notifications"]):
+            yield {
+                "user_id": seekers[active_seeker.pick()] if rng.random() < 0.8 else posting_employer.pick(),
+                "title": rng.choice(["Application update", "New message", "Interview scheduled", "Job alert"]),
+                "message": _text(rng, 12),
+                "read": rng.random() < 0.6,
+                "time": now - timedelta(seconds=rng.randint(0, 60 * 60 * 24 * 60)),
+            }
+
+    started = time.perf_counter()
+    log("notifications", bulk_insert(database.notifications, notifications(), batch_size), started)
+
+    def saved_jobs():
+        for _ in range(counts["saved_jobs"]):
+            j = popular_job.pick()
+            yield {"job_id": job_ids[j], "title": job_titles[j], "employer_id": job_employers[j], "company_id": companies[job_employers[j]],
+                   "user_id": seekers[active_seeker.pick()], "saved_at": now - timedelta(days=rng.randint(0, 90))}
+
+    started = time.perf_counter()
+    log("saved_jobs", bulk_insert(database.saved_jobs, saved_jobs(), batch_size), started)
+
+    def subscriptions():
+        for employer in employers[: max(int(len(employers) * SUBSCRIBED_SHARE), 1)]:
+            plan_id = rng.choice(["basic", "pro", "premium", "enterprise"])
+            started_at = now - timedelta(days=rng.randint(0, 300))
+            yield {
+                "subscription_id": _uuid(rng),
+                "employer_id": employer,
+                "company_id": companies[employer],
+                "plan_id": plan_id,
+                "plan_snapshot": PLANS[plan_id],
+                "status": "active",
+                "started_at": started_at,
+                "expires_at": started_at + timedelta(days=365),
+                "payment_reference": f"BENCH{rng.getrandbits(40)}",
+                "posts_used_year": rng.randint(0, 30),
+                "posts_used_month": rng.randint(0, 3),
+                "year": now.year,
+                "month": now.month,
+                "scope": "company" if plan_id == "enterprise" else "employer",
+            }
+
+    started = time.perf_counter()
+    log("subscriptions", bulk_insert(database.subscriptions, subscriptions(), batch_size), started)
+
+    return {
+        "counts": report,
+        "samples": {
+            "employer_id": employers[0],
+            "employer_email": "employer0@bench.test",
+            "partner_id": partners.get(employers[0], seekers[0]),
+            "seeker_id": seekers[0],
+            "seeker_email": "seeker0@bench.test",
+            "job_id": job_ids[0] if job_ids else None,
+            "company_id": companies[employers[0]],
+            "title": job_titles[0] if job_titles else None,
+        },
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Seed a benchmark database with a realistic, skewed synthetic dataset.")
+    parser.add_argument("--docs", type=int, default=100000, help="approximate total documents (10k - 10M)")
+    parser.add_argument("--seed", type=int, default=42, help="random seed (same seed, same dataset)")
+    parser.add_argument("--batch-size", type=int, default=5000, help="documents per insert_many")
+    parser.add_argument("--resume-files", type=int, default=200, help="distinct GridFS resumes shared by applications")
+    parser.add_argument("--job-skew", type=float, default=1.1, help="Zipf exponent for job/employer popularity (0 = uniform)")
+    parser.add_argument("--chat-skew", type=float, default=1.2, help="Zipf exponent for chat activity (0 = uniform)")
+    parser.add_argument("--drop", action="store_true", help="drop the benchmark database first")
+    args = parser.parse_args(argv)
+
+    if BENCH_DB == DB_NAME:
+        parser.error(f"MONGO_BENCH_DB is the app database ({DB_NAME}); refusing to seed it")
+    client = MongoClient(BENCH_URL)
+    if args.drop:
+        client.drop_database(BENCH_DB)
+    started = time.perf_counter()
+    result = generate(client[BENCH_DB], args.docs, args.seed, args.batch_size, args.resume_files, args.job_skew, args.chat_skew,
+                      progress=lambda msg: print(msg, file=sys.stderr))
+    result["seconds"] = round(time.perf_counter() - started, 1)
+    client[BENCH_DB].bench_meta.replace_one({"_id": "samples"}, {"_id": "samples", **result["samples"]}, upsert=True)
+    json.dump(result, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    client.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""Run the data-access code against mongomock instead of a live MongoDB.
+
+`app.db` connects (and imports motor) at import time, so a stand-in module with
+the same names is installed before any app module is imported: `db`/`gfs` are
+mongomock-backed and `repos` mirrors AsyncRepository's methods over the same
+collections. Every collection is dropped after each test.
+"""
+import sys
+import types
+
+import gridfs
+import mongomock
+import mongomock.gridfs
+import pytest
+from pymongo import ReturnDocument
+
+mongomock.gridfs.enable_gridfs_integration()
+
+client = mongomock.MongoClient()
+mock_db = client["test"]
+
+
+class MockRepository:
+    """AsyncRepository's interface over a mongomock collection."""
+
+    def __init__(self, name: str):
+        self.collection = mock_db[name]
+
+    async def find_one(self, filter: dict, projection: dict | None = None, **kwargs):
+        return self.collection.find_one(filter, projection)
+
+    async def find(self, filter: dict | None = None, projection: dict | None = None, sort=None, skip: int = 0, limit: int = 0) -> list:
+        cursor = self.collection.find(filter or {}, projection)
+        if sort:
+            cursor = cursor.sort(sort)
+        return list(cursor.skip(skip).limit(limit))
+
+    async def count(self, filter: dict | None = None) -> int:
+        return self.collection.count_documents(filter or {})
+
+    async def aggregate(self, pipeline: list) -> list:
+        return list(self.collection.aggregate(pipeline))
+
+    async def insert_one(self, document: dict, **kwargs):
+        return self.collection.insert_one(document)
+
+    async def insert_many(self, documents: list, ordered: bool = True, **kwargs):
+        return self.collection.insert_many(documents, ordered=ordered)
+
+    async def update_one(self, filter: dict, update: dict, **kwargs):
+        return self.collection.update_one(filter, update)
+
+    async def find_one_and_update(self, filter: dict, update: dict, projection=None, return_document=ReturnDocument.BEFORE, **kwargs):
+        # mongomock drops the match when the update rewrites a field the filter's $or uses;
+        # matching first and updating by _id behaves like the server (tests are single-threaded)
+        match = self.collection.find_one(filter, {"_id": 1})
+        if not match:
+            return None
+        by_id = {"_id": match["_id"]}
+        before = self.collection.find_one(by_id, projection)
+        self.collection.update_one(by_id, update)
+        return self.collection.find_one(by_id, projection) if return_document == ReturnDocument.AFTER else before
+
+    async def update_many(self, filter: dict, update: dict, **kwargs):
+        return self.collection.update_many(filter, update)
+
+    async def delete_one(self, filter: dict, **kwargs):
+        return self.collection.delete_one(filter)
+
+    async def delete_many(self, filter: dict, **kwargs):
+        return self.collection.delete_many(filter)
+
+
+class MockRepositories:
+    def __getattr__(self, name: str) -> MockRepository:
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return MockRepository(name)
+
+
+fake_db = types.ModuleType("app.db")
+fake_db.db = mock_db
+fake_db.gfs = gridfs.GridFS(mock_db)
+fake_db.client = client
+fake_db.async_client = None
+fake_db.repos = MockRepositories()
+fake_db.search_repos = MockRepositories()
+fake_db.analytics_repos = MockRepositories()
+sys.modules["app.db"] = fake_db
+
+
+@pytest.fixture
+def mongo():
+    """The mongomock database behind app.db."""
+    return mock_db
+
+
+@pytest.fixture(autouse=True)
+def clean_db():
+    yield
+    for name in mock_db.list_collection_names():
+        mock_db.drop_collection(name)
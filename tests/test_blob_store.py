@@ -0,0 +1,147 @@
+import asyncio
+from datetime import timedelta
+from io import BytesIO
+
+from starlette.datastructures import Headers, UploadFile
+
+from app.functions import blob_functions
+from app.utils.timezone_utils import get_ist_now
+
+LOGO = b"\x89PNG logo bytes" * 100
+
+
+def _files(mongo, file_id):
+    return mongo.fs.files.find_one({"_id": file_id})
+
+
+def _age(mongo, file_id, seconds: int):
+    mongo.fs.files.update_one({"_id": file_id}, {"$set": {"unreferenced_at": get_ist_now() - timedelta(seconds=seconds)}})
+
+
+def _sweep(grace_seconds: int = 60):
+    return blob_functions.sweep_unreferenced_blobs(grace_seconds=grace_seconds, batch_size=100)
+
+
+def test_identical_uploads_share_one_blob(mongo):
+    first = blob_functions.put_blob(LOGO, "a.png", "image/png")
+    second = blob_functions.put_blob(LOGO, "b.png", "image/png")
+
+    assert first == second
+    assert mongo.fs.files.count_documents({}) == 1
+    assert _files(mongo, first)["refs"] == 2
+    assert blob_functions.get_blob(str(first)).read() == LOGO
+
+
+def test_store_upload_reports_each_uploaders_name_and_type(mongo):
+    def upload(name, content_type):
+        return UploadFile(BytesIO(LOGO), size=len(LOGO), filename=name, headers=Headers({"content-type": content_type}))
+
+    first = asyncio.run(blob_functions.store_upload(upload("a.png", "image/png"), max_bytes=1 << 20))
+    second = asyncio.run(blob_functions.store_upload(upload("b.bin", "application/octet-stream"), max_bytes=1 << 20))
+
+    assert first["file_id"] == second["file_id"]
+    assert (second["filename"], second["content_type"]) == ("b.bin", "application/octet-stream")
+    assert _files(mongo, first["file_id"])["filename"] == "a.png"
+
+
+def test_upload_without_ref_waits_for_the_saving_request(mongo):
+    file_id = blob_functions.put_blob_stream(BytesIO(LOGO), "l.png", "image/png", take_ref=False)["file_id"]
+    assert _files(mongo, file_id)["refs"] == 0 and "unreferenced_at" in _files(mongo, file_id)
+
+    blob_functions.add_blob_ref(str(file_id))
+
+    assert _files(mongo, file_id)["refs"] == 1 and "unreferenced_at" not in _files(mongo, file_id)
+
+
+def test_release_to_zero_stamps_and_sweep_waits_for_grace(mongo):
+    file_id = blob_functions.put_blob(LOGO)
+    blob_functions.put_blob(LOGO)
+
+    blob_functions.release_blob(file_id)
+    assert "unreferenced_at" not in _files(mongo, file_id)
+    blob_functions.release_blob(str(file_id))
+    assert _files(mongo, file_id)["refs"] == 0 and "unreferenced_at" in _files(mongo, file_id)
+    blob_functions.release_blob(file_id)
+    assert _files(mongo, file_id)["refs"] == 0
+
+    assert _sweep()["deleted"] == 0
+    _age(mongo, file_id, 120)
+    assert _sweep()["deleted"] == 1
+    assert mongo.fs.files.count_documents({}) == 0 and mongo.fs.chunks.count_documents({}) == 0
+
+
+def test_release_stamps_blobs_stored_before_refcounting(mongo):
+    file_id = blob_functions.gfs.put(LOGO, filename="old.pdf")
+
+    blob_functions.release_blob(file_id)
+
+    assert _files(mongo, file_id)["refs"] == 0 and "unreferenced_at" in _files(mongo, file_id)
+
+
+def test_sweep_restores_refs_of_blobs_still_referenced(mongo):
+    file_id = blob_functions.put_blob(LOGO)
+    mongo.users.insert_one({"user_id": "u1", "profile_photo_id": str(file_id)})
+    mongo.companies.insert_one({"company_id": "c1", "logo": file_id})
+    blob_functions.release_blob(file_id)
+    _age(mongo, file_id, 120)
+
+    result = _sweep()
+
+    assert (result["deleted"], result["restored"]) == (0, 1)
+    assert _files(mongo, file_id)["refs"] == 2 and "unreferenced_at" not in _files(mongo, file_id)
+
+
+def test_reupload_after_release_takes_the_blob_back(mongo):
+    file_id = blob_functions.put_blob(LOGO)
+    blob_functions.release_blob(file_id)
+    _age(mongo, file_id, 120)
+
+    assert blob_functions.put_blob(LOGO) == file_id
+
+    assert _sweep()["deleted"] == 0
+    assert _files(mongo, file_id)["refs"] == 1 and "unreferenced_at" not in _files(mongo, file_id)
+
+
+def test_reupload_without_ref_restarts_the_grace_period(mongo):
+    file_id = blob_functions.put_blob(LOGO)
+    blob_functions.release_blob(file_id)
+    _age(mongo, file_id, 120)
+
+    blob_functions.put_blob_stream(BytesIO(LOGO), take_ref=False)
+
+    assert _sweep()["deleted"] == 0
+    assert _files(mongo, file_id)["refs"] == 0
+
+
+def test_upload_racing_the_sweep_keeps_the_blob(mongo, monkeypatch):
+    # The sweep picked the blob as a candidate; an upload of the same bytes reuses it before the delete
+    file_id = blob_functions.put_blob(LOGO)
+    blob_functions.release_blob(file_id)
+    _age(mongo, file_id, 120)
+    count_references = blob_functions.count_references
+
+    def upload_then_count(candidate):
+        # The uploading request has not saved its document yet, so no reference is found
+        assert blob_functions.put_blob(LOGO) == candidate
+        return count_references(candidate)
+
+    monkeypatch.setattr(blob_functions, "count_references", upload_then_count)
+
+    assert _sweep()["deleted"] == 0
+    assert _files(mongo, file_id)["refs"] == 1
+    assert blob_functions.get_blob(file_id).read() == LOGO
+
+
+def test_sweep_skips_while_another_sweep_runs(mongo):
+    with blob_functions._sweep_lock:
+        assert _sweep()["skipped"] is True
+
+
+def test_recount_counts_refs_from_references(mongo):
+    # Dry run only: mongomock's bulk_write does not accept current pymongo operations
+    kept = blob_functions.put_blob(LOGO)
+    blob_functions.put_blob(b"orphan")
+    mongo.resumes.insert_one({"file_id": str(kept)})
+    mongo.applications.insert_many([{"resume_file_id": kept}, {"resume_file_id": kept}])
+
+    assert blob_functions.recount_blob_refs(dry_run=True) == {"changed": 2, "unreferenced": 1}
@@ -0,0 +1,103 @@
+import asyncio
+import base64
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.config.settings import JOB_PAGE_SIZE_DEFAULT, JOB_PAGE_SIZE_MAX
+from app.functions import job_functions
+
+POSTED_AT = datetime(2025, 5, 1, 9, 30, 0, 123000)
+
+
+def _token(payload) -> str:
+    raw = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _all_pages(limit: int, filters: dict = None) -> list:
+    pages, cursor = [], None
+    while True:
+        page = asyncio.run(job_functions._paginate_jobs(filters or {}, limit, cursor))
+        pages.append(page)
+        cursor = page["next_cursor"]
+        if not page["has_more"]:
+            assert cursor is None
+            return pages
+
+
+def test_cursor_round_trip():
+    cursor = job_functions.encode_cursor({"job_id": "b7", "posted_at": POSTED_AT, "title": "ignored"})
+    assert "=" not in cursor
+    assert job_functions.decode_cursor(cursor) == (POSTED_AT, "b7")
+
+
+@pytest.mark.parametrize("cursor", [
+    "not a cursor!",
+    _token(b"\xff\xfe not json"),
+    _token(["2025-05-01T09:30:00", "b7"]),
+    _token({"p": "2025-05-01T09:30:00"}),
+    _token({"j": "b7"}),
+    _token({"p": "yesterday", "j": "b7"}),
+    _token({"p": None, "j": "b7"}),
+    job_functions.encode_cursor({"job_id": "b7", "posted_at": POSTED_AT})[:-4],
+])
+def test_malformed_or_tampered_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError):
+        job_functions.decode_cursor(cursor)
+    with pytest.raises(ValueError):
+        asyncio.run(job_functions._paginate_jobs({}, 5, cursor))
+
+
+def test_pages_cover_every_job_once_when_posted_at_ties(mongo):
+    # Seven jobs share one timestamp, so only job_id can order them across page boundaries
+    jobs = [{"job_id": f"tie-{i}", "posted_at": POSTED_AT, "status": "active"} for i in range(7)]
+    jobs += [{"job_id": f"old-{i}", "posted_at": POSTED_AT - timedelta(minutes=i + 1), "status": "active"} for i in range(3)]
+    mongo.jobs.insert_many(jobs)
+
+    pages = _all_pages(limit=3)
+
+    seen = [job["job_id"] for page in pages for job in page["jobs"]]
+    expected = sorted(jobs, key=lambda j: (j["posted_at"], j["job_id"]), reverse=True)
+    assert seen == [job["job_id"] for job in expected]
+    assert [len(page["jobs"]) for page in pages] == [3, 3, 3, 1]
+    assert all(page["total"] == 10 for page in pages)
+
+
+def test_page_boundary_on_last_row_has_no_next_cursor(mongo):
+    mongo.jobs.insert_many([{"job_id": f"j{i}", "posted_at": POSTED_AT} for i in range(4)])
+
+    pages = _all_pages(limit=2)
+
+    assert [page["has_more"] for page in pages] == [True, False]
+    assert pages[-1]["next_cursor"] is None
+
+
+def test_cursor_keeps_filters(mongo):
+    mongo.jobs.insert_many([
+        {"job_id": f"j{i}", "posted_at": POSTED_AT, "status": "active" if i % 2 else "closed"} for i in range(6)
+    ])
+
+    pages = _all_pages(limit=2, filters={"status": "active"})
+
+    assert [job["job_id"] for page in pages for job in page["jobs"]] == ["j5", "j3", "j1"]
+
+
+@pytest.mark.parametrize("limit, expected", [
+    (None, JOB_PAGE_SIZE_DEFAULT), (0, 1), (-5, 1), (JOB_PAGE_SIZE_MAX + 1, JOB_PAGE_SIZE_MAX),
+])
+def test_page_size_is_clamped(limit, expected):
+    assert job_functions._clamp_page_size(limit) == expected
+
+
+def test_list_jobs_paginates_unless_legacy(mongo):
+    mongo.jobs.insert_many([
+        {"job_id": f"j{i:03}", "posted_at": POSTED_AT - timedelta(seconds=i)} for i in range(JOB_PAGE_SIZE_DEFAULT + 5)
+    ])
+
+    page = asyncio.run(job_functions.list_jobs())
+    legacy = asyncio.run(job_functions.list_jobs(legacy=True))
+
+    assert len(page["jobs"]) == JOB_PAGE_SIZE_DEFAULT and page["has_more"]
+    assert isinstance(legacy, list) and len(legacy) == JOB_PAGE_SIZE_DEFAULT + 5
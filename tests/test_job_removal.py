@@ -0,0 +1,136 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+
+from app.config.settings import JOB_REMOVAL_STALE_SECONDS
+from app.functions import job_functions
+from app.utils.timezone_utils import get_ist_now
+
+
+@pytest.fixture
+def job(mongo):
+    mongo.jobs.insert_one({"job_id": "job-1", "employer_id": "emp-1", "status": "active", "posted_at": get_ist_now()})
+    mongo.applications.insert_many([{"job_id": "job-1", "n": i} for i in range(25)])
+    mongo.interviews.insert_many([{"job_id": "job-1", "n": i} for i in range(3)])
+    mongo.applications.insert_one({"job_id": "other", "n": 0})
+    return "job-1"
+
+
+@pytest.fixture
+def fail_deletes(monkeypatch):
+    """fail_deletes(collection, after): raise from that collection's delete_many after `after` successful calls."""
+    repository = type(job_functions.repos.applications)
+    delete_many = repository.delete_many
+
+    def arm(collection: str, after: int):
+        calls = {"n": 0}
+
+        async def flaky(self, filter, **kwargs):
+            if self.collection.name == collection:
+                calls["n"] += 1
+                if calls["n"] > after:
+                    raise RuntimeError("connection reset")
+            return await delete_many(self, filter, **kwargs)
+
+        monkeypatch.setattr(repository, "delete_many", flaky)
+        return lambda: monkeypatch.setattr(repository, "delete_many", delete_many)
+
+    return arm
+
+
+def _start(job_id="job-1", employer_id="emp-1"):
+    return asyncio.run(job_functions.start_job_removal(job_id, employer_id))
+
+
+def _run(removal_id, batch_size=10):
+    return asyncio.run(job_functions.run_job_removal(removal_id, batch_size=batch_size))
+
+
+def test_removal_archives_job_and_dependents(mongo, job):
+    removal = _start()
+    assert removal["status"] == "pending" and mongo.jobs.count_documents({}) == 0
+
+    done = _run(removal["removal_id"])
+
+    assert done["status"] == "completed"
+    assert (done["applications_archived"], done["interviews_archived"]) == (25, 3)
+    assert mongo.applications.count_documents({}) == 1  # the other job's
+    assert mongo.deleted_applications.count_documents({"job_id": job}) == 25
+    archived = mongo.deleted_jobs.find_one({"job_id": job})
+    assert (archived["archived_applications_count"], archived["archived_interviews_count"]) == (25, 3)
+
+
+def test_unowned_job_is_not_removed(mongo, job):
+    assert _start(employer_id="emp-2") == {"msg": "Job not found or unauthorized"}
+    assert not asyncio.run(job_functions.owns_job(job, "emp-2"))
+    assert mongo.jobs.count_documents({}) == 1
+
+
+def test_failed_run_resumes_from_recorded_progress(mongo, job, fail_deletes):
+    removal = _start()
+    restore = fail_deletes("applications", after=1)
+
+    failed = _run(removal["removal_id"])
+
+    assert failed["status"] == "failed" and "connection reset" in failed["error"]
+    stored = mongo.job_removals.find_one({"removal_id": removal["removal_id"]})
+    assert stored["applications_archived"] == 10
+
+    restore()
+    resumed = _start()
+    assert resumed["removal_id"] == removal["removal_id"] and resumed["status"] == "failed"
+    done = _run(resumed["removal_id"])
+
+    assert done["status"] == "completed" and "error" not in mongo.job_removals.find_one({"removal_id": removal["removal_id"]})
+    assert (done["applications_archived"], done["interviews_archived"]) == (25, 3)
+    assert mongo.deleted_applications.count_documents({}) == 25
+
+
+def test_live_running_claim_is_refused(mongo, job):
+    removal = _start()
+    mongo.job_removals.update_one({"removal_id": removal["removal_id"]}, {"$set": {"status": "running", "heartbeat_at": get_ist_now()}})
+
+    result = _run(removal["removal_id"])
+
+    assert result["status"] == "running"
+    assert mongo.applications.count_documents({"job_id": job}) == 25
+    assert mongo.deleted_applications.count_documents({}) == 0
+
+
+def test_stale_running_claim_is_taken_over(mongo, job):
+    removal = _start()
+    stale = get_ist_now() - timedelta(seconds=JOB_REMOVAL_STALE_SECONDS + 60)
+    mongo.job_removals.update_one({"removal_id": removal["removal_id"]}, {"$set": {"status": "running", "heartbeat_at": stale}})
+
+    result = _run(removal["removal_id"])
+
+    assert result["status"] == "completed" and result["applications_archived"] == 25
+    assert mongo.applications.count_documents({"job_id": job}) == 0
+
+
+def test_rerun_skips_copies_left_by_an_interrupted_batch(mongo, job, fail_deletes):
+    # The first batch is copied but its delete fails: the copies stay behind with the originals
+    removal = _start()
+    restore = fail_deletes("applications", after=0)
+    assert _run(removal["removal_id"])["status"] == "failed"
+    assert mongo.deleted_applications.count_documents({}) == 10
+    assert mongo.applications.count_documents({"job_id": job}) == 25
+
+    restore()
+    done = _run(removal["removal_id"])
+
+    assert done["status"] == "completed" and done["applications_archived"] == 25
+    assert mongo.deleted_applications.count_documents({}) == 25
+    assert len(mongo.deleted_applications.distinct("_id")) == 25
+
+
+def test_completed_removal_is_not_run_again(mongo, job):
+    removal = _start()
+    _run(removal["removal_id"])
+    mongo.applications.insert_one({"job_id": job, "n": 99})
+
+    again = _run(removal["removal_id"])
+
+    assert again["status"] == "completed"
+    assert mongo.applications.count_documents({"job_id": job}) == 1